@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Access log strutturato per server.py e https_server.py
+Ogni richiesta diventa una riga JSON (percorso, stato, byte, durata, codifica,
+esito della cache in memoria, referer). Le righe passano da una coda a un
+thread di scrittura che le scrive a blocchi: il thread della richiesta non
+aspetta mai il disco e, se la coda è piena, la riga viene scartata e contata
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+DEFAULT_LOG_FILE = 'access.log.jsonl'
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 256
+FLUSH_SECONDS = 1.0
+
+
+class AccessLog(threading.Thread):
+    """Scrittura bufferizzata delle righe di log in un thread dedicato"""
+
+    def __init__(self, path=DEFAULT_LOG_FILE):
+        super().__init__(daemon=True)
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._closing = threading.Event()
+
+    def write(self, record):
+        """Accoda una riga senza bloccare; restituisce False se è stata scartata"""
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _drain(self, timeout):
+        """Fino a BATCH_SIZE righe: attende la prima al massimo `timeout` secondi"""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while not (self._closing.is_set() and self._queue.empty()):
+                batch = self._drain(FLUSH_SECONDS)
+                if batch:
+                    f.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in batch))
+                    f.flush()
+
+    def close(self):
+        """Scrive le righe ancora in coda e termina il thread"""
+        self._closing.set()
+        if self.is_alive():
+            self.join()
+        if self.dropped:
+            print(f"⚠️  Access log: {self.dropped} righe scartate (coda piena)", file=sys.stderr)
+
+
+class AccessLogMixin:
+    """
+    Da combinare con un handler di http.server: sostituisce il log testuale su
+    stderr con una riga JSON per richiesta nell'AccessLog della classe (anche
+    gli errori di send_error finiscono nella riga, nel campo 'error'). Gli
+    handler con una cache in memoria impostano self.cache_status ('hit'/'miss')
+    """
+    access_log = None
+
+    def handle_one_request(self):
+        self.cache_status = None
+        self._response = {}
+        start = time.perf_counter()
+        super().handle_one_request()
+        if self.access_log is None or 'status' not in self._response:
+            return
+        headers = getattr(self, 'headers', None)
+        self.access_log.write({
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'method': getattr(self, 'command', None),
+            'path': urlsplit(getattr(self, 'path', '')).path,
+            'status': self._response['status'],
+            'bytes': self._response.get('bytes'),
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            'encoding': self._response.get('encoding', 'identity'),
+            'cache': self.cache_status,
+            'referer': headers.get('Referer') if headers else None,
+            'error': self._response.get('error'),
+        })
+
+    def send_response(self, code, message=None):
+        self._response['status'] = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        name = keyword.lower()
+        if name == 'content-length':
+            self._response['bytes'] = int(value)
+        elif name == 'content-encoding':
+            self._response['encoding'] = value
+        super().send_header(keyword, value)
+
+    def log_request(self, code='-', size='-'):
+        if self.access_log is None:
+            super().log_request(code, size)
+
+    def log_message(self, format, *args):
+        # log_error passa da qui: con l'access log attivo il messaggio va nella
+        # riga JSON della richiesta invece che su stderr
+        if self.access_log is None:
+            super().log_message(format, *args)
+        elif getattr(self, '_response', None) is not None:
+            self._response['error'] = format % args
@@ -67,9 +67,6 @@ class AIUnifiedEngine {
         // Phase 3: Cross-Linking
         this.implementCrossLinking();
         
-        // Phase 4: Schema.org Integration
-        this.integrateStructuredData();
-        
         console.log('✅ AI Unified Engine: Optimization complete');
     }
 
@@ -293,127 +290,6 @@ class AIUnifiedEngine {
         });
     }
 
-    // STRUCTURED DATA INTEGRATION
-    integrateStructuredData() {
-        console.log('📊 Integrating structured data...');
-        
-        this.loadExternalSchemas();
-    }
-
-    async loadExternalSchemas() {
-        const schemas = [
-            './ai-seo-enhanced.json',
-            './ai-knowledge-base.json',
-            './ai-services-schema.json',
-            './ai-person-eeat.json',
-            './ai-authoritative-sources.json',
-            './ai-context-sitemap.json'
-        ];
-
-        const unifiedGraph = [];
-
-        for (const schema of schemas) {
-            try {
-                const response = await fetch(schema);
-                if (response.ok) {
-                    const data = await response.json();
-                    console.log(`✅ Loaded schema: ${schema}`);
-                    
-                    // Extract entities from @graph or add the entire object
-                    if (data['@graph']) {
-                        unifiedGraph.push(...data['@graph']);
-                    } else if (data['@type']) {
-                        unifiedGraph.push(data);
-                    }
-                } else {
-                    console.debug(`⚠️ Schema not available: ${schema} (${response.status})`);
-                }
-            } catch (error) {
-                console.debug(`⚠️ Could not load schema ${schema}:`, error.message);
-            }
-        }
-
-        // Add enhanced local business data
-        unifiedGraph.push(this.getEnhancedLocalBusiness());
-        
-        // Add breadcrumb data
-        unifiedGraph.push(this.getBreadcrumbData());
-
-        // Create unified JSON-LD with single @graph
-        const unifiedSchema = {
-            "@context": "https://schema.org",
-            "@graph": unifiedGraph
-        };
-
-        this.injectUnifiedStructuredData(unifiedSchema);
-    }
-
-    injectUnifiedStructuredData(data) {
-        // Remove existing JSON-LD scripts
-        const existingScripts = document.querySelectorAll('script[type="application/ld+json"]');
-        existingScripts.forEach(script => script.remove());
-
-        // Inject unified schema
-        const script = document.createElement('script');
-        script.type = 'application/ld+json';
-        script.id = 'ai-unified-structured-data';
-        script.textContent = JSON.stringify(data, null, 2);
-        document.head.appendChild(script);
-        
-        console.log('🎯 Unified JSON-LD @graph injected with', data['@graph'].length, 'entities');
-    }
-
-    getEnhancedLocalBusiness() {
-        return {
-            "@context": "https://schema.org",
-            "@type": "LocalBusiness",
-            "@id": "https://www.fbtotalsecurity.com/#organization",
-            "name": "Franco Benedetto - Sistemi di Sicurezza",
-            "description": "Specialisti in sistemi di sicurezza avanzati: nebbiogeni, grate e inferriate blindate certificate, videosorveglianza AI e allarmi wireless",
-            "url": window.location.origin,
-            "telephone": "+393802647367",
-            "address": {
-                "@type": "PostalAddress",
-                "addressLocality": "Italia"
-            },
-            "openingHours": "Mo-Fr 09:00-18:00",
-            "priceRange": "€€€",
-            "hasOfferCatalog": {
-                "@type": "OfferCatalog",
-                "name": "Servizi di Sicurezza",
-                "itemListElement": Object.keys(this.aiKeywords).map(service => ({
-                    "@type": "Offer",
-                    "itemOffered": {
-                        "@type": "Service",
-                        "name": this.getServiceDisplayName(service)
-                    }
-                }))
-            }
-        };
-    }
-
-    getBreadcrumbData() {
-        return {
-            "@context": "https://schema.org",
-            "@type": "BreadcrumbList",
-            "@id": "https://www.fbtotalsecurity.com/#breadcrumb",
-            "itemListElement": [
-                {
-                    "@type": "ListItem",
-                    "position": 1,
-                    "name": "Home",
-                    "item": window.location.origin
-                },
-                {
-                    "@type": "ListItem", 
-                    "position": 2,
-                    "name": "Servizi di Sicurezza",
-                    "item": `${window.location.origin}#servizi`
-                }
-            ]
-        };
-    }
-
     // UTILITY METHODS
     detectCurrentSection() {
         const sections = ['nebbiogeni', 'grate e inferriate blindate', 'videosorveglianza', 'allarmi'];
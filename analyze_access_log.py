@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per analizzare l'access log JSON scritto da server.py e https_server.py
+(--access-log). Riporta:
+  - gli asset più richiesti (richieste e byte trasferiti)
+  - le transizioni di navigazione pagina → pagina (dal referer)
+  - le risposte più lente (p50, p95 e massimo per percorso)
+  - la quota di risposte servite dalla cache in memoria
+Salva le statistiche in .access-stats.json: server.py --warm precarica in
+memoria gli asset più richiesti all'avvio, generate_speculation_rules.py può
+leggere le transizioni direttamente dal log
+"""
+
+import os
+import json
+import math
+import argparse
+from urllib.parse import urlsplit
+
+import access_log
+
+STATS_FILE = '.access-stats.json'
+DEFAULT_TOP = 10
+
+# Limiti della lista di asset da precaricare
+WARM_MAX_FILES = 50
+WARM_MAX_BYTES = 32 * 1024 * 1024
+
+SITE_HOSTS = ('www.fbtotalsecurity.com', 'fbtotalsecurity.com', 'localhost', '127.0.0.1')
+
+def read_records(path):
+    """Righe del log valide; le righe troncate (scrittura interrotta) vengono saltate"""
+    records = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get('path') and record.get('status'):
+                records.append(record)
+    return records
+
+def page_path(path):
+    """Percorso normalizzato: / e le cartelle puntano a index.html"""
+    return path + 'index.html' if path.endswith('/') else path
+
+def referer_path(referer):
+    """Percorso della pagina di provenienza, se è una pagina del sito"""
+    if not referer:
+        return None
+    parts = urlsplit(referer)
+    if parts.hostname not in SITE_HOSTS:
+        return None
+    return page_path(parts.path or '/')
+
+def percentile(values, fraction):
+    """Percentile con il metodo nearest-rank su una lista ordinata"""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+def hot_assets(records):
+    """Percorsi serviti con successo, dal più richiesto"""
+    assets = {}
+    for record in records:
+        if record.get('method') not in ('GET', 'HEAD') or record['status'] != 200:
+            continue
+        entry = assets.setdefault(page_path(record['path']), {'requests': 0, 'bytes': 0})
+        entry['requests'] += 1
+        entry['bytes'] += record.get('bytes') or 0
+    return sorted(({'path': path, **entry} for path, entry in assets.items()),
+                  key=lambda entry: (-entry['requests'], -entry['bytes'], entry['path']))
+
+def transitions(records):
+    """Navigazioni tra pagine HTML: {pagina di provenienza: {pagina: richieste}}"""
+    result = {}
+    for record in records:
+        target = page_path(record['path'])
+        if not target.endswith('.html') or record['status'] >= 400:
+            continue
+        source = referer_path(record.get('referer'))
+        if source is None or source == target or not source.endswith('.html'):
+            continue
+        result.setdefault(source, {})
+        result[source][target] = result[source].get(target, 0) + 1
+    return result
+
+def slowest(records):
+    """Durate per percorso (p50, p95, massimo), dal p95 più alto"""
+    durations = {}
+    for record in records:
+        if record.get('duration_ms') is not None:
+            durations.setdefault(page_path(record['path']), []).append(record['duration_ms'])
+    result = []
+    for path, values in durations.items():
+        values.sort()
+        result.append({'path': path, 'requests': len(values), 'p50_ms': percentile(values, 0.5),
+                       'p95_ms': percentile(values, 0.95), 'max_ms': values[-1]})
+    return sorted(result, key=lambda entry: (-entry['p95_ms'], entry['path']))
+
+def cache_ratio(records):
+    """(hit, richieste servite dalla cache in memoria o caricate in essa)"""
+    statuses = [record.get('cache') for record in records if record.get('cache')]
+    return statuses.count('hit'), len(statuses)
+
+def warm_list(assets, max_files=WARM_MAX_FILES, max_bytes=WARM_MAX_BYTES):
+    """Asset da precaricare: i più richiesti, entro numero e dimensione massimi"""
+    selected = []
+    total = 0
+    for entry in assets:
+        size = entry['bytes'] // entry['requests'] if entry['requests'] else 0
+        if len(selected) >= max_files:
+            break
+        if total + size > max_bytes:
+            continue
+        selected.append(entry['path'])
+        total += size
+    return selected
+
+def analyze(records):
+    assets = hot_assets(records)
+    hits, cached = cache_ratio(records)
+    return {
+        'requests': len(records),
+        'cache': {'hits': hits, 'lookups': cached},
+        'hot_assets': assets,
+        'warm': warm_list(assets),
+        'transitions': transitions(records),
+        'slowest': slowest(records),
+    }
+
+def warm_paths(stats_file=STATS_FILE):
+    """Percorsi URL da precaricare secondo le statistiche salvate (vuoto se mancano)"""
+    if not os.path.exists(stats_file):
+        return []
+    try:
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('warm', [])
+    except (OSError, ValueError):
+        return []
+
+def main():
+    parser = argparse.ArgumentParser(description="Analizza l'access log JSON dei server locali")
+    parser.add_argument('log', nargs='?', default=access_log.DEFAULT_LOG_FILE,
+                        help=f'access log (default: {access_log.DEFAULT_LOG_FILE})')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help=f'righe per sezione (default: {DEFAULT_TOP})')
+    parser.add_argument('--output', default=STATS_FILE, help=f'file delle statistiche (default: {STATS_FILE})')
+    parser.add_argument('--dry-run', action='store_true', help='mostra il report senza salvare le statistiche')
+    args = parser.parse_args()
+
+    print("📈 Analisi access log")
+    print("=" * 50)
+
+    if not os.path.exists(args.log):
+        print(f"❌ {args.log} non trovato: avvia il server con --access-log")
+        raise SystemExit(1)
+
+    stats = analyze(read_records(args.log))
+    print(f"📄 Richieste: {stats['requests']}")
+    if stats['cache']['lookups']:
+        print(f"💾 Cache in memoria: {stats['cache']['hits']}/{stats['cache']['lookups']} hit "
+              f"({stats['cache']['hits'] / stats['cache']['lookups'] * 100:.0f}%)")
+
+    print(f"\n🔥 Asset più richiesti:")
+    for entry in stats['hot_assets'][:args.top]:
+        print(f"   {entry['requests']:>6}  {entry['bytes'] / 1024:>9.1f} KB  {entry['path']}")
+
+    print(f"\n🧭 Transizioni di navigazione:")
+    edges = sorted(((count, source, target) for source, targets in stats['transitions'].items()
+                    for target, count in targets.items()), key=lambda edge: (-edge[0], edge[1], edge[2]))
+    for count, source, target in edges[:args.top]:
+        print(f"   {count:>6}  {source} → {target}")
+    if not edges:
+        print("   (nessuna transizione con referer del sito)")
+
+    print(f"\n🐢 Risposte più lente:")
+    for entry in stats['slowest'][:args.top]:
+        print(f"   p95 {entry['p95_ms']:>8.1f} ms  p50 {entry['p50_ms']:>8.1f} ms  "
+              f"max {entry['max_ms']:>8.1f} ms  ({entry['requests']})  {entry['path']}")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"🔥 Asset da precaricare all'avvio: {len(stats['warm'])}")
+    if not args.dry_run:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"✅ Statistiche salvate in {args.output} (usale con server.py --warm)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analisi statica del layout thrashing nel JavaScript del sito
+Cerca le letture di geometria (offsetHeight, getBoundingClientRect,
+getComputedStyle...) che seguono una scrittura di stile o classe nello stesso
+blocco sincrono o nello stesso ciclo: ognuna forza un reflow. I risultati sono
+ordinati mettendo in cima quelli dentro handler di scroll, resize e rAF
+"""
+
+import os
+import glob
+import argparse
+
+import js_tokens
+import instrumentation
+
+# Proprietà la cui lettura forza il calcolo del layout
+READ_PROPERTIES = {
+    'offsetTop', 'offsetLeft', 'offsetWidth', 'offsetHeight', 'offsetParent',
+    'clientTop', 'clientLeft', 'clientWidth', 'clientHeight',
+    'scrollTop', 'scrollLeft', 'scrollWidth', 'scrollHeight',
+    'scrollX', 'scrollY', 'pageXOffset', 'pageYOffset',
+    'innerWidth', 'innerHeight', 'innerText',
+}
+READ_METHODS = {'getBoundingClientRect', 'getClientRects', 'getComputedStyle',
+                'elementFromPoint', 'scrollIntoView', 'focus'}
+
+# Scritture che invalidano stile o layout
+CLASS_METHODS = {'add', 'remove', 'toggle', 'replace'}
+CONTENT_PROPERTIES = {'className', 'innerHTML', 'outerHTML', 'textContent'}
+ASSIGNMENTS = {'=', '+=', '-=', '*=', '/=', '%=', '||=', '&&=', '??='}
+
+# Callback eseguite in modo sincrono (fanno parte del blocco che le chiama, come un ciclo)
+SYNC_ITERATORS = {'forEach', 'map', 'filter', 'some', 'every', 'find', 'findIndex',
+                  'reduce', 'flatMap'}
+LOOP_KEYWORDS = ('for', 'while', 'do')
+
+# Contesti "caldi": eseguiti a ogni frame o a ogni evento di scroll/resize
+EVENT_CONTEXTS = {'scroll': 'scroll', 'wheel': 'scroll', 'touchmove': 'scroll', 'resize': 'resize'}
+HOT_CONTEXTS = ('scroll', 'resize', 'rAF')
+
+DEFAULT_PATTERNS = ['script.js', 'ai-*.js', 'js/*.js']
+
+
+def classify_access(js, index):
+    """
+    Restituisce ('read'|'write', descrizione) se il token è un accesso al DOM
+    rilevante per il layout, altrimenti None
+    """
+    token = js.tokens[index]
+    if token.type != 'name':
+        return None
+    after_dot = js.is_token(index - 1, '.') or js.is_token(index - 1, '?.')
+    following = js.tokens[index + 1].value if index + 1 < len(js.tokens) else ''
+    assigned = following in ASSIGNMENTS
+
+    # el.style.prop = ..., el.style.setProperty(...)
+    if after_dot and js.is_token(index - 2, 'style', 'name'):
+        if assigned or following == '(' and token.value in ('setProperty', 'removeProperty'):
+            return 'write', f'style.{token.value}'
+    # el.classList.add(...)
+    if (after_dot and js.is_token(index - 2, 'classList', 'name') and
+            token.value in CLASS_METHODS and following == '('):
+        return 'write', f'classList.{token.value}()'
+    # el.setAttribute('class' | 'style', ...)
+    if after_dot and token.value == 'setAttribute' and following == '(':
+        args = js.arguments(index + 1)
+        if args and js_tokens.string_value(js.tokens[args[0][0]]) in ('class', 'style'):
+            return 'write', f"setAttribute('{js_tokens.string_value(js.tokens[args[0][0]])}')"
+    if after_dot and token.value in CONTENT_PROPERTIES and assigned:
+        return 'write', token.value
+
+    # Solo accessi a proprietà (window.scrollY): un nome nudo può essere una variabile locale
+    if token.value in READ_PROPERTIES and after_dot and not assigned:
+        return 'read', token.value
+    if token.value in READ_METHODS and following == '(':
+        if after_dot or token.value == 'getComputedStyle':
+            return 'read', f'{token.value}()'
+    return None
+
+
+def _call_name(js, open_index):
+    """Nome della funzione chiamata da una '(' (es. forEach, requestAnimationFrame)"""
+    if open_index > 0 and js.tokens[open_index - 1].type == 'name':
+        return js.tokens[open_index - 1].value
+    return None
+
+
+def _enclosing_call(js, start):
+    """'(' della chiamata di cui la funzione che inizia in start è un argomento"""
+    depth = js.depth[start]
+    for index in range(start - 1, -1, -1):
+        if js.depth[index] < depth:
+            if js.is_token(index, '(') and _call_name(js, index):
+                return index
+            return None
+    return None
+
+
+def _direct_context(js, call_open, arg_start):
+    """Contesto caldo di una callback passata alla chiamata indicata"""
+    name = _call_name(js, call_open)
+    if name == 'requestAnimationFrame':
+        return 'rAF'
+    if name == 'ResizeObserver':
+        return 'resize'
+    if name == 'addEventListener':
+        args = js.arguments(call_open)
+        if len(args) >= 2 and args[1][0] <= arg_start < args[1][1]:
+            return EVENT_CONTEXTS.get(js_tokens.string_value(js.tokens[args[0][0]]))
+    return None
+
+
+class FileAnalysis:
+    """Funzioni di un file con contesto di esecuzione e accessi al layout"""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.js = js_tokens.JSSource(source)
+        self.functions = self.js.functions()
+        self.contexts = self._contexts()
+
+    def _function_names(self):
+        """Nome -> indice della funzione (function f, const f = ..., metodi)"""
+        names = {}
+        for position, (start, _, _, _) in enumerate(self.functions):
+            js = self.js
+            if js.is_token(start, 'function', 'name') and js.tokens[start + 1].type == 'name':
+                names.setdefault(js.tokens[start + 1].value, position)
+            elif js.is_token(start - 1, '=') and js.tokens[start - 2].type == 'name':
+                names.setdefault(js.tokens[start - 2].value, position)
+            elif js.tokens[start].type == 'name' and js.is_token(start + 1, '('):
+                names.setdefault(js.tokens[start].value, position)
+        return names
+
+    def _enclosing(self, position):
+        """Indice della funzione che contiene la funzione indicata (la più interna)"""
+        start = self.functions[position][0]
+        best = None
+        for other, (_, _, body_start, body_end) in enumerate(self.functions):
+            if body_start <= start < body_end and (best is None or body_start > self.functions[best][2]):
+                best = other
+        return best
+
+    def _contexts(self):
+        js = self.js
+        direct = {}
+        # Callback inline passate a requestAnimationFrame / addEventListener
+        for position, (start, _, _, _) in enumerate(self.functions):
+            call_open = _enclosing_call(js, start)
+            if call_open is not None:
+                context = _direct_context(js, call_open, start)
+                if context:
+                    direct[position] = context
+        # Funzioni passate per nome, anche dentro throttle(...) o debounce(...)
+        names = self._function_names()
+        for call_name in ('requestAnimationFrame', 'addEventListener', 'ResizeObserver'):
+            for index, token in enumerate(js.tokens):
+                if token.value != call_name or not js.is_token(index + 1, '('):
+                    continue
+                for arg_start, arg_end in js.arguments(index + 1):
+                    context = _direct_context(js, index + 1, arg_start)
+                    if not context:
+                        continue
+                    for name_index in range(arg_start, arg_end):
+                        position = names.get(js.tokens[name_index].value)
+                        if js.tokens[name_index].type == 'name' and position is not None:
+                            direct.setdefault(position, context)
+
+        # Le funzioni annidate ereditano il contesto di chi le contiene
+        contexts = {}
+        for position in range(len(self.functions)):
+            current = position
+            while current is not None and current not in direct:
+                current = self._enclosing(current)
+            contexts[position] = direct.get(current)
+        return contexts
+
+    def _is_sync_callback(self, position):
+        start = self.functions[position][0]
+        call_open = _enclosing_call(self.js, start)
+        return call_open is not None and _call_name(self.js, call_open) in SYNC_ITERATORS
+
+    def _loop_ranges(self, body_start, body_end):
+        """Intervalli di token dei corpi dei cicli nel blocco"""
+        js = self.js
+        ranges = []
+        for index in range(body_start, body_end):
+            token = js.tokens[index]
+            if token.type != 'name' or token.value not in LOOP_KEYWORDS:
+                continue
+            body = index + 1
+            if token.value != 'do':
+                if not js.is_token(body, '(') or body not in js.pairs:
+                    continue
+                body = js.pairs[body] + 1
+            if js.is_token(body, '{') and body in js.pairs:
+                ranges.append((body + 1, js.pairs[body]))
+            else:
+                ranges.append((body, js._expression_end(body)))
+        return ranges
+
+    def scopes(self):
+        """
+        Blocchi sincroni: per ogni funzione (non callback sincrona) gli accessi al
+        layout in ordine, esclusi quelli delle funzioni annidate asincrone.
+        Il codice di primo livello è un blocco a sé (posizione None): le callback
+        sincrone e i cicli fuori da ogni funzione sono i suoi cicli
+        """
+        yield from self._scope(None, 0, len(self.js.tokens))
+        for position, (start, _, body_start, body_end) in enumerate(self.functions):
+            if self._is_sync_callback(position):
+                continue  # Analizzata come parte della funzione (o del file) che la contiene
+            yield from self._scope(position, body_start, body_end)
+
+    def _scope(self, position, body_start, body_end):
+        excluded = []
+        loops = self._loop_ranges(body_start, body_end)
+        for other, (other_start, _, other_body_start, other_body_end) in enumerate(self.functions):
+            if other == position or not body_start <= other_start < body_end:
+                continue
+            if self._is_sync_callback(other):
+                loops.append((other_body_start, other_body_end))
+            else:
+                excluded.append((other_start, other_body_end))
+        # I cicli dentro funzioni asincrone annidate appartengono a quelle
+        loops = [loop for loop in loops
+                 if not any(s <= loop[0] < e for s, e in excluded)]
+        accesses = []
+        index = body_start
+        while index < body_end:
+            skip = next((e for s, e in excluded if s <= index < e), None)
+            if skip is not None:
+                index = skip + 1
+                continue
+            access = classify_access(self.js, index)
+            if access:
+                accesses.append((index,) + access)
+            index += 1
+        if accesses:
+            yield position, accesses, loops
+
+    def findings(self):
+        js = self.js
+        results = {}
+        for position, accesses, loops in self.scopes():
+            context = self.contexts.get(position)
+            # Lettura dopo una scrittura nello stesso blocco: un reflow forzato;
+            # dopo la lettura il layout è pulito fino alla scrittura successiva
+            last_write = None
+            for index, kind, label in accesses:
+                if kind == 'write':
+                    last_write = (index, label)
+                elif last_write:
+                    results[index] = {'read': (index, label), 'write': last_write,
+                                      'loop': False, 'context': context}
+                    last_write = None
+            # Nei cicli la scrittura di un'iterazione precede la lettura della successiva
+            for loop_start, loop_end in loops:
+                inside = [access for access in accesses if loop_start <= access[0] < loop_end]
+                writes = [access for access in inside if access[1] == 'write']
+                reads = [access for access in inside if access[1] == 'read']
+                if writes and reads:
+                    read = reads[0]
+                    previous = results.get(read[0])
+                    write = previous['write'] if previous else (writes[-1][0], writes[-1][2])
+                    results[read[0]] = {'read': (read[0], read[2]), 'write': write,
+                                        'loop': True, 'context': context}
+
+        findings = []
+        for finding in results.values():
+            read_index, read_label = finding['read']
+            write_index, write_label = finding['write']
+            findings.append({
+                'file': self.path,
+                'line': js.tokens[read_index].line,
+                'read': read_label,
+                'write': write_label,
+                'write_line': js.tokens[write_index].line,
+                'loop': finding['loop'],
+                'context': finding['context'],
+            })
+        return findings
+
+
+def rank(finding):
+    """Prima i contesti caldi (scroll, resize, rAF), poi i cicli, poi per posizione"""
+    hot = finding['context'] in HOT_CONTEXTS
+    context_rank = HOT_CONTEXTS.index(finding['context']) if hot else len(HOT_CONTEXTS)
+    return (not hot, not finding['loop'], context_rank, finding['file'], finding['line'])
+
+
+def analyze_files(paths):
+    findings = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            analysis = FileAnalysis(path, f.read())
+        file_findings = analysis.findings()
+        print(f"📄 {path}: {len(analysis.functions)} funzioni, {len(file_findings)} sospetti")
+        findings.extend(file_findings)
+    return sorted(findings, key=rank)
+
+
+def format_finding(finding):
+    where = f"[{finding['context']}] " if finding['context'] else ''
+    loop = ' (nel ciclo)' if finding['loop'] else ''
+    return (f"{finding['file']}:{finding['line']} {where}{finding['read']} letto dopo "
+            f"{finding['write']} (riga {finding['write_line']}){loop}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cerca letture di layout dopo scritture di stile nel JavaScript',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', help='file da analizzare (default: script.js, ai-*.js, js/*.js)')
+    parser.add_argument('--hot-only', action='store_true',
+                        help='mostra solo i sospetti in handler di scroll, resize e rAF')
+    args = parser.parse_args()
+
+    print("🔍 Analisi layout thrashing (letture di geometria dopo scritture)")
+    print("=" * 50)
+
+    paths = args.files or sorted({path for pattern in DEFAULT_PATTERNS for path in glob.glob(pattern)
+                                  if not path.endswith(('.min.js', '_backup.js'))})
+    paths = [path for path in paths if os.path.exists(path)]
+    findings = analyze_files(paths)
+
+    hot = [finding for finding in findings if finding['context'] in HOT_CONTEXTS]
+    other = [finding for finding in findings if finding['context'] not in HOT_CONTEXTS]
+
+    if hot:
+        print(f"\n🔥 In handler di scroll/resize/rAF ({len(hot)}):")
+        for number, finding in enumerate(hot, 1):
+            print(f"   {number}. {format_finding(finding)}")
+    if other and not args.hot_only:
+        print(f"\n📋 Altri blocchi sincroni ({len(other)}):")
+        for number, finding in enumerate(other, len(hot) + 1):
+            print(f"   {number}. {format_finding(finding)}")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File analizzati: {len(paths)}")
+    print(f"🔥 Sospetti in contesti caldi: {len(hot)}")
+    print(f"🔧 Sospetti totali: {len(findings)}")
+    if not findings:
+        print(f"\n✅ Nessuna lettura di layout dopo scritture di stile")
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
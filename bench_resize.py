@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del ridimensionamento veloce (image_resize) rispetto al codice precedente
+Misura tempo, picco di memoria e differenza pixel per pixel rispetto all'output attuale
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+import numpy as np
+from PIL import Image
+
+import image_resize
+
+# Casi presi dagli script di ottimizzazione: (percorso, tipo, dimensione)
+# 'thumbnail' = optimize_image (max box), 'width' = optimize_webp_image/compress (larghezza massima)
+BENCH_CASES = [
+    ('icons/logo_sito_franco.webp', 'thumbnail', (47, 40)),
+    ('icons/logo_sito_franco.jpg', 'thumbnail', (47, 40)),
+    ('icons/copertina-youtube-URfog.webp', 'thumbnail', (380, 214)),
+    ('icons/CIVIS-copertina.webp', 'thumbnail', (380, 253)),
+    ('icons/CIVIS-copertina.png', 'thumbnail', (380, 253)),
+    ('icons/placeholder1-svg-ITLgroup.webp', 'thumbnail', (283, 266)),
+    ('icons/urfog-logo.png', 'thumbnail', (67, 26)),
+    ('icons/copertina-youtube-xecur-serramenti.jpg', 'thumbnail', (408, 214)),
+    ('icons/placeholder1-svg-chisiamo.png', 'width', 800),
+    ('icons/CIVIS-copertina.png', 'width', 500),
+    ('icons/copertina-youtube-xecur-serramenti.jpg', 'width', 400),
+]
+
+# Foto JPEG sintetica ad alta risoluzione (tipico scatto da fotocamera)
+LARGE_JPEG_SOURCE = 'icons/CIVIS-copertina.png'
+LARGE_JPEG_SIZE = (4608, 3072)
+
+REPEAT = 5
+
+
+def legacy_resize(input_path, kind, size):
+    """
+    Percorsi originali: convert a piena risoluzione + thumbnail (optimize_image)
+    oppure resize LANCZOS diretto alla larghezza massima (optimize_webp_image)
+    """
+    with Image.open(input_path) as img:
+        if kind == 'width':
+            width, height = img.size
+            if width <= size:
+                return img.copy()
+            return img.resize((size, int(height * (size / width))), Image.Resampling.LANCZOS)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        img.load()
+        return img
+
+
+def fast_resize(input_path, kind, size):
+    """Nuovo percorso: draft JPEG + reduce + LANCZOS finale, convert dopo la riduzione"""
+    with Image.open(input_path) as img:
+        if kind == 'width':
+            img = image_resize.resize_to_width(img, size)
+        else:
+            mode = 'RGB' if img.mode in ('RGBA', 'LA', 'P') else None
+            img = image_resize.thumbnail(img, size, mode)
+        img.load()
+        return img
+
+
+def reference_resize(input_path, kind, size):
+    """LANCZOS a piena risoluzione senza alcuna pre-riduzione (riferimento di qualità)"""
+    with Image.open(input_path) as img:
+        if kind == 'thumbnail' and img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        img.load()
+        if kind == 'width':
+            width, height = img.size
+            target = (min(size, width), int(height * (min(size, width) / width)))
+        else:
+            target = image_resize.fit_size(img.size, size)
+        return img.resize(target, Image.Resampling.LANCZOS, reducing_gap=None)
+
+
+VARIANTS = {
+    'legacy': legacy_resize,
+    'fast': fast_resize,
+    'reference': reference_resize,
+}
+
+
+def best_time(func, *args):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory_kb(variant, input_path, kind, size):
+    """
+    Picco di memoria residente misurato in un processo separato
+    (le allocazioni di Pillow avvengono in C e non sono visibili a tracemalloc)
+    """
+    if not os.path.exists('/proc/self/status'):
+        return None
+    size_arg = size if kind == 'width' else f'{size[0]}x{size[1]}'
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', variant, input_path, kind, str(size_arg)],
+        capture_output=True, text=True, check=True).stdout
+    return json.loads(output)['peak_kb']
+
+
+def _vm_hwm_kb():
+    # VmHWM riparte da zero dopo exec, a differenza di ru_maxrss che eredita il valore del padre
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    return 0
+
+
+def pixel_difference(img_a, img_b):
+    """Differenza massima, media e PSNR tra due immagini della stessa dimensione"""
+    a = np.asarray(img_a, dtype=np.float64)
+    b = np.asarray(img_b, dtype=np.float64)
+    diff = np.abs(a - b)
+    mse = float((diff ** 2).mean())
+    psnr = float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+    return float(diff.max()), float(diff.mean()), psnr
+
+
+def run_child(variant, input_path, kind, size_arg):
+    size = int(size_arg) if kind == 'width' else tuple(int(v) for v in size_arg.split('x'))
+    baseline = _vm_hwm_kb()
+    VARIANTS[variant](input_path, kind, size)
+    print(json.dumps({'peak_kb': _vm_hwm_kb() - baseline}))
+
+
+def make_large_jpeg(directory):
+    """Crea una foto JPEG grande per misurare il beneficio di draft()"""
+    path = os.path.join(directory, 'large-photo.jpg')
+    with Image.open(LARGE_JPEG_SOURCE) as img:
+        img.convert('RGB').resize(LARGE_JPEG_SIZE, Image.Resampling.BICUBIC).save(path, 'JPEG', quality=90)
+    return path
+
+
+def run_case(input_path, kind, size):
+    with Image.open(input_path) as img:
+        source_size = img.size
+
+    legacy_time = best_time(legacy_resize, input_path, kind, size)
+    fast_time = best_time(fast_resize, input_path, kind, size)
+
+    legacy_img = legacy_resize(input_path, kind, size)
+    fast_img = fast_resize(input_path, kind, size)
+    reference_img = reference_resize(input_path, kind, size)
+    if legacy_img.size != fast_img.size:
+        print(f"❌ {input_path}: dimensioni diverse {legacy_img.size} vs {fast_img.size}")
+        return 0.0, 0.0
+
+    max_diff, mean_diff, psnr = pixel_difference(legacy_img, fast_img)
+    _, ref_mean_legacy, _ = pixel_difference(reference_img, legacy_img)
+    _, ref_mean_fast, _ = pixel_difference(reference_img, fast_img)
+
+    legacy_mem = peak_memory_kb('legacy', input_path, kind, size)
+    fast_mem = peak_memory_kb('fast', input_path, kind, size)
+
+    print(f"\n📸 {os.path.basename(input_path)} [{kind}] "
+          f"({source_size[0]}x{source_size[1]} -> {fast_img.size[0]}x{fast_img.size[1]})")
+    print(f"   Tempo: {legacy_time*1000:.1f} ms -> {fast_time*1000:.1f} ms ({legacy_time/fast_time:.1f}x)")
+    if legacy_mem is not None:
+        print(f"   Picco memoria: {legacy_mem:,} KB -> {fast_mem:,} KB")
+    print(f"   Differenza vs output attuale: max {max_diff:.0f}, media {mean_diff:.2f}, PSNR {psnr:.1f} dB")
+    print(f"   Errore medio vs LANCZOS pieno: attuale {ref_mean_legacy:.2f}, nuovo {ref_mean_fast:.2f}")
+    return legacy_time, fast_time
+
+
+def main():
+    if len(sys.argv) == 6 and sys.argv[1] == '--child':
+        run_child(*sys.argv[2:])
+        return
+
+    print("⏱️  Benchmark ridimensionamento immagini (legacy vs draft/reduce)")
+    print("=" * 70)
+
+    total_legacy = 0.0
+    total_fast = 0.0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = list(BENCH_CASES)
+        if os.path.exists(LARGE_JPEG_SOURCE):
+            large_jpeg = make_large_jpeg(tmp_dir)
+            cases += [(large_jpeg, 'thumbnail', (380, 253)), (large_jpeg, 'width', 800)]
+
+        for input_path, kind, size in cases:
+            if not os.path.exists(input_path):
+                print(f"⚠️  File non trovato: {input_path}")
+                continue
+            legacy_time, fast_time = run_case(input_path, kind, size)
+            total_legacy += legacy_time
+            total_fast += fast_time
+
+    print("\n" + "=" * 70)
+    if total_fast:
+        print(f"⚡ Tempo totale: {total_legacy*1000:.1f} ms -> {total_fast*1000:.1f} ms "
+              f"({total_legacy/total_fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
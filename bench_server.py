@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del server locale: file da disco (dist/) rispetto all'archivio
+mappato in memoria (server.py --pack)
+Ogni modalità gira in un processo separato con connessioni keep-alive; i
+client richiedono a rotazione tutti i file del bundle e si misurano richieste
+al secondo, latenza e tempo di avvio. A parte si misura il solo accesso ai
+file (percorso, stat, open e lettura contro ricerca nell'indice), senza HTTP
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import http.client
+import http.server
+import multiprocessing
+from functools import partial
+from urllib.parse import quote, unquote
+
+import server
+import site_pack
+
+DEFAULT_REQUESTS = 4000
+DEFAULT_CLIENTS = 4
+ACCESS_REPEAT = 20
+
+
+class DiskHandler(server.SecureHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Header e corpo sono scritture separate: con Nagle ogni risposta aspetterebbe l'ACK ritardato
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PackHandler(server.PackedRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Header e corpo sono scritture separate: con Nagle ogni risposta aspetterebbe l'ACK ritardato
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(mode, dist, pack_path, ready):
+    """Processo server: comunica porta e tempo di avvio, poi serve fino alla terminazione"""
+    start = time.perf_counter()
+    if mode == 'pack':
+        PackHandler.pack = site_pack.PackedSite(pack_path)
+        handler = PackHandler
+    else:
+        handler = partial(DiskHandler, directory=dist)
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    ready.put((httpd.server_address[1], time.perf_counter() - start))
+    httpd.serve_forever()
+
+
+def client(port, urls, accept_encoding, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    for url in urls:
+        start = time.perf_counter()
+        connection.request('GET', url, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(f"{response.status} {url}")
+    connection.close()
+
+
+def run(mode, dist, pack_path, urls, requests, clients, accept_encoding=''):
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(mode, dist, pack_path, ready), daemon=True)
+    process.start()
+    try:
+        port, startup = ready.get(timeout=30)
+        # Riscaldamento: una richiesta per file (page cache e connessioni)
+        client(port, urls, accept_encoding, [], [])
+
+        per_client = requests // clients
+        latencies = []
+        errors = []
+        threads = [threading.Thread(target=client, args=(
+            port, [urls[(index * 7 + n) % len(urls)] for n in range(per_client)], accept_encoding, latencies, errors))
+            for index in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.join()
+
+    latencies.sort()
+    return {
+        'startup_ms': startup * 1000,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'errors': errors,
+    }
+
+
+def file_access(dist, pack_path, urls, repeat=ACCESS_REPEAT):
+    """Microsecondi per file: lettura da disco come SimpleHTTPRequestHandler e ricerca nell'archivio"""
+    paths = [os.path.join(dist, unquote(url).lstrip('/')) for url in urls]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            if os.path.isdir(path):
+                continue
+            with open(path, 'rb') as f:
+                os.fstat(f.fileno())
+                f.read()
+    disk = (time.perf_counter() - start) / (repeat * len(paths)) * 1e6
+
+    pack = site_pack.PackedSite(pack_path)
+    keys = [unquote(url) for url in urls]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for key in keys:
+            pack.lookup(key)
+    packed = (time.perf_counter() - start) / (repeat * len(keys)) * 1e6
+    pack.close()
+    return disk, packed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del server: disco vs archivio mappato')
+    parser.add_argument('--dist', default=site_pack.build.DIST_DIR, help='bundle da servire')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='richieste per modalità')
+    parser.add_argument('--clients', type=int, default=DEFAULT_CLIENTS, help='connessioni keep-alive parallele')
+    args = parser.parse_args()
+
+    print("⏱️  Benchmark server locale (disco vs archivio mmap)")
+    print("=" * 70)
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ {args.dist}/ non trovato: esegui prima il build")
+        sys.exit(1)
+
+    pack_path = os.path.join(os.path.dirname(os.path.abspath(args.dist)), 'bench-' + site_pack.PACK_FILE)
+    summary = site_pack.build_pack(args.dist, pack_path)
+    pack = site_pack.PackedSite(pack_path)
+    urls = [quote(url) for url in sorted(pack.entries)]
+    pack.close()
+    print(f"📦 {summary['files']} file, {summary['bytes'] / 1024 / 1024:.1f} MB, "
+          f"{args.requests} richieste con {args.clients} connessioni")
+
+    try:
+        results = [
+            ('Disco (identity)', run('disk', args.dist, pack_path, urls, args.requests, args.clients)),
+            ('Archivio (identity)', run('pack', args.dist, pack_path, urls, args.requests, args.clients)),
+            ('Archivio (gzip/br)', run('pack', args.dist, pack_path, urls, args.requests, args.clients,
+                                       'gzip, br')),
+        ]
+        disk_us, pack_us = file_access(args.dist, pack_path, urls)
+    finally:
+        os.remove(pack_path)
+
+    baseline = results[0][1]['rps']
+    for name, result in results:
+        print(f"\n🖥️  {name}")
+        print(f"   Avvio: {result['startup_ms']:.1f} ms")
+        print(f"   Throughput: {result['rps']:,.0f} richieste/s ({result['rps'] / baseline:.2f}x)")
+        print(f"   Latenza: p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms")
+        if result['errors']:
+            print(f"   ❌ {len(result['errors'])} risposte non 200 (es. {result['errors'][0]})")
+
+    print("\n" + "=" * 70)
+    print(f"📂 Accesso ai file (senza HTTP): disco {disk_us:.1f} µs/file -> archivio {pack_us:.2f} µs/file "
+          f"({disk_us / pack_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
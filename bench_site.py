@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark degli strumenti di ottimizzazione su siti sintetici di grandi dimensioni
+Per ogni scala (default 100, 1.000 e 10.000 pagine) genera in una cartella
+temporanea un sito derivato da index.html, styles.css e script.js: pagine con
+titolo, testo e galleria di immagini propri, CSS e JS di più MB, migliaia di
+immagini ritagliate dalle foto in icons/. Su quel sito esegue minificatori,
+correttori HTML, hash CSP, pipeline immagini, archivio e server, ciascuno in un
+processo separato, e misura throughput e picco di memoria residente.
+Il confronto tra scale stima l'esponente di crescita di ogni strumento
+(1.0 = lineare) e segnala quelli superlineari prima di aggiungere pagine al sito
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import queue
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from contextlib import redirect_stdout
+from urllib.parse import quote
+
+from PIL import Image
+
+import build
+import fix_cls
+import minify_js
+import csp_policy
+import minify_css
+import site_pack
+import bench_server
+import optimize_lcp
+import html_document
+import image_manifest
+import optimize_images
+import instrumentation
+import calculate_csp_hashes
+import optimize_resource_hints
+
+DEFAULT_SCALES = (100, 1000, 10000)
+
+# CSS e JS crescono con la radice del numero di pagine: ~0.8 MB a 100 pagine, 8 MB al massimo
+BUNDLE_MB_AT_100_PAGES = 0.8
+MAX_BUNDLE_MB = 8
+IMAGES_PER_PAGE = 4
+# Immagini sorgente distinte: due per pagina, fino a qualche migliaio
+IMAGES_PER_SCALE_PAGE = 2
+MAX_IMAGES = 3000
+IMAGE_WIDTHS = (320, 1600)
+IMAGE_MAX_WIDTH = 800
+
+TEMPLATE_PAGE = 'index.html'
+TEMPLATE_CSS = 'styles.css'
+TEMPLATE_JS = 'script.js'
+IMAGE_SOURCE_DIR = 'icons'
+SYNTHETIC_IMAGE_DIR = 'icons/bench'
+
+DEFAULT_REQUESTS = 2000
+DEFAULT_CLIENTS = 4
+
+# Esponente oltre il quale uno strumento è considerato superlineare; i tempi
+# troppo brevi sono dominati dal rumore e non vengono valutati
+SUPERLINEAR_EXPONENT = 1.15
+MIN_SECONDS = 0.05
+
+TITLE_PATTERN = re.compile(r'(<title[^>]*>)(.*?)(</title>)', re.DOTALL)
+H1_PATTERN = re.compile(r'(<h1[^>]*>)(.*?)(</h1>)', re.DOTALL)
+
+MB = 1024 * 1024
+
+
+def scale_profile(pages, css_mb=None, js_mb=None, images=None):
+    """Dimensioni del sito sintetico per un numero di pagine"""
+    bundle_mb = min(MAX_BUNDLE_MB, BUNDLE_MB_AT_100_PAGES * math.sqrt(pages / 100))
+    return {
+        'pages': pages,
+        'css_bytes': int((css_mb or bundle_mb) * MB),
+        'js_bytes': int((js_mb or bundle_mb) * MB),
+        'images': images or min(MAX_IMAGES, IMAGES_PER_SCALE_PAGE * pages),
+    }
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def repeat_to_size(chunk, target_bytes, wrap):
+    """Copie numerate di chunk fino a target_bytes (almeno una)"""
+    parts = []
+    size = 0
+    copy = 0
+    while size < target_bytes or not parts:
+        part = wrap(chunk, copy)
+        parts.append(part)
+        size += len(part.encode('utf-8'))
+        copy += 1
+    return ''.join(parts)
+
+
+def wrap_css(css, copy):
+    return f"/* Copia {copy} */\n{css}\n"
+
+
+def wrap_js(js, copy):
+    # Ogni copia nel proprio scope: le dichiarazioni top-level non collidono
+    return f";(function () {{\n// Copia {copy}\n{js}\n}})();\n"
+
+
+def source_images():
+    """Foto raster di icons/ (esclusi SVG e varianti _small) decodificate una volta"""
+    images = []
+    for name in sorted(os.listdir(IMAGE_SOURCE_DIR)):
+        if not name.lower().endswith(('.webp', '.png', '.jpg', '.jpeg')) or '_small' in name:
+            continue
+        try:
+            with Image.open(os.path.join(IMAGE_SOURCE_DIR, name)) as img:
+                if min(img.size) >= 64:
+                    images.append(img.convert('RGB'))
+        except OSError:
+            # Formati non decodificabili da Pillow (es. WebP animati o non supportati)
+            continue
+    return images
+
+
+def generate_images(root, count, sources, rng):
+    """Ritagli ridimensionati delle foto reali, in JPEG e WebP alternati; restituisce i percorsi URL"""
+    os.makedirs(os.path.join(root, SYNTHETIC_IMAGE_DIR), exist_ok=True)
+    paths = []
+    for index in range(count):
+        img = sources[index % len(sources)]
+        width, height = img.size
+        crop_width = int(width * rng.uniform(0.5, 1.0))
+        crop_height = int(height * rng.uniform(0.5, 1.0))
+        left = rng.randint(0, width - crop_width)
+        top = rng.randint(0, height - crop_height)
+        target_width = rng.randint(*IMAGE_WIDTHS)
+        target = (target_width, max(1, round(crop_height * target_width / crop_width)))
+        image = img.crop((left, top, left + crop_width, top + crop_height)).resize(target, Image.Resampling.BILINEAR)
+
+        extension, format_name, quality = ('.jpg', 'JPEG', 88) if index % 2 == 0 else ('.webp', 'WEBP', 85)
+        rel_path = f"{SYNTHETIC_IMAGE_DIR}/img-{index:05d}{extension}"
+        image.save(os.path.join(root, rel_path), format_name, quality=quality)
+        paths.append(rel_path)
+    return paths
+
+
+def render_page(template, number, images):
+    """Variante della pagina modello con titolo, testo e galleria propri (senza width/height sulle immagini)"""
+    title = f"Pagina di prova {number} | FB Total Security"
+    page = TITLE_PATTERN.sub(lambda m: m.group(1) + title + m.group(3), template, count=1)
+    page = H1_PATTERN.sub(lambda m: m.group(1) + f"Soluzione di sicurezza n. {number}" + m.group(3), page, count=1)
+    gallery = ''.join(f'\n            <img src="{src}" alt="Installazione {number}-{index}" loading="lazy">'
+                      for index, src in enumerate(images))
+    section = (f'    <section class="bench-gallery">\n'
+               f'        <h2>Installazioni della pagina {number}</h2>\n'
+               f'        <p>Testo descrittivo generato per la pagina {number} del sito di prova.</p>'
+               f'{gallery}\n    </section>\n')
+    return page.replace('</main>', section + '    </main>', 1)
+
+
+def generate_site(root, profile, seed=0):
+    """Scrive il sito sintetico in root; restituisce pagine, immagini e byte scritti"""
+    rng = random.Random(seed)
+    os.makedirs(root)
+    # Le immagini reali servono alle pagine (logo, hero); quelle sintetiche alle gallerie
+    shutil.copytree(IMAGE_SOURCE_DIR, os.path.join(root, IMAGE_SOURCE_DIR))
+    images = generate_images(root, profile['images'], source_images(), rng)
+
+    # .min con il sorgente non minificato: i correttori trovano i fogli di stile anche
+    # se la minificazione non viene misurata
+    css = repeat_to_size(_read(TEMPLATE_CSS), profile['css_bytes'], wrap_css)
+    js = repeat_to_size(_read(TEMPLATE_JS), profile['js_bytes'], wrap_js)
+    for name, content in ((TEMPLATE_CSS, css), ('styles.min.css', css), (TEMPLATE_JS, js), ('script.min.js', js)):
+        _write(os.path.join(root, name), content)
+
+    template = _read(TEMPLATE_PAGE)
+    pages = []
+    for number in range(profile['pages']):
+        name = TEMPLATE_PAGE if number == 0 else f"pagina-{number:05d}.html"
+        gallery = [images[(number * IMAGES_PER_PAGE + index) % len(images)] for index in range(IMAGES_PER_PAGE)]
+        path = os.path.join(root, name)
+        _write(path, render_page(template, number, gallery))
+        pages.append(path)
+
+    return {'root': root, 'pages': pages, 'images': images, 'bytes': tree_bytes(root)}
+
+
+def tree_bytes(root):
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, names in os.walk(root) for name in names)
+
+
+def run_minify_css(site):
+    css = _read(os.path.join(site['root'], TEMPLATE_CSS))
+    _write(os.path.join(site['root'], 'styles.min.css'), minify_css.minify_css(css))
+    return len(css.encode('utf-8')) / MB
+
+
+def run_minify_js(site):
+    js = _read(os.path.join(site['root'], TEMPLATE_JS))
+    _write(os.path.join(site['root'], 'script.min.js'), minify_js.minify_js(js))
+    return len(js.encode('utf-8')) / MB
+
+
+def run_image_manifest(site):
+    return len(image_manifest.build_manifest(site['root']))
+
+
+def run_fix_cls(site):
+    manifest = image_manifest.load_manifest(site['root'])
+    for path in site['pages']:
+        fix_cls.process_html_file(path, manifest)
+    return len(site['pages'])
+
+
+def run_optimize_lcp(site):
+    manifest = image_manifest.load_manifest(site['root'])
+    for path in site['pages']:
+        optimize_lcp.process_html_file(path, manifest)
+    return len(site['pages'])
+
+
+def run_resource_hints(site):
+    for path in site['pages']:
+        optimize_resource_hints.process_html_file(path)
+    return len(site['pages'])
+
+
+def run_csp_hashes(site):
+    results, _ = calculate_csp_hashes.collect_hashes(site['pages'], {})
+    calculate_csp_hashes.build_policy(csp_policy.CONTENT_SECURITY_POLICY, results)
+    return len(site['pages'])
+
+
+def run_images(site):
+    output_dir = site['root'] + '-images'
+    os.makedirs(output_dir, exist_ok=True)
+    for rel_path in site['images']:
+        output = os.path.join(output_dir, os.path.splitext(os.path.basename(rel_path))[0] + '.webp')
+        optimize_images.optimize_webp_image(os.path.join(site['root'], rel_path), output, max_width=IMAGE_MAX_WIDTH)
+    return len(site['images'])
+
+
+def compressible_bytes(root):
+    """Byte che site_pack.build_pack comprime con gzip (i file testuali abbastanza grandi)"""
+    sizes = (os.path.getsize(os.path.join(dirpath, name))
+             for dirpath, _, names in os.walk(root) for name in names
+             if name.endswith(build.COMPRESS_EXTENSIONS))
+    return sum(size for size in sizes if size >= build.MIN_COMPRESS_BYTES)
+
+
+def run_pack(site):
+    # Il tempo del pack è quasi tutto gzip -9 dei file testuali (compresi quelli
+    # scritti dagli strumenti precedenti): le immagini sono solo copiate
+    site_pack.build_pack(site['root'], site['root'] + '.pack')
+    return compressible_bytes(site['root']) / MB
+
+
+# (nome, unità del lavoro, funzione): l'ordine è quello del build, così ogni
+# strumento trova i file prodotti dai precedenti
+TOOLS = [
+    ('minify-css', 'MB', run_minify_css),
+    ('minify-js', 'MB', run_minify_js),
+    ('image-manifest', 'immagini', run_image_manifest),
+    ('fix-cls', 'pagine', run_fix_cls),
+    ('optimize-lcp', 'pagine', run_optimize_lcp),
+    ('resource-hints', 'pagine', run_resource_hints),
+    ('csp-hashes', 'pagine', run_csp_hashes),
+    ('images', 'immagini', run_images),
+    ('pack', 'MB', run_pack),
+]
+SERVER_TOOL = 'server'
+
+
+def _rss_kb(field):
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak_rss():
+    """Riporta VmHWM al residente attuale (Linux); False se non è possibile"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def measure_child(name, function, site, results):
+    """
+    Esegue lo strumento nel processo figlio: il picco di memoria residente
+    (VmHWM, comprese le allocazioni di Pillow in C) è solo suo
+    """
+    baseline = _rss_kb('VmRSS') if _reset_peak_rss() else None
+    start_us = instrumentation.now_us()
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            with instrumentation.stage(name, cat='bench'):
+                units = function(site)
+            elapsed = time.perf_counter() - start
+    except Exception as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+        return
+    results.put({
+        'seconds': elapsed,
+        'units': units,
+        'peak_mb': (_rss_kb('VmHWM') - baseline) / 1024 if baseline is not None else None,
+        # Le fasi interne (tokenizzazione, encode, ...) tornano al trace del processo principale
+        'events': [event for event in instrumentation.events() if event['ts'] >= start_us],
+    })
+
+
+def measure(name, function, site):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        # Senza fork lo strumento gira nel processo principale e la memoria non viene misurata
+        results = queue.Queue()
+        measure_child(name, function, site, results)
+        result = results.get()
+        result['peak_mb'] = None
+    else:
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        process = context.Process(target=measure_child, args=(name, function, site, results))
+        process.start()
+        while True:
+            try:
+                result = results.get(timeout=1)
+                break
+            except queue.Empty:
+                if not process.is_alive():
+                    result = {'error': f"processo terminato con codice {process.exitcode}"}
+                    break
+        process.join()
+    instrumentation.add_events(result.pop('events', []))
+    return result
+
+
+def measure_servers(site, requests, clients):
+    """Richieste/s e latenza dei server su disco e su archivio, con tutte le URL del sito"""
+    pack_path = site['root'] + '.pack'
+    if not os.path.exists(pack_path):
+        site_pack.build_pack(site['root'], pack_path)
+    pack = site_pack.PackedSite(pack_path)
+    urls = [quote(url) for url in sorted(pack.entries)]
+    pack.close()
+    return {mode: bench_server.run(mode, site['root'], pack_path, urls, requests, clients)
+            for mode in ('disk', 'pack')}
+
+
+def format_memory(peak_mb):
+    return f"picco +{peak_mb:,.1f} MB" if peak_mb is not None else "picco n/d"
+
+
+def run_scale(pages, args, selected, work_dir):
+    profile = scale_profile(pages, args.css_mb, args.js_mb, args.images)
+    root = os.path.join(work_dir, f"site-{pages}")
+
+    start = time.perf_counter()
+    with instrumentation.stage('generate', pages=pages):
+        site = generate_site(root, profile, args.seed)
+    print(f"\n🏗️  Sito da {pages:,} pagine: CSS {profile['css_bytes'] / MB:.1f} MB, "
+          f"JS {profile['js_bytes'] / MB:.1f} MB, {len(site['images']):,} immagini, "
+          f"{site['bytes'] / MB:,.0f} MB totali (generato in {time.perf_counter() - start:.1f}s)")
+
+    results = {'profile': profile, 'tools': {}}
+    for name, unit, function in TOOLS:
+        if name not in selected:
+            continue
+        result = measure(name, function, site)
+        if 'error' in result:
+            print(f"   ❌ {name:<16} {result['error']}")
+            continue
+        result['unit'] = unit
+        results['tools'][name] = result
+        print(f"   {name:<16} {result['seconds']:>9.2f} s  "
+              f"{result['units'] / result['seconds']:>11,.1f} {unit}/s  {format_memory(result['peak_mb'])}")
+
+    if SERVER_TOOL in selected:
+        servers = measure_servers(site, args.requests, args.clients)
+        results['servers'] = servers
+        for mode, label in (('disk', 'server disco'), ('pack', 'server archivio')):
+            server = servers[mode]
+            print(f"   {label:<16} {server['rps']:>9,.0f} richieste/s  p95 {server['p95_ms']:.2f} ms  "
+                  f"avvio {server['startup_ms']:.0f} ms")
+            if server['errors']:
+                print(f"      ❌ {len(server['errors'])} risposte non 200 (es. {server['errors'][0]})")
+
+    if not args.keep:
+        for path in (root, root + '-images'):
+            shutil.rmtree(path, ignore_errors=True)
+        if os.path.exists(root + '.pack'):
+            os.remove(root + '.pack')
+    return results
+
+
+def scaling_exponent(before, after):
+    """Esponente di crescita del tempo rispetto al lavoro: log(t2/t1) / log(n2/n1)"""
+    if after['units'] == before['units'] or min(before['seconds'], after['seconds']) < MIN_SECONDS:
+        return None
+    return math.log(after['seconds'] / before['seconds']) / math.log(after['units'] / before['units'])
+
+
+def scaling(results):
+    """{strumento: [(scala, scala successiva, esponente)]} tra scale consecutive"""
+    scales = sorted(results)
+    exponents = {}
+    for name, _, _ in TOOLS:
+        for before, after in zip(scales, scales[1:]):
+            tools_before = results[before]['tools']
+            tools_after = results[after]['tools']
+            if name in tools_before and name in tools_after:
+                exponent = scaling_exponent(tools_before[name], tools_after[name])
+                exponents.setdefault(name, []).append((before, after, exponent))
+    return exponents
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark degli strumenti su siti sintetici di grandi dimensioni',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+                        help='numeri di pagine separati da virgola (default: 100,1000,10000)')
+    parser.add_argument('--tools', default=','.join([name for name, _, _ in TOOLS] + [SERVER_TOOL]),
+                        help='strumenti da misurare, separati da virgola (default: tutti)')
+    parser.add_argument('--css-mb', type=float, help='dimensione del CSS sintetico (default: cresce con le pagine)')
+    parser.add_argument('--js-mb', type=float, help='dimensione del JS sintetico (default: cresce con le pagine)')
+    parser.add_argument('--images', type=int, help=f'immagini sintetiche (default: 2 per pagina, max {MAX_IMAGES})')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='richieste per server e scala')
+    parser.add_argument('--clients', type=int, default=DEFAULT_CLIENTS, help='connessioni keep-alive parallele')
+    parser.add_argument('--seed', type=int, default=0, help='seme per ritagli e dimensioni delle immagini')
+    parser.add_argument('--work-dir', help='cartella in cui generare i siti (default: temporanea)')
+    parser.add_argument('--keep', action='store_true', help='non cancellare i siti generati')
+    parser.add_argument('--output', help='salva i risultati in JSON')
+    args = parser.parse_args()
+
+    scales = sorted({int(scale) for scale in args.scales.split(',') if scale.strip()})
+    selected = {name.strip() for name in args.tools.split(',') if name.strip()}
+    unknown = selected - {name for name, _, _ in TOOLS} - {SERVER_TOOL}
+    if unknown:
+        print(f"❌ Strumenti sconosciuti: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    print(f"⏱️  Benchmark su siti sintetici ({', '.join(f'{scale:,}' for scale in scales)} pagine)")
+    print("=" * 70)
+
+    for path in (TEMPLATE_PAGE, TEMPLATE_CSS, TEMPLATE_JS, IMAGE_SOURCE_DIR):
+        if not os.path.exists(path):
+            print(f"❌ {path} non trovato: esegui il benchmark dalla radice del sito")
+            sys.exit(1)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='bench-site-')
+    os.makedirs(work_dir, exist_ok=True)
+    # Gli indici HTML delle pagine sintetiche restano nella cartella di lavoro, non nella cache del sito
+    os.environ[html_document.CACHE_DIR_ENV] = os.path.join(work_dir, 'html-index-cache')
+    results = {}
+    try:
+        for pages in scales:
+            results[pages] = run_scale(pages, args, selected, work_dir)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    exponents = scaling(results)
+    superlinear = []
+    if exponents:
+        print("\n" + "=" * 70)
+        print(f"📈 Crescita del tempo rispetto al lavoro (1.00 = lineare):")
+        for name, steps in exponents.items():
+            cells = []
+            for before, after, exponent in steps:
+                if exponent is None:
+                    cells.append(f"{before:,}→{after:,}: n/d")
+                    continue
+                flag = ' ⚠️' if exponent > SUPERLINEAR_EXPONENT else ''
+                cells.append(f"{before:,}→{after:,}: {exponent:.2f}{flag}")
+                if exponent > SUPERLINEAR_EXPONENT:
+                    superlinear.append((name, after, exponent))
+            print(f"   {name:<16} {'   '.join(cells)}")
+
+    print(f"\n📊 Riepilogo:")
+    if superlinear:
+        for name, pages, exponent in superlinear:
+            print(f"⚠️  {name}: superlineare fino a {pages:,} pagine (esponente {exponent:.2f})")
+    elif exponents:
+        print(f"✅ Nessuno strumento superlineare (soglia {SUPERLINEAR_EXPONENT})")
+    else:
+        print(f"ℹ️  Servono almeno due scale per stimare la crescita")
+    if args.keep:
+        print(f"📁 Siti generati in {work_dir}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'scales': results, 'exponents': exponents}, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"✅ Risultati salvati in {args.output}")
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build incrementale del sito: esegue gli script di ottimizzazione come un grafo
+di dipendenze (immagini → manifest → correzioni HTML e placeholder → minify → hash CSP →
+fingerprint → service worker → compressione → archivio per i server locali).
+Per ogni passo registra l'hash degli input in .build-state.json e lo riesegue
+solo se qualcosa è cambiato; i passi indipendenti vengono eseguiti in parallelo
+"""
+
+import os
+import sys
+import json
+import glob
+import gzip
+import shutil
+import fnmatch
+import hashlib
+import argparse
+import tempfile
+import time
+from io import StringIO
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import html_document
+import image_manifest
+import instrumentation
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATE_FILE = '.build-state.json'
+DIST_DIR = 'dist'
+
+# Pagine modificate dalle correzioni HTML
+HTML_PAGES = [
+    'index.html',
+    'sorveglianza.html',
+    'allarmi.html',
+    'serramenti.html',
+    'nebbiogeni.html',
+    'chi-siamo.html'
+]
+
+# Pagine di cui optimize_lcp.py e optimize_resource_hints.py riscrivono <img> e hint
+RESOURCE_HINT_PAGES = HTML_PAGES + ['lavora-con-noi.html', 'termini-condizioni.html']
+
+# File e cartelle che non vanno pubblicati nel bundle di deploy
+DEPLOY_EXCLUDED_DIRS = image_manifest.EXCLUDED_DIRS | {'icons_backup'}
+DEPLOY_EXCLUDED_FILES = ['*.py', '*.md', '*.jsonl', '*.txt', '*_backup.*', '.*',
+                         'server.crt', 'server.key', image_manifest.MANIFEST_FILE,
+                         'performance-budgets.json', '*.pack']
+DEPLOY_INCLUDED_FILES = ['robots.txt', '.htaccess']
+
+# Estensioni testuali da precomprimere (.gz, e .br se il modulo brotli è installato)
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt', '.webmanifest', '.ico')
+MIN_COMPRESS_BYTES = 256
+
+# Grafo della pipeline. Ogni passo è uno script esistente (eseguito in un processo
+# separato, come a mano) oppure una funzione di questo file. Gli input includono
+# lo script stesso e i moduli che usa, così una modifica al codice riesegue il passo
+PIPELINE = [
+    {
+        'name': 'images-critical',
+        'script': 'optimize_critical_images.py',
+        'inputs': ['image_resize.py', 'icons/logo_sito_franco.webp', 'icons/copertina-youtube-URfog.webp',
+                   'icons/XECUR-logo-carosello-homepage.webp', 'icons/itlgroup-logo-carosello-homepage.webp'],
+        'outputs': ['icons/*_small.webp'],
+        'deps': [],
+    },
+    {
+        'name': 'images-performance',
+        'script': 'optimize_images_performance.py',
+        'inputs': ['image_resize.py', 'icons/CIVIS-copertina.webp', 'icons/placeholder1-svg-ITLgroup.webp',
+                   'icons/placeholder2-svg-ITLgroup.webp', 'icons/thumbnail-xecur-optimized.webp'],
+        'outputs': ['icons/*-optimized.webp', 'icons/thumbnail-xecur-super-optimized.webp'],
+        'deps': [],
+    },
+    {
+        'name': 'svg',
+        'script': 'optimize_svg.py',
+        'inputs': ['minify_css.py', 'icons/*.svg'],
+        'outputs': ['icons/*.svg'],
+        'deps': [],
+    },
+    {
+        'name': 'manifest',
+        'script': 'image_manifest.py',
+        'inputs': ['icons/*'],
+        'outputs': [image_manifest.MANIFEST_FILE],
+        'deps': ['images-critical', 'images-performance', 'svg'],
+    },
+    {
+        'name': 'html-cls',
+        'script': 'fix_cls.py',
+        'inputs': ['html_document.py', 'image_manifest.py', image_manifest.MANIFEST_FILE] + HTML_PAGES,
+        'outputs': HTML_PAGES,
+        'deps': ['manifest'],
+    },
+    {
+        'name': 'lcp',
+        'script': 'optimize_lcp.py',
+        'inputs': ['html_document.py', 'image_manifest.py', image_manifest.MANIFEST_FILE] + RESOURCE_HINT_PAGES,
+        'outputs': RESOURCE_HINT_PAGES,
+        'deps': ['html-cls'],
+    },
+    {
+        # Dopo lcp: i placeholder vanno sulle immagini che restano con loading="lazy"
+        'name': 'placeholders',
+        'script': 'image_placeholders.py',
+        'inputs': ['image_manifest.py', image_manifest.MANIFEST_FILE] + HTML_PAGES,
+        'outputs': HTML_PAGES,
+        'deps': ['lcp'],
+    },
+    {
+        'name': 'resource-hints',
+        'script': 'optimize_resource_hints.py',
+        'inputs': ['html_document.py', 'optimize_lcp.py', 'image_manifest.py', image_manifest.MANIFEST_FILE,
+                   'styles.min.css', 'js/*.js'] + RESOURCE_HINT_PAGES,
+        'outputs': RESOURCE_HINT_PAGES,
+        'deps': ['placeholders', 'minify-css'],
+    },
+    {
+        'name': 'reflow',
+        'script': 'fix_forced_reflow.py',
+        'inputs': ['js_tokens.py', 'script.js'],
+        'outputs': ['script.js'],
+        'deps': [],
+    },
+    {
+        'name': 'minify-js',
+        'script': 'minify_js.py',
+        'inputs': ['script.js'],
+        'outputs': ['script.min.js'],
+        'deps': ['reflow'],
+    },
+    {
+        'name': 'minify-css',
+        'script': 'minify_css.py',
+        'inputs': ['styles.css'],
+        'outputs': ['styles.min.css'],
+        'deps': [],
+    },
+    {
+        'name': 'inline-scripts',
+        'script': 'extract_inline_scripts.py',
+        'inputs': ['html_document.py', 'js_tokens.py'] + RESOURCE_HINT_PAGES,
+        'outputs': RESOURCE_HINT_PAGES + ['js/inline-*.js'],
+        'deps': ['resource-hints'],
+    },
+    {
+        'name': 'sitemap',
+        'script': 'generate_sitemap.py',
+        'inputs': ['html_document.py', '*.html', '.sitemap-state.json'],
+        'outputs': ['sitemap.xml', 'ai-context-sitemap.json', '.sitemap-state.json'],
+        'deps': ['inline-scripts'],
+    },
+    {
+        'name': 'structured-data',
+        'script': 'compile_structured_data.py',
+        'inputs': ['html_document.py', 'structured-data.json', 'ai-*.json'] + RESOURCE_HINT_PAGES,
+        'outputs': RESOURCE_HINT_PAGES + ['schema-graph-*.json'],
+        'deps': ['sitemap'],
+    },
+    {
+        'name': 'jsonld-dedupe',
+        'script': 'optimize_jsonld.py',
+        'inputs': ['html_document.py', 'compile_structured_data.py', 'structured-data.json', 'ai-*.json'] +
+                  RESOURCE_HINT_PAGES,
+        'outputs': RESOURCE_HINT_PAGES,
+        'deps': ['structured-data'],
+    },
+    {
+        'name': 'speculation-rules',
+        'script': 'generate_speculation_rules.py',
+        'inputs': ['html_document.py', 'generate_sitemap.py', 'simulate_waterfall.py', 'optimize_lcp.py',
+                   'optimize_resource_hints.py', 'image_manifest.py'] + RESOURCE_HINT_PAGES,
+        'outputs': RESOURCE_HINT_PAGES,
+        'deps': ['jsonld-dedupe'],
+    },
+    {
+        'name': 'csp-hashes',
+        'script': 'calculate_csp_hashes.py',
+        'inputs': ['html_document.py', 'generate_sitemap.py', '*.html'],
+        'outputs': ['.htaccess', 'csp_policy.py', '.csp-hash-cache.json'],
+        'deps': ['speculation-rules'],
+        'report': True,
+    },
+    {
+        'name': 'layout-thrashing',
+        'script': 'analyze_layout_thrashing.py',
+        'inputs': ['js_tokens.py', 'script.js', 'ai-*.js', 'js/*.js'],
+        'outputs': [],
+        'deps': ['reflow', 'inline-scripts'],
+        'report': True,
+    },
+    {
+        'name': 'budgets',
+        'script': 'check_budgets.py',
+        'inputs': ['performance-budgets.json', 'simulate_waterfall.py', 'optimize_lcp.py',
+                   'optimize_resource_hints.py', 'html_document.py', 'image_manifest.py', image_manifest.MANIFEST_FILE,
+                   'script.min.js', 'styles.min.css', '*.js', '*.css', 'js/*.js', 'icons/*'] + RESOURCE_HINT_PAGES,
+        'outputs': [],
+        'deps': ['speculation-rules', 'minify-js'],
+        'report': True,
+    },
+    {
+        'name': 'fingerprint',
+        'function': 'fingerprint_assets',
+        'inputs': lambda root: list(deploy_files(root)),
+        'deps': ['images-critical', 'images-performance', 'svg', 'resource-hints',
+                 'minify-js', 'minify-css', 'csp-hashes', 'budgets'],
+    },
+    {
+        'name': 'service-worker',
+        'script': 'generate_service_worker.py',
+        'inputs': ['html_document.py', 'generate_sitemap.py', 'image_manifest.py',
+                   f'{DIST_DIR}/asset-manifest.json', f'{DIST_DIR}/*.html'],
+        'outputs': [f'{DIST_DIR}/sw.js', f'{DIST_DIR}/sw-register.*.js'],
+        'deps': ['fingerprint'],
+    },
+    {
+        'name': 'compress',
+        'function': 'compress_assets',
+        'inputs': [f'{DIST_DIR}/**/*{ext}' for ext in COMPRESS_EXTENSIONS],
+        'deps': ['service-worker'],
+    },
+    {
+        'name': 'pack',
+        'script': 'site_pack.py',
+        'inputs': ['build.py', f'{DIST_DIR}/**/*'],
+        'outputs': ['site.pack'],
+        'deps': ['compress'],
+    },
+]
+
+
+def expand_patterns(patterns, root='.'):
+    """Elenca i file (percorsi relativi) che corrispondono ai pattern glob"""
+    files = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            if os.path.isfile(path):
+                files.add(os.path.relpath(path, root).replace(os.sep, '/'))
+    return sorted(files)
+
+
+class FileHashCache:
+    """
+    Hash SHA-256 dei file con cache per (dimensione, mtime), salvata nello stato
+    del build: i file non toccati non vengono riletti
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+
+    def sha256(self, path):
+        stat = os.stat(path)
+        cached = self.entries.get(path)
+        if cached and cached['bytes'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+            return cached['sha256']
+        digest = image_manifest.file_sha256(path)
+        self.entries[path] = {'bytes': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def digest_files(self, paths, root='.'):
+        """Hash combinato di un insieme di file (nome + contenuto)"""
+        combined = hashlib.sha256()
+        for path in paths:
+            combined.update(path.encode('utf-8'))
+            combined.update(self.sha256(os.path.join(root, path)).encode('ascii'))
+        return combined.hexdigest()
+
+
+def node_inputs(node, root='.'):
+    code = [node['script']] if 'script' in node else [os.path.basename(__file__)]
+    if callable(node['inputs']):
+        return expand_patterns(code, root) + node['inputs'](root)
+    return expand_patterns(code + node['inputs'], root)
+
+
+def load_state(root='.'):
+    state_path = os.path.join(root, STATE_FILE)
+    if not os.path.exists(state_path):
+        return {'nodes': {}, 'files': {}}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, root='.'):
+    with open(os.path.join(root, STATE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def deploy_files(root='.'):
+    """File del sito da copiare nel bundle di deploy"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in DEPLOY_EXCLUDED_DIRS and not d.startswith('.'))
+        for filename in sorted(filenames):
+            excluded = any(fnmatch.fnmatch(filename, pattern) for pattern in DEPLOY_EXCLUDED_FILES)
+            if excluded and filename not in DEPLOY_INCLUDED_FILES:
+                continue
+            yield os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/')
+
+
+def fingerprint_assets(root='.'):
+    """
+    Copia il sito in dist/ e aggiunge l'hash del contenuto al nome dei CSS/JS
+    collegati dalle pagine (styles.min.css -> styles.min.3f2a9c1b.css), così
+    possono essere serviti con cache immutabile. Il file con il nome originale
+    resta nel bundle per i riferimenti costruiti a runtime
+    """
+    dist = os.path.join(root, DIST_DIR)
+    if os.path.exists(dist):
+        shutil.rmtree(dist)
+
+    outputs = []
+    for rel_path in deploy_files(root):
+        target = os.path.join(dist, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(os.path.join(root, rel_path), target)
+        outputs.append(f'{DIST_DIR}/{rel_path}')
+
+    fingerprints = {}
+    changes = 0
+    for rel_path in expand_patterns(['**/*.html'], dist):
+        doc = html_document.load(os.path.join(dist, rel_path))
+        references = [(node, 'href') for node in doc.find_all('link') if node.get('href')] + \
+                     [(node, 'src') for node in doc.find_all('script') if node.get('src')]
+        for node, attribute in references:
+            url = node.get(attribute)
+            asset = image_manifest.normalize_src(url)
+            if not asset or not asset.endswith(('.css', '.js')):
+                continue
+            asset = os.path.normpath(os.path.join(os.path.dirname(rel_path), asset)).replace(os.sep, '/')
+            source = os.path.join(dist, asset)
+            if not os.path.isfile(source):
+                continue
+            if asset not in fingerprints:
+                stem, ext = os.path.splitext(asset)
+                fingerprints[asset] = f'{stem}.{image_manifest.file_sha256(source)[:8]}{ext}'
+                shutil.copy2(source, os.path.join(dist, fingerprints[asset]))
+                outputs.append(f'{DIST_DIR}/{fingerprints[asset]}')
+            new_url = os.path.relpath(fingerprints[asset], os.path.dirname(rel_path) or '.').replace(os.sep, '/')
+            if url.startswith('/'):
+                new_url = '/' + fingerprints[asset]
+            doc.set_attribute(node, attribute, new_url)
+            changes += 1
+        doc.save()
+
+    manifest_path = os.path.join(dist, 'asset-manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+        f.write('\n')
+    outputs.append(f'{DIST_DIR}/asset-manifest.json')
+
+    print(f"📦 File copiati in {DIST_DIR}/: {len(outputs) - len(fingerprints) - 1}")
+    print(f"🔖 Asset con fingerprint: {len(fingerprints)} ({changes} riferimenti aggiornati)")
+    for asset, fingerprinted in sorted(fingerprints.items()):
+        print(f"   • {asset} → {fingerprinted}")
+    return outputs
+
+
+def compress_assets(root='.'):
+    """
+    Precomprime i file testuali di dist/ in .gz (livello 9, output riproducibile)
+    e in .br se è disponibile il modulo brotli
+    """
+    dist = os.path.join(root, DIST_DIR)
+    outputs = []
+    original_total = 0
+    gzip_total = 0
+    for rel_path in expand_patterns([f'**/*{ext}' for ext in COMPRESS_EXTENSIONS], dist):
+        path = os.path.join(dist, rel_path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) >= len(data):
+            continue
+        with open(path + '.gz', 'wb') as f:
+            f.write(compressed)
+        outputs.append(f'{DIST_DIR}/{rel_path}.gz')
+        original_total += len(data)
+        gzip_total += len(compressed)
+
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+            outputs.append(f'{DIST_DIR}/{rel_path}.br')
+
+    print(f"🗜️  File compressi: {len(outputs)}")
+    if original_total:
+        print(f"💾 gzip: {original_total:,} → {gzip_total:,} bytes "
+              f"({(1 - gzip_total / original_total) * 100:.1f}% in meno)")
+    if brotli is None:
+        print("ℹ️  Modulo brotli non installato: generati solo i file .gz")
+    return outputs
+
+
+def run_node(node, root='.'):
+    """Esegue un passo; restituisce (successo, output testuale, file prodotti, secondi)"""
+    start = time.perf_counter()
+    with instrumentation.stage(node['name'], cat='node'):
+        if 'script' in node:
+            # Con la strumentazione attiva le fasi dello script finiscono nel trace del build
+            trace_file = os.path.join(tempfile.gettempdir(), f"build-{os.getpid()}-{node['name']}.trace.json")
+            result = instrumentation.run_child([sys.executable, node['script']], trace_file, cwd=root,
+                                               capture_output=True, text=True)
+            outputs = expand_patterns(node['outputs'], root)
+            return result.returncode == 0, result.stdout + result.stderr, outputs, time.perf_counter() - start
+
+        buffer = StringIO()
+        try:
+            with redirect_stdout(buffer):
+                outputs = globals()[node['function']](root)
+        except Exception as e:
+            return False, buffer.getvalue() + f"❌ {type(e).__name__}: {e}\n", [], time.perf_counter() - start
+        return True, buffer.getvalue(), outputs, time.perf_counter() - start
+
+
+def select_nodes(targets):
+    """Passi richiesti più tutte le loro dipendenze, in ordine di pipeline"""
+    by_name = {node['name']: node for node in PIPELINE}
+    selected = set()
+
+    def visit(name):
+        if name not in by_name:
+            raise SystemExit(f"❌ Passo sconosciuto: {name} (disponibili: {', '.join(by_name)})")
+        if name not in selected:
+            selected.add(name)
+            for dep in by_name[name]['deps']:
+                visit(dep)
+
+    for name in targets or by_name:
+        visit(name)
+    return [node for node in PIPELINE if node['name'] in selected]
+
+
+def build(targets=None, root='.', force=False, jobs=None, dry_run=False, verbose=False):
+    """
+    Esegue la pipeline. Un passo parte quando tutte le sue dipendenze sono
+    terminate e viene saltato se l'hash dei suoi input e dei suoi output è
+    uguale a quello registrato dopo l'ultima esecuzione riuscita
+    """
+    nodes = select_nodes(targets)
+    state = load_state(root)
+    hashes = FileHashCache(state.get('files', {}))
+    node_states = state.setdefault('nodes', {})
+
+    pending = {node['name']: node for node in nodes}
+    done = set()
+    failed = set()
+    summary = {'eseguiti': 0, 'saltati': 0, 'falliti': 0}
+    produced = {}
+    to_run = set()
+
+    def is_up_to_date(node):
+        previous = node_states.get(node['name'])
+        if force or not previous:
+            return False
+        outputs = previous.get('outputs', [])
+        if any(not os.path.exists(os.path.join(root, path)) for path in outputs):
+            return False
+        return (previous['inputs'] == hashes.digest_files(node_inputs(node, root), root) and
+                previous['output_hash'] == hashes.digest_files(outputs, root))
+
+    def record(node, outputs):
+        node_states[node['name']] = {
+            'inputs': hashes.digest_files(node_inputs(node, root), root),
+            'outputs': outputs,
+            'output_hash': hashes.digest_files(outputs, root),
+        }
+
+    def finish(node, success, output, outputs, elapsed):
+        name = node['name']
+        if success:
+            produced[name] = outputs
+            done.add(name)
+            summary['eseguiti'] += 1
+            print(f"✅ {name}: completato in {elapsed:.1f}s")
+        else:
+            node_states.pop(name, None)
+            failed.add(name)
+            summary['falliti'] += 1
+            print(f"❌ {name}: fallito dopo {elapsed:.1f}s")
+        if verbose or not success or node.get('report'):
+            for line in output.rstrip().splitlines():
+                print(f"   │ {line}")
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        running = {}
+        while pending or running:
+            for name, node in list(pending.items()):
+                if any(dep in failed for dep in node['deps']):
+                    print(f"⏭️  {name}: saltato (dipendenza fallita)")
+                    failed.add(name)
+                    del pending[name]
+                    continue
+                if any(dep not in done for dep in node['deps']):
+                    continue
+                # Le funzioni interne girano nel processo principale quando non è attivo
+                # nessun altro passo (redirect_stdout vale per tutto il processo)
+                if 'function' in node and running:
+                    continue
+                del pending[name]
+                if dry_run and any(dep in to_run for dep in node['deps']):
+                    print(f"🔸 {name}: da eseguire (dopo {', '.join(d for d in node['deps'] if d in to_run)})")
+                    to_run.add(name)
+                    done.add(name)
+                elif is_up_to_date(node):
+                    print(f"✔️  {name}: aggiornato")
+                    summary['saltati'] += 1
+                    done.add(name)
+                elif dry_run:
+                    print(f"🔸 {name}: da eseguire")
+                    to_run.add(name)
+                    done.add(name)
+                elif 'function' in node:
+                    print(f"▶️  {name}: avviato")
+                    finish(node, *run_node(node, root))
+                else:
+                    print(f"▶️  {name}: avviato")
+                    running[executor.submit(run_node, node, root)] = node
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                finish(running.pop(future), *future.result())
+
+    # Hash registrati a fine build: i passi che modificano sul posto file già letti
+    # da un passo precedente (es. le pagine HTML) non lo fanno ripartire la volta dopo
+    if not dry_run:
+        for node in nodes:
+            if node['name'] in done:
+                previous = node_states.get(node['name'], {})
+                record(node, produced.get(node['name'], previous.get('outputs', [])))
+
+    state['files'] = hashes.entries
+    if not dry_run:
+        save_state(state, root)
+    return summary, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build incrementale del sito',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('targets', nargs='*',
+                        help='passi da eseguire (con le loro dipendenze); default: tutti')
+    parser.add_argument('--force', action='store_true', help='riesegue tutti i passi selezionati')
+    parser.add_argument('-j', '--jobs', type=int, help='passi eseguiti in parallelo (default: numero di CPU)')
+    parser.add_argument('--dry-run', action='store_true', help='mostra solo quali passi verrebbero eseguiti')
+    parser.add_argument('-v', '--verbose', action='store_true', help="mostra l'output di ogni passo")
+    parser.add_argument('--list', action='store_true', help='elenca i passi e le dipendenze')
+    args = parser.parse_args()
+
+    if args.list:
+        for node in PIPELINE:
+            deps = ', '.join(node['deps']) or '-'
+            print(f"• {node['name']:<20} {node.get('script', node.get('function')):<32} ← {deps}")
+        return
+
+    print("🏗️  Build incrementale del sito")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    summary, failed = build(args.targets, '.', args.force, args.jobs, args.dry_run, args.verbose)
+
+    print(f"\n📊 Riepilogo:")
+    print(f"▶️  Passi eseguiti: {summary['eseguiti']}")
+    print(f"✔️  Passi già aggiornati: {summary['saltati']}")
+    if failed:
+        print(f"❌ Passi falliti o saltati: {', '.join(sorted(failed))}")
+    print(f"⏱️  Tempo totale: {time.perf_counter() - start:.1f}s")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
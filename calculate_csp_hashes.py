@@ -1,94 +1,237 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script per calcolare gli hash SHA-256 degli script inline per la Content Security Policy
+Script per calcolare gli hash SHA-256 degli script e degli stili inline per la
+Content Security Policy e sincronizzare la policy in .htaccess e in
+csp_policy.py (usato da server.py e https_server.py)
+Considera tutte le pagine del sito (escluse quelle di test e debug) e:
+  - script-src: hash degli script inline (comprese le speculation rules) e, con 'unsafe-hashes', dei gestori
+    di evento inline (onclick, onload...)
+  - style-src: hash dei blocchi <style>; se una pagina usa attributi style=""
+    resta 'unsafe-inline', perché in presenza di hash il browser lo ignorerebbe
+Gli hash di ogni pagina sono in cache in .csp-hash-cache.json, indicizzati per
+hash del contenuto e versione dell'analisi (hash di questo script e del
+tokenizer di html_document): le pagine non modificate non vengono
+rianalizzate, finché non cambia il modo di analizzarle. I file
+vengono scritti insieme solo dopo aver preparato la nuova versione di tutti
 """
 
 import os
 import re
+import sys
+import glob
+import html
+import json
+import fnmatch
 import hashlib
 import base64
-from pathlib import Path
+
+import html_document
+import generate_sitemap
+import instrumentation
+
+HTACCESS_FILE = '.htaccess'
+POLICY_MODULE = 'csp_policy.py'
+CACHE_FILE = '.csp-hash-cache.json'
+
+# Hash dello script vuoto, mantenuto per compatibilità con i tag <script></script>
+EMPTY_SCRIPT_HASH = "'sha256-47DEQpj8HBSa+/TImW+5JCeuQeRkm5NMpJWZG3hSuFU='"
+
+CSP_HEADER_PATTERN = re.compile(r'^(Header always set Content-Security-Policy ")([^"]*)(")', re.MULTILINE)
+POLICY_CONSTANT_PATTERN = re.compile(r'^(CONTENT_SECURITY_POLICY = ")([^"]*)(")', re.MULTILINE)
+HASH_SOURCE_PATTERN = re.compile(r"'sha(?:256|384|512)-[A-Za-z0-9+/=]+'")
+
+# Le voci della cache valgono solo per questa versione dell'analisi
+with open(__file__, 'rb') as _source:
+    ANALYSIS_VERSION = hashlib.sha256(_source.read() + html_document.TOKENIZER_VERSION.encode()).hexdigest()[:16]
+
+EXECUTABLE_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+# Le speculation rules inline sono soggette a script-src come gli script
+HASHED_TYPES = EXECUTABLE_TYPES + ('speculationrules',)
 
 def calculate_sha256_hash(content):
     """Calcola l'hash SHA-256 di un contenuto e lo restituisce in formato base64"""
-    # Rimuovi spazi bianchi iniziali e finali, ma mantieni la formattazione interna
-    content = content.strip()
-    # Calcola l'hash SHA-256
+    # Il browser calcola l'hash sul testo esatto dello script: niente strip()
     hash_object = hashlib.sha256(content.encode('utf-8'))
     # Converti in base64
     return base64.b64encode(hash_object.digest()).decode('utf-8')
 
-def extract_inline_scripts(file_path):
-    """Estrae tutti gli script inline da un file HTML"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Pattern per trovare script inline (non JSON-LD e non src esterni)
-    pattern = r'<script(?![^>]*src=)(?![^>]*type=["\']application/ld\+json["\'])(?:[^>]*)>([\s\S]*?)</script>'
-    matches = re.findall(pattern, content, re.IGNORECASE)
-    
+def discover_pages():
+    """Pagine HTML pubblicate nella radice del sito"""
+    return sorted(path for path in glob.glob('*.html')
+                  if not any(fnmatch.fnmatch(path, pattern) for pattern in generate_sitemap.EXCLUDED_PAGES))
+
+def analyze_page(file_path):
+    """Hash degli script, dei gestori di evento e degli stili inline di una pagina"""
+    doc = html_document.load(file_path)
+
     scripts = []
-    for match in matches:
-        # Pulisci il contenuto dello script
-        script_content = match.strip()
-        if script_content:  # Solo se non è vuoto
-            scripts.append(script_content)
-    
-    return scripts
+    for script in doc.find_all('script'):
+        if script.has('src') or script.get('type', '').lower().strip() not in HASHED_TYPES:
+            continue
+        content = doc.inner_text(script)
+        if content.strip():  # Solo se non è vuoto
+            scripts.append(calculate_sha256_hash(content))
+
+    styles = [calculate_sha256_hash(doc.inner_text(style)) for style in doc.find_all('style')
+              if doc.inner_text(style).strip()]
+
+    handlers = []
+    style_attributes = 0
+    for node in doc.nodes:
+        if node.tag == html_document.COMMENT:
+            continue
+        for name, value in node.attrs.items():
+            if name.startswith('on') and value:
+                handlers.append(calculate_sha256_hash(html.unescape(value)))
+            elif name == 'style' and value.strip():
+                style_attributes += 1
+
+    return {
+        'sha256': html_document.content_hash(doc.text),
+        'version': ANALYSIS_VERSION,
+        'scripts': scripts,
+        'handlers': handlers,
+        'styles': styles,
+        'style_attributes': style_attributes,
+    }
+
+def load_cache(path=CACHE_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def collect_hashes(pages, cache):
+    """
+    Restituisce (analisi per pagina, pagine rianalizzate) usando la cache dove
+    il contenuto e la versione dell'analisi non sono cambiati
+    """
+    results = {}
+    analyzed = []
+    for file_path in pages:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            digest = html_document.content_hash(f.read())
+        entry = cache.get(file_path)
+        if entry is None or entry.get('sha256') != digest or entry.get('version') != ANALYSIS_VERSION:
+            entry = analyze_page(file_path)
+            analyzed.append(file_path)
+        results[file_path] = entry
+    return results, analyzed
+
+def sources(hashes):
+    return [f"'sha256-{value}'" for value in sorted(set(hashes))]
+
+def update_directive(directives, name, hashes, keywords):
+    """
+    Sostituisce hash e parole chiave gestite nella direttiva `name`; le nuove
+    sorgenti vanno subito dopo 'self', come nella policy scritta a mano
+    """
+    managed = ("'unsafe-inline'", "'unsafe-hashes'")
+    for index, directive in enumerate(directives):
+        if directive.split(' ', 1)[0] != name:
+            continue
+        others = [source for source in directive.split()[1:]
+                  if not HASH_SOURCE_PATTERN.fullmatch(source) and source not in managed]
+        position = others.index("'self'") + 1 if "'self'" in others else 0
+        directives[index] = ' '.join([name] + others[:position] + keywords + hashes + others[position:])
+        return
+    raise ValueError(f"Direttiva {name} non trovata nella Content Security Policy")
+
+def build_policy(policy, results):
+    """Nuova policy con gli hash di tutte le pagine; restituisce (policy, avvisi)"""
+    warnings = []
+    directives = [directive.strip() for directive in policy.split(';') if directive.strip()]
+
+    script_hashes = [EMPTY_SCRIPT_HASH] + [source for source in sources(
+        value for entry in results.values() for value in entry['scripts']) if source != EMPTY_SCRIPT_HASH]
+    handler_hashes = sources(value for entry in results.values() for value in entry['handlers'])
+    update_directive(directives, 'script-src', script_hashes + handler_hashes,
+                     ["'unsafe-hashes'"] if handler_hashes else [])
+
+    with_attributes = [path for path, entry in results.items() if entry['style_attributes']]
+    if with_attributes:
+        # Gli attributi style="" richiedono 'unsafe-inline', che gli hash disattiverebbero
+        update_directive(directives, 'style-src', [], ["'unsafe-inline'"])
+        warnings.append(f"style-src resta con 'unsafe-inline': attributi style in "
+                        f"{', '.join(with_attributes)}")
+    else:
+        update_directive(directives, 'style-src',
+                         sources(value for entry in results.values() for value in entry['styles']), [])
+    return '; '.join(directives) + ';', warnings
+
+def rewrite(path, pattern, policy):
+    """Nuovo contenuto del file con la policy sostituita (None se già aggiornato)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    match = pattern.search(content)
+    if not match:
+        raise ValueError(f"Content-Security-Policy non trovata in {path}")
+    if match.group(2) == policy:
+        return None
+    return content[:match.start(2)] + policy + content[match.end(2):]
+
+def write_all(contents):
+    """Scrive i file preparati: prima tutti i temporanei, poi le sostituzioni"""
+    for path, content in contents.items():
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(content)
+    for path in contents:
+        os.replace(path + '.tmp', path)
 
 def main():
-    # Directory del progetto
-    project_dir = Path('.')
-    
-    # File HTML da analizzare
-    html_files = [
-        'index.html',
-        'nebbiogeni.html', 
-        'serramenti.html',
-        'sorveglianza.html',
-        'allarmi.html',
-        'chi-siamo.html'
-    ]
-    
-    all_hashes = set()
-    
-    print("Analisi script inline per CSP...\n")
-    
-    for html_file in html_files:
-        file_path = project_dir / html_file
-        if file_path.exists():
-            print(f"Analizzando {html_file}...")
-            scripts = extract_inline_scripts(file_path)
-            
-            for i, script in enumerate(scripts, 1):
-                hash_value = calculate_sha256_hash(script)
-                all_hashes.add(hash_value)
-                print(f"  Script {i}: sha256-{hash_value}")
-                print(f"  Contenuto: {script[:100]}..." if len(script) > 100 else f"  Contenuto: {script}")
-                print()
-    
-    print(f"\nTotale hash unici trovati: {len(all_hashes)}")
-    print("\nHash per CSP:")
-    
-    # Hash esistente per script vuoto
-    existing_hash = "'sha256-47DEQpj8HBSa+/TImW+5JCeuQeRkm5NMpJWZG3hSuFU='"
-    csp_hashes = [existing_hash]
-    
-    for hash_value in sorted(all_hashes):
-        csp_hashes.append(f"'sha256-{hash_value}'")
-    
-    csp_script_src = " ".join(csp_hashes)
-    print(f"\nScript-src hashes: {csp_script_src}")
-    
-    # Genera la CSP completa
+    dry_run = '--dry-run' in sys.argv[1:]
+
+    print("Analisi script e stili inline per CSP...\n")
+
+    pages = discover_pages()
+    results, analyzed = collect_hashes(pages, load_cache())
+    for file_path, entry in results.items():
+        status = 'analizzata' if file_path in analyzed else 'in cache'
+        print(f"{file_path} ({status}): {len(entry['scripts'])} script, "
+              f"{len(entry['handlers'])} gestori di evento, {len(entry['styles'])} stili, "
+              f"{entry['style_attributes']} attributi style")
+
+    with open(HTACCESS_FILE, 'r', encoding='utf-8') as f:
+        match = CSP_HEADER_PATTERN.search(f.read())
+    if not match:
+        raise ValueError(f"Header Content-Security-Policy non trovato in {HTACCESS_FILE}")
+    previous = match.group(2)
+    policy, warnings = build_policy(previous, results)
+
     print("\n" + "="*80)
-    print("CSP COMPLETA DA AGGIORNARE IN .htaccess:")
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+
+    contents = {}
+    for path, pattern in ((HTACCESS_FILE, CSP_HEADER_PATTERN), (POLICY_MODULE, POLICY_CONSTANT_PATTERN)):
+        content = rewrite(path, pattern, policy)
+        if content is not None:
+            contents[path] = content
+    if analyzed:
+        contents[CACHE_FILE] = json.dumps(results, indent=2) + '\n'
+
+    old_sources = set(previous.split())
+    new_sources = set(policy.split())
+    removed = sorted(source for source in old_sources - new_sources if source.startswith("'"))
+    added = sorted(source for source in new_sources - old_sources if source.startswith("'"))
+
+    if not dry_run and contents:
+        write_all(contents)
+
+    updated = [path for path in contents if path != CACHE_FILE]
+    if not updated:
+        print(f"CSP in {HTACCESS_FILE} e {POLICY_MODULE} già aggiornata")
+        return
+    print(f"CSP {'DA AGGIORNARE' if dry_run else 'AGGIORNATA'} IN {', '.join(updated)}:")
     print("="*80)
-    
-    csp_policy = f'''Header always set Content-Security-Policy "default-src 'self'; script-src 'self' {csp_script_src} https://www.googletagmanager.com https://www.google-analytics.com https://ssl.google-analytics.com https://fonts.googleapis.com https://tagmanager.google.com; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://tagmanager.google.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data: https://www.google-analytics.com https://ssl.google-analytics.com https://www.googletagmanager.com https://googletagmanager.com https://region1.google-analytics.com https://stats.g.doubleclick.net; connect-src 'self' https://www.google-analytics.com https://ssl.google-analytics.com https://www.googletagmanager.com https://region1.google-analytics.com https://analytics.google.com https://stats.g.doubleclick.net https://googletagmanager.com; object-src 'none'; base-uri 'self'; form-action 'self'; frame-ancestors 'none'; require-trusted-types-for 'script'; upgrade-insecure-requests; block-all-mixed-content;"'''
-    
-    print(csp_policy)
-    
+    for source in removed:
+        print(f"  - {source}")
+    for source in added:
+        print(f"  + {source}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per verificare i budget di performance delle pagine e degli asset
+Legge i limiti da performance-budgets.json:
+  - "pages": per pagina (con "*" come default) byte dell'HTML grezzi e gzip,
+    numero di richieste al caricamento, byte trasferiti, byte del CSS/JS
+    bloccante e byte delle immagini sopra la piega
+  - "assets": per pattern (es. "*.js", "script.min.js") byte grezzi e gzip di
+    ogni file locale caricato dalle pagine
+Per ogni pagina o asset i pattern che corrispondono vengono applicati in
+ordine, e i più specifici (elencati dopo) sovrascrivono i valori precedenti.
+Termina con errore e un report in stile diff se un budget è superato, o se
+una pagina precarica un'immagine con loading="lazy" (va verificato qui, dopo
+che optimize_resource_hints.py ha riscritto i preload)
+"""
+
+import os
+import sys
+import json
+import fnmatch
+import argparse
+import time
+from urllib.parse import urlsplit
+
+import html_document
+import image_manifest
+import optimize_lcp
+import simulate_waterfall
+import instrumentation
+
+BUDGET_FILE = 'performance-budgets.json'
+
+PAGE_METRICS = {
+    'html_bytes': 'HTML (byte)',
+    'html_gzip': 'HTML (gzip)',
+    'requests': 'richieste al caricamento',
+    'transfer_bytes': 'byte trasferiti (gzip)',
+    'blocking_bytes': 'CSS/JS bloccante (gzip)',
+    'above_fold_image_bytes': 'immagini sopra la piega',
+}
+ASSET_METRICS = {
+    'bytes': 'byte',
+    'gzip': 'gzip',
+}
+
+# Attributi che caricano asset locali (le immagini lazy sotto la piega comprese)
+ASSET_ATTRIBUTES = {'img': 'src', 'source': 'src', 'script': 'src', 'link': 'href', 'video': 'poster'}
+ASSET_RELS = ('stylesheet', 'preload', 'icon', 'apple-touch-icon', 'manifest')
+
+def load_budgets(path=BUDGET_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        budgets = json.load(f)
+    for section, metrics in (('pages', PAGE_METRICS), ('assets', ASSET_METRICS)):
+        for pattern, limits in budgets.get(section, {}).items():
+            unknown = set(limits) - set(metrics)
+            if unknown:
+                raise ValueError(f"{path}: metriche sconosciute per {section}/{pattern}: {', '.join(sorted(unknown))}")
+    return budgets
+
+def limits_for(name, rules):
+    """Limiti che valgono per un file: i pattern corrispondenti, in ordine di configurazione"""
+    limits = {}
+    for pattern, values in rules.items():
+        if fnmatch.fnmatch(name, pattern):
+            limits.update(values)
+    return limits
+
+def format_bytes(value):
+    return f"{value / 1024:.1f} KB" if value >= 1024 else f"{value} B"
+
+def format_value(metric, value):
+    return str(value) if metric == 'requests' else format_bytes(value)
+
+def page_metrics(file_path, manifest):
+    # Il grafo contiene le richieste del caricamento iniziale (escluse le immagini lazy sotto la piega)
+    graph = simulate_waterfall.PageGraph(file_path, manifest)
+    loaded = list(graph.requests.values())
+
+    above_fold = {}
+    for img in graph.images:
+        entry = image_manifest.lookup(manifest, img.get('src', ''))
+        if id(img) in graph.above_fold and entry:
+            above_fold[image_manifest.normalize_src(img.get('src'))] = entry['bytes']
+
+    return {
+        'html_bytes': os.path.getsize(file_path),
+        'html_gzip': graph.document.bytes,
+        'requests': len(loaded),
+        'transfer_bytes': sum(request.bytes for request in loaded),
+        'blocking_bytes': sum(request.bytes for request in loaded if request.blocking),
+        'above_fold_image_bytes': sum(above_fold.values()),
+    }
+
+def page_assets(file_path):
+    """Asset locali referenziati da una pagina (percorsi relativi alla radice del sito)"""
+    doc = html_document.load(file_path)
+    base_dir = os.path.dirname(file_path)
+    assets = set()
+    for tag, attribute in ASSET_ATTRIBUTES.items():
+        for node in doc.find_all(tag):
+            value = node.get(attribute)
+            if not value or (tag == 'link' and node.get('rel', '').lower() not in ASSET_RELS):
+                continue
+            src = image_manifest.normalize_src(value)
+            if src and not urlsplit(value).netloc and os.path.isfile(os.path.join(base_dir, src)):
+                assets.add(os.path.normpath(os.path.join(base_dir, src)).replace(os.sep, '/'))
+    return assets
+
+def asset_metrics(path, manifest):
+    entry = manifest.get(path)
+    size = entry['bytes'] if entry else os.path.getsize(path)
+    return {'bytes': size, 'gzip': simulate_waterfall.transfer_size(path)}
+
+def check(name, metrics, limits, labels):
+    """Restituisce le righe del report per i budget superati"""
+    lines = []
+    for metric, limit in limits.items():
+        value = metrics[metric]
+        if value > limit:
+            lines.append(f"-  {labels[metric]}: {format_value(metric, limit)}")
+            lines.append(f"+  {labels[metric]}: {format_value(metric, value)} "
+                         f"(+{format_value(metric, value - limit)}, {(value / limit - 1) * 100:.0f}% oltre)")
+    return [f"@@ {name} @@"] + lines if lines else []
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica i budget di performance di pagine e asset',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=simulate_waterfall.HTML_FILES, help='pagine da verificare')
+    parser.add_argument('--budgets', default=BUDGET_FILE, help=f'file dei budget (default: {BUDGET_FILE})')
+    parser.add_argument('-v', '--verbose', action='store_true', help='mostra anche le misure entro il budget')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print("📏 Verifica budget di performance")
+    print("=" * 50)
+
+    budgets = load_budgets(args.budgets)
+    manifest = image_manifest.load_manifest('.')
+    report = []
+    lazy_preloads = []
+    checked = 0
+    pages = 0
+
+    assets = set()
+    for html_file in args.files:
+        if not os.path.exists(html_file):
+            print(f"⚠️  File non trovato: {html_file}")
+            continue
+        pages += 1
+        metrics = page_metrics(html_file, manifest)
+        limits = limits_for(html_file, budgets.get('pages', {}))
+        report += check(html_file, metrics, limits, PAGE_METRICS)
+        checked += len(limits)
+        assets |= page_assets(html_file)
+        lazy_preloads += [(html_file, src) for src in optimize_lcp.lazy_preloads(html_document.load(html_file))]
+        if args.verbose:
+            print(f"📄 {html_file}: " + ', '.join(f"{PAGE_METRICS[metric]} {format_value(metric, value)}"
+                                               for metric, value in metrics.items()))
+
+    for asset in sorted(assets):
+        limits = limits_for(asset, budgets.get('assets', {}))
+        if not limits:
+            continue
+        metrics = asset_metrics(asset, manifest)
+        report += check(asset, metrics, limits, ASSET_METRICS)
+        checked += len(limits)
+        if args.verbose:
+            print(f"📦 {asset}: {format_bytes(metrics['bytes'])} ({format_bytes(metrics['gzip'])} gzip)")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 Pagine verificate: {pages}/{len(args.files)}, asset verificati: {len(assets)}")
+    print(f"🔍 Budget controllati: {checked}")
+    print(f"⏱️  Tempo: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if lazy_preloads:
+        print(f"\n❌ Immagini precaricate con loading=\"lazy\": {len(lazy_preloads)}")
+        for html_file, src in lazy_preloads:
+            print(f"   • {html_file}: {src}")
+    if report:
+        exceeded = sum(1 for line in report if line.startswith('+'))
+        print(f"\n❌ Budget superati: {exceeded}")
+        print(f"--- {args.budgets}")
+        print("+++ misurato")
+        for line in report:
+            print(line)
+    if report or lazy_preloads:
+        sys.exit(1)
+    print("✅ Tutti i budget sono rispettati")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -1,17 +1,20 @@
-from PIL import Image
 import os
 
+import image_manifest
+
 # Check dimensions and file sizes of thumbnail images
 files = [
     'icons/thumbnail-xecur-optimized.webp',
     'icons/thumbnail-xecur-super-optimized.webp'
 ]
 
+# Le dimensioni arrivano dal manifest (solo header, nessuna decodifica)
+manifest = image_manifest.load_manifest('.')
+
 for file_path in files:
-    if os.path.exists(file_path):
-        img = Image.open(file_path)
-        file_size = os.path.getsize(file_path) / 1024  # KB
-        print(f'{os.path.basename(file_path)}: {img.size[0]}x{img.size[1]} - {file_size:.1f} KB')
-        img.close()
+    entry = manifest.get(file_path)
+    if entry:
+        file_size = entry['bytes'] / 1024  # KB
+        print(f'{os.path.basename(file_path)}: {entry["width"]}x{entry["height"]} - {file_size:.1f} KB')
     else:
         print(f'{file_path}: File not found')
\ No newline at end of file
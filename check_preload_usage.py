@@ -1,24 +1,32 @@
 import re
 import os
 
+import html_document
+
 def check_preload_usage(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    doc = html_document.load(file_path)
     
     # Trova tutti i preload
-    preload_pattern = r'<link[^>]*rel=["\']preload["\'][^>]*href=["\']([^"\']*)["\'][^>]*>'
-    preloads = re.findall(preload_pattern, content)
+    preloads = [link.get('href') for link in doc.find_all('link', rel='preload') if link.get('href')]
+    
+    # Immagini usate nel contenuto (src/srcset) e come sfondo negli stili inline
+    img_sources = set()
+    for node in doc.find_all('img') + doc.find_all('source'):
+        img_sources.add(node.get('src'))
+        for candidate in node.get('srcset', '').split(','):
+            if candidate.strip():
+                img_sources.add(candidate.split()[0])
+    inline_css = ' '.join([doc.inner_text(style) for style in doc.find_all('style')] +
+                          [node.get('style') for node in doc.nodes if node.has('style')])
     
     issues = []
     for preload_url in preloads:
         # Controlla se l'immagine è usata nel contenuto
         if preload_url.endswith('.webp') or preload_url.endswith('.jpg') or preload_url.endswith('.png'):
-            # Cerca l'uso dell'immagine nel contenuto
-            img_pattern = rf'<img[^>]*src=["\']?{re.escape(preload_url)}["\']?[^>]*>'
-            if not re.search(img_pattern, content):
+            if preload_url not in img_sources:
                 # Controlla anche background-image in CSS
                 bg_pattern = rf'background-image:\s*url\(["\']?{re.escape(preload_url)}["\']?\)'
-                if not re.search(bg_pattern, content):
+                if not re.search(bg_pattern, inline_css):
                     issues.append(f'Preload non utilizzato: {preload_url}')
     
     return issues
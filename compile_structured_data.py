@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per compilare i dati strutturati JSON-LD al momento del build
+Unisce i grafi di structured-data.json e dei file ai-*.json (prima caricati
+a runtime da ai-unified-engine.js con sei fetch in sequenza), fonde le
+entità con lo stesso @id, elimina i duplicati, valida il risultato e scrive:
+  - in ogni pagina un <script type="application/ld+json"> minificato con le
+    entità che riguardano quella pagina, accanto ai blocchi scritti a mano che
+    descrivono altro (prodotti, video, offerte di lavoro...). I blocchi scritti
+    a mano che ripetono un'entità compilata (un Service o un'Organization
+    anonimi accanto a quelli con @id) vengono rimossi: le proprietà che il
+    grafo non ha vanno spostate in structured-data.json
+  - il grafo completo in schema-graph-<hash>.json, collegato dalle pagine con
+    <link rel="alternate" type="application/ld+json">
+I Dataset (knowledge base, fonti, mappa dei contenuti) non descrivono il
+contenuto di una pagina: restano solo nel grafo completo
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import hashlib
+import argparse
+from urllib.parse import urlsplit
+
+import html_document
+import instrumentation
+
+# Fonti in ordine di priorità: in caso di valori diversi per la stessa
+# proprietà vince la prima (structured-data.json è mantenuto a mano)
+SOURCES = [
+    'structured-data.json',
+    'ai-seo-enhanced.json',
+    'ai-knowledge-base.json',
+    'ai-services-schema.json',
+    'ai-person-eeat.json',
+    'ai-authoritative-sources.json',
+    'ai-context-sitemap.json',
+    'ai-local-business.json',
+]
+
+SCHEMA_CONTEXT = 'https://schema.org'
+SITE_HOSTS = ('www.fbtotalsecurity.com', 'fbtotalsecurity.com')
+GRAPH_PREFIX = 'schema-graph-'
+GRAPH_FILE_PATTERN = re.compile(re.escape(GRAPH_PREFIX) + r'[0-9a-f]{8}\.json')
+
+# Blocco generato da questo script; 'ai-enhanced-structured-data' è la copia
+# statica di ai-seo-enhanced.json che il grafo compilato sostituisce
+BLOCK_ID = 'structured-data-graph'
+MANAGED_BLOCK_IDS = (BLOCK_ID, 'ai-enhanced-structured-data')
+
+# Tipi pubblicati solo nel grafo completo
+GRAPH_ONLY_TYPES = ('Dataset',)
+
+# Pagina -> slug degli @id che la riguardano (gli @id sulla radice vanno in home)
+PAGE_SLUGS = {
+    'index.html': (),
+    'sorveglianza.html': ('sorveglianza', 'videosorveglianza'),
+    'allarmi.html': ('allarmi',),
+    'serramenti.html': ('serramenti', 'grate-inferriate'),
+    'nebbiogeni.html': ('nebbiogeni',),
+    'chi-siamo.html': ('chi-siamo', 'franco-benedetto'),
+    'lavora-con-noi.html': ('lavora-con-noi',),
+    'termini-condizioni.html': ('termini-condizioni',),
+}
+HOME_PAGE = 'index.html'
+
+HTML_FILES = list(PAGE_SLUGS)
+
+def canonical(value):
+    """Forma canonica di un valore JSON, per confronti strutturali"""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+def types_of(entity):
+    return [value for value in as_list(entity.get('@type', [])) if isinstance(value, str)]
+
+def _short(value, limit=60):
+    text = canonical(value)
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+def load_entities(path, errors):
+    """Entità di primo livello di un file JSON-LD (il @graph o l'oggetto stesso)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        errors.append(f"{path}: JSON non valido ({e})")
+        return []
+    if not isinstance(data, dict):
+        errors.append(f"{path}: atteso un oggetto JSON-LD")
+        return []
+    if data.get('@context') not in (SCHEMA_CONTEXT, SCHEMA_CONTEXT + '/', 'http://schema.org'):
+        errors.append(f"{path}: @context diverso da {SCHEMA_CONTEXT}")
+    entities = data['@graph'] if '@graph' in data else [data]
+    return [{key: value for key, value in entity.items() if key != '@context'}
+            for entity in entities if isinstance(entity, dict)]
+
+def merge_entity(target, source, path, origin, conflicts):
+    """Fonde `source` in `target`: unisce tipi e liste, sui valori diversi tiene il primo"""
+    for key, value in source.items():
+        if key not in target:
+            target[key] = value
+            continue
+        current = target[key]
+        if canonical(current) == canonical(value):
+            continue
+        if key == '@type':
+            merged = list(dict.fromkeys(as_list(current) + as_list(value)))
+            target[key] = merged if len(merged) > 1 else merged[0]
+        elif isinstance(current, dict) and isinstance(value, dict) and current.get('@id') == value.get('@id'):
+            merge_entity(current, value, f"{path}.{key}", origin, conflicts)
+        elif isinstance(current, list) or isinstance(value, list):
+            seen = {canonical(item) for item in as_list(current)}
+            target[key] = as_list(current) + [item for item in as_list(value) if canonical(item) not in seen]
+        else:
+            conflicts.append(f"{path}.{key}: tenuto {_short(current)}, scartato {_short(value)} ({origin})")
+
+def compile_graph(sources):
+    """
+    Restituisce (entità, avvisi, errori). Le entità con lo stesso @id vengono
+    fuse, quelle senza @id deduplicate per struttura
+    """
+    entities = {}
+    warnings = []
+    errors = []
+    for source in sources:
+        for entity in load_entities(source, errors):
+            entity_id = entity.get('@id')
+            if not types_of(entity):
+                errors.append(f"{source}: entità senza @type ({_short(entity)})")
+                continue
+            if entity_id is None:
+                key = canonical(entity)
+            elif not isinstance(entity_id, str) or urlsplit(entity_id).scheme not in ('http', 'https'):
+                errors.append(f"{source}: @id non è un URL assoluto: {entity_id!r}")
+                continue
+            else:
+                key = entity_id
+            if key not in entities:
+                entities[key] = json.loads(json.dumps(entity))
+            elif entity_id is not None:
+                merge_entity(entities[key], entity, entity_id, source, warnings)
+    graph = list(entities.values())
+    warnings.extend(dangling_references(graph))
+    return graph, warnings, errors
+
+def _walk(value):
+    if isinstance(value, dict):
+        yield value
+        for child in value.values():
+            yield from _walk(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _walk(child)
+
+def dangling_references(graph):
+    """Riferimenti {"@id": ...} a entità del sito che non sono definite in nessun punto del grafo"""
+    defined = {node['@id'] for node in _walk(graph) if '@id' in node and len(node) > 1}
+    missing = sorted({node['@id'] for node in _walk(graph)
+                      if set(node) == {'@id'} and node['@id'] not in defined and
+                      urlsplit(node['@id']).netloc in SITE_HOSTS})
+    return [f"riferimento non risolto: {entity_id}" for entity_id in missing]
+
+def pages_for(entity):
+    """Pagine a cui appartiene un'entità, in base al percorso del suo @id"""
+    if any(entity_type in GRAPH_ONLY_TYPES for entity_type in types_of(entity)):
+        return []
+    entity_id = entity.get('@id')
+    if not entity_id:
+        return [HOME_PAGE]
+    parts = urlsplit(entity_id)
+    if parts.netloc not in SITE_HOSTS:
+        return [HOME_PAGE]
+    slug = parts.path.strip('/')
+    slug = slug[:-len('.html')] if slug.endswith('.html') else slug
+    if not slug or slug == 'index':
+        return [HOME_PAGE]
+    return [page for page, slugs in PAGE_SLUGS.items() if slug in slugs] or [HOME_PAGE]
+
+def serialize(graph):
+    """JSON-LD minificato, sicuro dentro <script> (niente '</' letterale)"""
+    data = {'@context': SCHEMA_CONTEXT, '@graph': graph}
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+def graph_file_name(text):
+    return f"{GRAPH_PREFIX}{hashlib.sha256(text.encode('utf-8')).hexdigest()[:8]}.json"
+
+def page_defined_ids(doc):
+    """
+    @id delle entità di primo livello dei blocchi JSON-LD scritti a mano.
+    Le entità annidate con un @id (es. il publisher collegato a /#organization
+    da optimize_jsonld.py) ne descrivono solo una parte: l'entità compilata resta
+    """
+    ids = set()
+    for script in doc.find_all('script', type='application/ld+json'):
+        if script.get('id') in MANAGED_BLOCK_IDS:
+            continue
+        try:
+            data = json.loads(doc.inner_text(script))
+        except ValueError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        entities = data['@graph'] if '@graph' in data else [data]
+        ids.update(entity['@id'] for entity in entities
+                   if isinstance(entity, dict) and '@id' in entity and len(entity) > 1)
+    return ids
+
+def duplicate_blocks(doc, entities):
+    """
+    Blocchi JSON-LD scritti a mano che ripetono un'entità del blocco compilato:
+    un'entità anonima di primo livello il cui tipo corrisponde a una sola
+    entità compilata della pagina (il Service scritto a mano accanto a
+    .../allarmi#service, l'Organization accanto a /#organization).
+    Restituisce [(script, entità compilata, proprietà non presenti nel grafo)]
+    """
+    duplicates = []
+    for script in doc.find_all('script', type='application/ld+json'):
+        if script.get('id') in MANAGED_BLOCK_IDS:
+            continue
+        try:
+            data = json.loads(doc.inner_text(script))
+        except ValueError:
+            continue
+        if not isinstance(data, dict) or '@graph' in data or '@id' in data or not types_of(data):
+            continue
+        matches = [entity for entity in entities if types_of(data)[0] in types_of(entity)]
+        if len(matches) == 1:
+            missing = [key for key in data if key not in matches[0] and key != '@context']
+            duplicates.append((script, matches[0], missing))
+    return duplicates
+
+def _preceding_comment(doc, node):
+    """Commento che precede l'elemento separato solo da spazi (es. <!-- Breadcrumb Schema -->)"""
+    for comment in doc.comments():
+        if comment.outer_end <= node.start and not doc.text[comment.outer_end:node.start].strip():
+            return comment
+    return None
+
+def _line_indent(doc, node):
+    line_start = doc.text.rfind('\n', 0, node.start) + 1
+    indent = doc.text[line_start:node.start]
+    return indent if not indent.strip() else ''
+
+def rewrite_page(doc, entities, graph_file, duplicates=()):
+    """
+    Sostituisce il blocco JSON-LD compilato e il link al grafo completo e
+    rimuove i blocchi scritti a mano che lo duplicano; restituisce le modifiche
+    """
+    changes_made = []
+    head = doc.find('head')
+    if head is None:
+        return changes_made
+
+    for script, entity, missing in duplicates:
+        comment = _preceding_comment(doc, script)
+        if comment is not None:
+            doc.remove(comment)
+        doc.remove(script)
+        changes_made.append(f"Rimosso blocco {types_of(entity)[0]} scritto a mano: duplica {entity['@id']}"
+                            f"{' (scartati: ' + ', '.join(missing) + ')' if missing else ''}")
+
+    managed = [script for script in doc.find_all('script', type='application/ld+json')
+               if script.get('id') in MANAGED_BLOCK_IDS]
+    current = managed[0] if managed and entities else None
+    if entities:
+        block = f'<script type="application/ld+json" id="{BLOCK_ID}">{serialize(entities)}</script>'
+        if current is None:
+            doc.append_child(head, f"    {block}\n")
+        elif doc.source(current) != block:
+            doc.replace(current.start, current.outer_end, block)
+        if current is None or doc.source(current) != block:
+            changes_made.append(f"JSON-LD compilato: {len(entities)} entità ({len(block.encode('utf-8'))} byte)")
+    obsolete = [script for script in managed if script is not current]
+    for script in obsolete:
+        doc.remove(script)
+    if obsolete:
+        changes_made.append(f"Rimossi {len(obsolete)} blocchi JSON-LD sostituiti dal grafo compilato")
+
+    link = next((link for link in doc.find_all('link', rel='alternate')
+                 if link.get('type') == 'application/ld+json'), None)
+    if link is None:
+        tag = f'<link rel="alternate" type="application/ld+json" href="{graph_file}">'
+        if current is not None:
+            doc.insert(current.start, tag + '\n' + _line_indent(doc, current))
+        else:
+            doc.append_child(head, f"    {tag}\n")
+        changes_made.append(f"Aggiunto link al grafo completo {graph_file}")
+    elif link.get('href') != graph_file:
+        doc.set_attribute(link, 'href', graph_file)
+        changes_made.append(f"Aggiornato link al grafo completo {graph_file}")
+    return changes_made
+
+def remove_old_graphs(keep):
+    removed = []
+    for path in sorted(glob.glob(GRAPH_PREFIX + '*.json')):
+        if GRAPH_FILE_PATTERN.fullmatch(path) and path != keep:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+def main():
+    parser = argparse.ArgumentParser(description='Compila i dati strutturati JSON-LD nelle pagine',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da processare')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("🧩 Compilazione dati strutturati JSON-LD")
+    print("=" * 50)
+
+    graph, warnings, errors = compile_graph([source for source in SOURCES if os.path.exists(source)])
+    print(f"📚 Fonti: {sum(1 for source in SOURCES if os.path.exists(source))}, entità nel grafo: {len(graph)}")
+    for warning in warnings:
+        print(f"   ⚠️  {warning}")
+    if errors:
+        for error in errors:
+            print(f"   ❌ {error}")
+        print(f"\n❌ Dati strutturati non validi: nessuna pagina modificata")
+        sys.exit(1)
+
+    graph_text = serialize(graph) + '\n'
+    graph_file = graph_file_name(graph_text)
+
+    total_changes = 0
+    processed_files = 0
+    for html_file in args.files:
+        if not os.path.exists(html_file):
+            print(f"⚠️  File non trovato: {html_file}")
+            continue
+        print(f"\n📄 Processando: {html_file}")
+        doc = html_document.load(html_file)
+        defined = page_defined_ids(doc)
+        entities = []
+        for entity in graph:
+            if html_file in pages_for(entity):
+                if entity.get('@id') in defined:
+                    print(f"   ⚠️  {entity['@id']} è già definita nella pagina: non inclusa")
+                else:
+                    entities.append(entity)
+        changes_made = rewrite_page(doc, entities, graph_file, duplicate_blocks(doc, entities))
+        if changes_made:
+            if not args.dry_run:
+                doc.save()
+            print(f"{'🔍 Modifiche previste' if args.dry_run else '✅ Modifiche applicate'}: {len(changes_made)}")
+            for change in changes_made:
+                print(f"   • {change}")
+        else:
+            print("ℹ️  Nessuna modifica necessaria")
+        total_changes += len(changes_made)
+        processed_files += 1
+
+    created = not os.path.exists(graph_file)
+    removed = []
+    if not args.dry_run:
+        if created:
+            with open(graph_file, 'w', encoding='utf-8') as f:
+                f.write(graph_text)
+        removed = remove_old_graphs(graph_file)
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File processati: {processed_files}/{len(args.files)}")
+    print(f"🔧 Modifiche totali: {total_changes}")
+    print(f"🗂️  Grafo completo: {graph_file} ({len(graph_text.encode('utf-8'))} byte){' - creato' if created else ''}")
+    for path in removed:
+        print(f"   🗑️  Rimosso (obsoleto): {path}")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -4,8 +4,11 @@ Script per comprimere le immagini URfog WebP mantenendo una buona qualità
 """
 
 import os
-from PIL import Image
 import shutil
+from PIL import Image
+
+import image_resize
+import instrumentation
 
 def compress_webp_image(input_path, output_path, quality=45):
     """
@@ -28,20 +31,19 @@ def compress_webp_image(input_path, output_path, quality=45):
             # Ridimensiona se troppo grande (mantenendo aspect ratio)
             max_width = 800
             if original_width > max_width:
-                ratio = max_width / original_width
-                new_height = int(original_height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                print(f"Ridimensionata a: {max_width}x{new_height}")
+                img = image_resize.resize_to_width(img, max_width)
+                print(f"Ridimensionata a: {img.size[0]}x{img.size[1]}")
             
             # Salva con compressione ottimizzata
-            img.save(
-                output_path,
-                'WebP',
-                quality=quality,
-                method=6,  # Metodo di compressione più lento ma più efficiente
-                optimize=True,  # Ottimizzazione aggiuntiva
-                lossless=False  # Compressione lossy per file più piccoli
-            )
+            with instrumentation.stage('encode', file=os.path.basename(output_path)):
+                img.save(
+                    output_path,
+                    'WebP',
+                    quality=quality,
+                    method=6,  # Metodo di compressione più lento ma più efficiente
+                    optimize=True,  # Ottimizzazione aggiuntiva
+                    lossless=False  # Compressione lossy per file più piccoli
+                )
             
             # Verifica il risultato
             compressed_size = os.path.getsize(output_path)
@@ -104,4 +106,4 @@ def main():
     print("Compressione completata!")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content Security Policy condivisa dai server locali (server.py, https_server.py)
+È la stessa policy di .htaccess: calculate_csp_hashes.py riscrive entrambe
+insieme agli hash degli script e degli stili inline, quindi non va modificata
+a mano (le sorgenti esterne si aggiungono in .htaccess)
+"""
+
+import os
+import fnmatch
+
+import generate_sitemap
+
+CONTENT_SECURITY_POLICY = "default-src 'self'; script-src 'self' 'unsafe-hashes' 'sha256-47DEQpj8HBSa+/TImW+5JCeuQeRkm5NMpJWZG3hSuFU=' 'sha256-0fkI0C2AQUQx+QYw/z/MLG4NrHYrzqoymTGN35KKYy8=' 'sha256-bKJ9fITuYjqBzvk8O/1w2QAfw+gf5Z7L5Uf9+av+vbw=' 'sha256-mQ+rJAfEYxpB/uAahPqnOkMn6eGGh61KiKHhfQ0JrdA=' 'sha256-qUAcNkPq4dLjIJqfYHexjNxJyXh+N5O5RHNE2MCTjcw=' 'sha256-yudO8GwPZMfNl5nnu56Br22aT8aYgnnSe4tmwLFy7wY=' 'sha256-+4ecZIqDvIrN01WFXd2GhKaqc10mY7QnEYUrL745Vxw=' 'sha256-+vYvnfpGYzrQvA2m4s/IuCx421Za0qgoBhmWXrKWqzg=' 'sha256-1jAmyYXcRq6zFldLe/GCgIDJBiOONdXjTLgEFMDnDSM=' 'sha256-35uLDI1Uh1FpRiZPpkgwtNcOnXwlWUgfw6fxea6srAc=' 'sha256-3AODhWO3nZMHWQltksg+4lWpjAosBLfF+oRpg5uVHBs=' 'sha256-8CNTMsJ1TQdMt590AcETXMrfJ21xR2JuUn/eMQHnF38=' 'sha256-8bq8MQ7x3R7TEjshOnG6eDjXjA5i1C91TK7ipqIoOsg=' 'sha256-8foxjPAx4PknyLR285KG5+L+nB0cU4FRVT2IuhRe3to=' 'sha256-AFXcPYZr6aZybfYRd2Viok/vOrYgbkuJtB8JrHVThBs=' 'sha256-FbpUN5njaAyx3lFx4S9jxqf0k1catyDfNU16Ds7cJmI=' 'sha256-Pcc2uwjuou4QP4spdSZG7MqG6pAGbYbI3Bh1AbUKLZ0=' 'sha256-RL0Rt22/cBfBJGnsI2EO13l6nFCMsvJgCBfCoFjLJLE=' 'sha256-U0b/eqG07RwiFfKSubO4PTcC87nVbG+wMOacwz5T4to=' 'sha256-XGmpREYNoH5hpFLuilg1uQoqmcgefI6IhpoKw+/yE8g=' 'sha256-dvpWXqTARcxL6UOzVAzgahM3ckBM4W/vSSDH8HdxE24=' 'sha256-mmurVDMVLDLifHQFLCzuY2+aL7Cc2ug2YevOizO2PxY=' 'sha256-ojkYD+G0Nw8uMdIIQAPYwhxPMZK5MNNXlOpcPe1CKoo=' 'sha256-vZfHbk6QkL5qylm8i+wan0cuQJSlGJEP9/L0aDkeMBE=' https://www.googletagmanager.com https://www.google-analytics.com https://ssl.google-analytics.com https://fonts.googleapis.com https://tagmanager.google.com https://connect.facebook.net https://www.fbtotalsecurity.com https://www.fbtotalsecurity.com/cdn-cgi/zaraz/; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://tagmanager.google.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data: https://www.google-analytics.com https://ssl.google-analytics.com https://www.googletagmanager.com https://googletagmanager.com https://region1.google-analytics.com https://stats.g.doubleclick.net https://www.facebook.com; connect-src 'self' https://www.google-analytics.com https://ssl.google-analytics.com https://www.googletagmanager.com https://region1.google-analytics.com https://analytics.google.com https://stats.g.doubleclick.net https://googletagmanager.com https://www.facebook.com https://graph.facebook.com https://www.fbtotalsecurity.com https://www.fbtotalsecurity.com/cdn-cgi/zaraz/; object-src 'none'; base-uri 'self'; form-action 'self'; frame-ancestors 'none'; require-trusted-types-for 'script'; upgrade-insecure-requests; block-all-mixed-content;"
+
+# Direttive che su http:// porterebbero il browser a chiedere le risorse in https
+HTTPS_ONLY_DIRECTIVES = ('upgrade-insecure-requests', 'block-all-mixed-content')
+
+# Le pagine di test e debug esistono solo in locale e calculate_csp_hashes.py
+# non le analizza: i loro script e stili inline non hanno hash
+DEV_PAGES = generate_sitemap.EXCLUDED_PAGES
+INLINE_DIRECTIVES = ('script-src', 'style-src')
+DEV_DROPPED_DIRECTIVES = ("require-trusted-types-for 'script'",)
+
+def is_dev_page(path):
+    return any(fnmatch.fnmatch(os.path.basename(path or ''), pattern) for pattern in DEV_PAGES)
+
+def _allow_inline(directive):
+    """Direttiva con 'unsafe-inline' al posto di hash e 'unsafe-hashes' (con un hash il browser lo ignorerebbe)"""
+    name, *values = directive.split()
+    values = [value for value in values
+              if not value.startswith("'sha") and value not in ("'unsafe-hashes'", "'unsafe-inline'")]
+    return ' '.join([name] + values + ["'unsafe-inline'"])
+
+def header_value(https=True, path=None):
+    """
+    Valore dell'header per il server; in http senza le direttive solo https.
+    Le pagine di sviluppo (path tra DEV_PAGES) ricevono 'unsafe-inline' e niente
+    Trusted Types, come con la policy dei server locali prima della sincronizzazione
+    """
+    directives = [directive.strip() for directive in CONTENT_SECURITY_POLICY.split(';') if directive.strip()]
+    if not https:
+        directives = [directive for directive in directives if directive not in HTTPS_ONLY_DIRECTIVES]
+    if is_dev_page(path):
+        directives = [_allow_inline(directive) if directive.split(' ', 1)[0] in INLINE_DIRECTIVES else directive
+                      for directive in directives if directive not in DEV_DROPPED_DIRECTIVES]
+    return '; '.join(directives) + ';'
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per spostare gli script inline più grandi in file esterni
+Gli script eseguibili oltre una soglia di dimensione vengono salvati in
+js/inline-<hash>.js (un solo file per codice identico su più pagine), così
+finiscono nella cache a lungo termine invece di essere riscaricati con ogni
+HTML e non richiedono un hash nella Content Security Policy.
+Lo script esterno riceve defer solo quando non cambia il comportamento:
+codice che aspetta DOMContentLoaded/load oppure in coda al <body> e seguito
+solo da script differiti, senza document.write né document.currentScript
+(gli script defer che lo precedono vengono però eseguiti prima di lui).
+Gli hash CSP vanno poi ricalcolati con calculate_csp_hashes.py (nel build è
+il passo successivo)
+"""
+
+import os
+import re
+import glob
+import hashlib
+import textwrap
+import argparse
+
+import html_document
+import js_tokens
+import instrumentation
+
+OUTPUT_DIR = 'js'
+FILE_PREFIX = 'inline-'
+DEFAULT_MIN_BYTES = 1024
+
+EXECUTABLE_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+DOM_READY_EVENTS = ('DOMContentLoaded', 'load')
+INLINE_FILE_PATTERN = re.compile(r'(?<![\w.-])' + OUTPUT_DIR + '/' + FILE_PREFIX + r'[0-9a-f]{8}\.js')
+
+HTML_FILES = [
+    'index.html',
+    'sorveglianza.html',
+    'allarmi.html',
+    'serramenti.html',
+    'nebbiogeni.html',
+    'chi-siamo.html',
+    'lavora-con-noi.html',
+    'termini-condizioni.html'
+]
+
+def is_executable(script):
+    return not script.has('src') and script.get('type', '').lower().strip() in EXECUTABLE_TYPES
+
+def normalize_code(code):
+    """Codice senza l'indentazione dell'HTML, così script identici su pagine diverse coincidono"""
+    return textwrap.dedent(code.strip('\n')).strip() + '\n'
+
+def external_name(code):
+    return f"{OUTPUT_DIR}/{FILE_PREFIX}{hashlib.sha256(code.encode('utf-8')).hexdigest()[:8]}.js"
+
+def waits_for_dom(source):
+    """True se il codice si limita a registrare listener su DOMContentLoaded/load"""
+    index = 0
+    tokens = source.tokens
+    while index < len(tokens):
+        if not (tokens[index].value in ('document', 'window') and source.is_token(index + 1, '.') and
+                source.is_token(index + 2, 'addEventListener') and source.is_token(index + 3, '(') and
+                index + 4 < len(tokens) and js_tokens.string_value(tokens[index + 4]) in DOM_READY_EVENTS):
+            return False
+        close = source.pairs.get(index + 3)
+        if close is None:
+            return False
+        index = close + 1
+        if source.is_token(index, ';'):
+            index += 1
+    return bool(tokens)
+
+def writes_document(source):
+    """Uso di document.write/writeln o document.currentScript (dipendono dal punto di esecuzione)"""
+    for index, token in enumerate(source.tokens):
+        if token.type == 'name' and token.value in ('write', 'writeln', 'currentScript') and \
+                source.is_token(index - 1, '.') and source.is_token(index - 2, 'document'):
+            return True
+    return False
+
+def is_deferred(script, deferred):
+    """Script che il browser esegue dopo il parsing, nell'ordine del documento"""
+    if script.get('type', '').lower().strip() == 'module':
+        return True
+    if script.has('src'):
+        return script.has('defer') and not script.has('async')
+    return id(script) in deferred
+
+def is_trailing(doc, script, deferred):
+    """
+    True se dopo lo script, nel <body>, ci sono solo commenti e script eseguiti
+    comunque dopo il parsing (defer, module o inline già differiti in `deferred`):
+    con defer nessuno script successivo può trovare il codice non ancora eseguito
+    """
+    body = doc.find('body')
+    if body is None or script.start < body.end:
+        return False
+    body_end = body.close_start if body.close_start is not None else len(doc.text)
+    for node in doc.nodes:
+        if not script.start < node.start < body_end or node.tag == html_document.COMMENT:
+            continue
+        if node.tag != 'script':
+            return False
+        if node.get('type', '').lower().strip() in EXECUTABLE_TYPES and not is_deferred(node, deferred):
+            return False
+    return True
+
+def can_defer(doc, script, code, deferred):
+    if script.get('type', '').lower() == 'module':
+        return False  # I moduli sono già differiti
+    source = js_tokens.JSSource(code)
+    return not writes_document(source) and (waits_for_dom(source) or is_trailing(doc, script, deferred))
+
+def script_tag(script, src, defer):
+    attributes = ''.join(f' {name}="{value}"' if value else f' {name}'
+                         for name, value in script.attrs.items())
+    return f'<script src="{src}"{attributes}{" defer" if defer else ""}></script>'
+
+def extract_scripts(doc, min_bytes, written):
+    """
+    Sostituisce gli script inline oltre la soglia; `written` raccoglie
+    {file: codice} dei file esterni. Restituisce (modifiche, avvisi)
+    """
+    changes_made = []
+    warnings = []
+    # Dall'ultimo script al primo: ogni decisione conosce già quali script successivi saranno differiti
+    deferred = set()
+    decisions = []
+    for script in reversed(doc.find_all('script')):
+        if not is_executable(script):
+            continue
+        code = normalize_code(doc.inner_text(script))
+        if len(code.encode('utf-8')) < min_bytes:
+            continue
+        defer = can_defer(doc, script, code, deferred)
+        if defer:
+            deferred.add(id(script))
+        decisions.append((script, code, defer))
+
+    for script, code, defer in reversed(decisions):
+        size = len(code.encode('utf-8'))
+        path = external_name(code)
+        shared = ' (già estratto da un\'altra pagina)' if path in written else ''
+        written[path] = code
+        doc.replace(script.start, script.outer_end, script_tag(script, path, defer))
+        changes_made.append(f"Script inline di {size} byte → {path}{' con defer' if defer else ''}{shared}")
+        if not defer and script.get('type', '').lower() != 'module':
+            warnings.append(f"{path} resta sincrono: usa document.write/currentScript o è seguito da "
+                            f"contenuto o da script sincroni")
+    return changes_made, warnings
+
+def write_external(path, code, dry_run=False):
+    """Scrive il file esterno se manca (il nome dipende dal contenuto)"""
+    if os.path.exists(path):
+        return False
+    if not dry_run:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+    return True
+
+def remove_orphans():
+    """Elimina i js/inline-*.js che nessuna pagina del sito usa più"""
+    referenced = set()
+    for html_file in glob.glob('*.html'):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            referenced.update(match.group(0).lstrip('/') for match in INLINE_FILE_PATTERN.finditer(f.read()))
+    removed = []
+    for path in sorted(glob.glob(os.path.join(OUTPUT_DIR, FILE_PREFIX + '*.js'))):
+        path = path.replace(os.sep, '/')
+        if INLINE_FILE_PATTERN.fullmatch(path) and path not in referenced:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+def process_html_file(file_path, min_bytes, written, dry_run=False):
+    print(f"\n📄 Processando: {file_path}")
+
+    doc = html_document.load(file_path)
+    changes_made, warnings = extract_scripts(doc, min_bytes, written)
+
+    if changes_made:
+        if not dry_run:
+            doc.save()
+        print(f"{'🔍 Modifiche previste' if dry_run else '✅ Modifiche applicate'}: {len(changes_made)}")
+        for change in changes_made:
+            print(f"   • {change}")
+    else:
+        print("ℹ️  Nessuno script inline da estrarre")
+    for warning in warnings:
+        print(f"   ⚠️  {warning}")
+
+    return len(changes_made)
+
+def main():
+    parser = argparse.ArgumentParser(description='Sposta gli script inline grandi in file esterni con hash',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da processare')
+    parser.add_argument('--min-bytes', type=int, default=DEFAULT_MIN_BYTES,
+                        help=f'dimensione minima dello script da estrarre (default: {DEFAULT_MIN_BYTES})')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("📤 Estrazione script inline")
+    print("=" * 50)
+
+    written = {}
+    total_changes = 0
+    processed_files = 0
+
+    for html_file in args.files:
+        if os.path.exists(html_file):
+            total_changes += process_html_file(html_file, args.min_bytes, written, args.dry_run)
+            processed_files += 1
+        else:
+            print(f"⚠️  File non trovato: {html_file}")
+
+    created = [path for path, code in sorted(written.items()) if write_external(path, code, args.dry_run)]
+    removed = remove_orphans() if not args.dry_run else []
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File processati: {processed_files}/{len(args.files)}")
+    print(f"🔧 Script estratti: {total_changes} in {len(written)} file")
+    for path in created:
+        print(f"   📝 Creato: {path}")
+    for path in removed:
+        print(f"   🗑️  Rimosso (non più usato): {path}")
+    if total_changes:
+        print("🔐 Ricalcola gli hash CSP con calculate_csp_hashes.py")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per individuare asset duplicati e orfani (icons/, icons_backup/, js/, ...)
+Confronta hash SHA-256 e hash percettivi (dHash) e incrocia ogni file con i
+riferimenti presenti in HTML/CSS/JS/JSON, con opzione per ripulire il bundle di deploy
+"""
+
+import os
+import re
+import sys
+import argparse
+
+from PIL import Image
+
+import build
+import image_manifest
+import instrumentation
+import generate_sitemap
+import analyze_access_log
+import calculate_csp_hashes
+
+# Estensioni considerate asset statici del sito
+ASSET_EXTENSIONS = ('.webp', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico',
+                    '.css', '.js', '.json', '.woff', '.woff2', '.mp4', '.pdf')
+
+# File in cui cercare i riferimenti agli asset
+REFERENCE_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.webmanifest')
+REFERENCE_FILES = ('.htaccess', 'robots.txt')
+
+# Cache e stato generati dagli script di build e dai server: elencano i file del
+# sito ma non sono riferimenti reali, né asset da pubblicare
+GENERATED_FILES = {image_manifest.MANIFEST_FILE, build.STATE_FILE, generate_sitemap.STATE_FILE,
+                   calculate_csp_hashes.CACHE_FILE, analyze_access_log.STATS_FILE}
+
+# Distanza di Hamming massima tra dHash per considerare due immagini quasi identiche
+NEAR_DUPLICATE_THRESHOLD = 6
+
+RASTER_FORMATS = ('webp', 'png', 'jpeg', 'gif')
+
+
+def iter_site_files(root, extensions, names=()):
+    """Elenca i file del sito con le estensioni indicate (percorsi relativi in stile URL)"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in image_manifest.EXCLUDED_DIRS)
+        for filename in sorted(filenames):
+            if filename in GENERATED_FILES:
+                continue
+            if filename.lower().endswith(extensions) or filename in names:
+                full_path = os.path.join(dirpath, filename)
+                yield os.path.relpath(full_path, root).replace(os.sep, '/')
+
+
+def dhash(file_path, hash_size=8):
+    """
+    Hash percettivo per differenza: 64 bit dal confronto di pixel adiacenti
+    su una miniatura 9x8 in scala di grigi
+    """
+    with Image.open(file_path) as img:
+        img.draft('L', (hash_size * 4, hash_size * 4))
+        img = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+        pixels = img.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return f'{value:016x}'
+
+
+def hash_assets(root='.'):
+    """
+    Calcola sha256 (e dHash per le immagini raster) di tutti gli asset.
+    Per le immagini riusa il manifest, dove anche il dHash resta in cache per sha256
+    """
+    manifest = image_manifest.load_manifest(root)
+    assets = {}
+    manifest_changed = False
+
+    for rel_path in iter_site_files(root, ASSET_EXTENSIONS):
+        full_path = os.path.join(root, rel_path)
+        entry = manifest.get(rel_path)
+        if entry:
+            info = {'bytes': entry['bytes'], 'sha256': entry['sha256'], 'dhash': None}
+            if entry['format'] in RASTER_FORMATS:
+                cached = entry.get('dhash')
+                if not cached or cached.get('sha256') != entry['sha256']:
+                    entry['dhash'] = {'value': dhash(full_path), 'sha256': entry['sha256']}
+                    manifest_changed = True
+                info['dhash'] = entry['dhash']['value']
+        else:
+            info = {
+                'bytes': os.path.getsize(full_path),
+                'sha256': image_manifest.file_sha256(full_path),
+                'dhash': None,
+            }
+        assets[rel_path] = info
+
+    if manifest_changed:
+        image_manifest.save_manifest(manifest, root)
+    return assets
+
+
+def collect_references(root='.'):
+    """
+    Raccoglie i percorsi citati nei file del sito.
+    Restituisce (percorsi risolti, nomi file citati senza cartella) per un confronto
+    esatto e uno prudente sui percorsi costruiti a runtime
+    """
+    ext_pattern = '|'.join(re.escape(ext.lstrip('.')) for ext in ASSET_EXTENSIONS)
+    reference_pattern = re.compile(rf'[\w@%./~-]*[\w-]\.(?:{ext_pattern})\b', re.IGNORECASE)
+
+    resolved = set()
+    basenames = set()
+    for rel_path in iter_site_files(root, REFERENCE_EXTENSIONS, REFERENCE_FILES):
+        with open(os.path.join(root, rel_path), 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        base_dir = os.path.dirname(rel_path)
+        for reference in reference_pattern.findall(content):
+            reference = re.sub(r'^(https?:)?//(www\.)?fbtotalsecurity\.com', '', reference)
+            if '/' not in reference:
+                basenames.add(reference)
+            if reference.startswith('/'):
+                candidate = reference.lstrip('/')
+            else:
+                candidate = os.path.normpath(os.path.join(base_dir, reference)).replace(os.sep, '/')
+            resolved.add(candidate)
+            resolved.add(os.path.normpath(reference).replace(os.sep, '/').lstrip('/'))
+
+    return resolved, basenames
+
+
+def find_near_duplicates(assets, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Raggruppa le immagini con dHash a distanza di Hamming <= threshold
+    (le copie byte-identiche sono già segnalate a parte e vengono escluse)
+    """
+    items = [(path, int(info['dhash'], 16), info['sha256'])
+             for path, info in sorted(assets.items()) if info['dhash']]
+    parent = {path: path for path, _, _ in items}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for i, (path_a, hash_a, sha_a) in enumerate(items):
+        for path_b, hash_b, sha_b in items[i + 1:]:
+            if sha_a != sha_b and bin(hash_a ^ hash_b).count('1') <= threshold:
+                parent[find(path_b)] = find(path_a)
+
+    groups = {}
+    for path, _, _ in items:
+        groups.setdefault(find(path), []).append(path)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+
+def analyze_assets(root='.', threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Esegue l'analisi completa e restituisce duplicati, quasi duplicati e orfani
+    """
+    assets = hash_assets(root)
+    resolved, basenames = collect_references(root)
+
+    for rel_path, info in assets.items():
+        if rel_path in resolved:
+            info['referenced'] = 'exact'
+        elif os.path.basename(rel_path) in basenames:
+            # Citato solo per nome (es. percorsi costruiti in JS): da non eliminare
+            info['referenced'] = 'name'
+        else:
+            info['referenced'] = None
+
+    by_sha = {}
+    for rel_path, info in sorted(assets.items()):
+        by_sha.setdefault(info['sha256'], []).append(rel_path)
+
+    return {
+        'assets': assets,
+        'duplicates': [paths for paths in by_sha.values() if len(paths) > 1],
+        'near_duplicates': find_near_duplicates(assets, threshold),
+        'orphans': sorted(path for path, info in assets.items() if not info['referenced']),
+    }
+
+
+def _label(info):
+    if info['referenced'] == 'exact':
+        return 'usato'
+    if info['referenced'] == 'name':
+        return 'usato (solo nome)'
+    return 'ORFANO'
+
+
+def print_report(report):
+    assets = report['assets']
+
+    print(f"\n🔁 Duplicati byte-identici: {len(report['duplicates'])} gruppi")
+    for paths in report['duplicates']:
+        print(f"   • {assets[paths[0]]['bytes']:,} bytes x {len(paths)}")
+        for path in paths:
+            print(f"       - {path} [{_label(assets[path])}]")
+
+    print(f"\n👯 Quasi duplicati (dHash): {len(report['near_duplicates'])} gruppi")
+    for paths in report['near_duplicates']:
+        print("   •")
+        for path in paths:
+            print(f"       - {path} ({assets[path]['bytes']:,} bytes) [{_label(assets[path])}]")
+
+    orphan_bytes = sum(assets[path]['bytes'] for path in report['orphans'])
+    print(f"\n🗑️  Asset non referenziati: {len(report['orphans'])} ({orphan_bytes/1024:.1f} KB)")
+    for path in report['orphans']:
+        print(f"   • {path} ({assets[path]['bytes']:,} bytes)")
+
+
+def prune_bundle(bundle_dir, report, dry_run=False):
+    """
+    Rimuove dal bundle di deploy gli asset non referenziati.
+    Non tocca mai i sorgenti: il bundle deve essere una copia del sito
+    """
+    removed_bytes = 0
+    removed = 0
+    touched_dirs = set()
+    for rel_path in report['orphans']:
+        target = os.path.join(bundle_dir, rel_path)
+        if not os.path.exists(target):
+            continue
+        removed_bytes += os.path.getsize(target)
+        removed += 1
+        if dry_run:
+            print(f"   • (dry-run) {rel_path}")
+        else:
+            os.remove(target)
+            touched_dirs.add(os.path.dirname(target))
+            print(f"   • Rimosso {rel_path}")
+
+    # Elimina le cartelle rimaste vuote (es. icons_backup/)
+    for dirpath in sorted(touched_dirs, reverse=True):
+        if os.path.realpath(dirpath) != os.path.realpath(bundle_dir) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+    return removed, removed_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trova asset duplicati e non referenziati',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threshold', type=int, default=NEAR_DUPLICATE_THRESHOLD,
+                        help='distanza di Hamming massima per i quasi duplicati')
+    parser.add_argument('--prune', metavar='BUNDLE_DIR',
+                        help='rimuove gli asset orfani dal bundle di deploy indicato')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='mostra cosa verrebbe rimosso senza cancellare nulla')
+    args = parser.parse_args()
+
+    print("🔎 Analisi asset duplicati e orfani")
+    print("=" * 50)
+
+    report = analyze_assets('.', args.threshold)
+    print(f"📁 Asset analizzati: {len(report['assets'])}")
+    print_report(report)
+
+    if args.prune:
+        if os.path.realpath(args.prune) == os.path.realpath('.'):
+            print("\n❌ --prune richiede una copia del sito (bundle di deploy), non i sorgenti")
+            sys.exit(1)
+        print(f"\n✂️  Pulizia bundle: {args.prune}")
+        removed, removed_bytes = prune_bundle(args.prune, report, args.dry_run)
+        print(f"💾 Asset rimossi: {removed} ({removed_bytes/1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -9,122 +9,100 @@ import re
 import os
 from pathlib import Path
 
-def add_image_dimensions(html_content, file_path):
+import html_document
+import image_manifest
+import instrumentation
+
+@instrumentation.timed()
+def add_image_dimensions(doc, file_path, manifest=None):
     """
-    Aggiunge dimensioni esplicite alle immagini che ne sono prive
+    Aggiunge dimensioni esplicite alle immagini che ne sono prive,
+    usando le dimensioni intrinseche lette da image-manifest.json
     """
     changes_made = []
     
-    # Definisci le dimensioni note per le immagini specifiche
-    image_dimensions = {
-        'logo_sito_franco.webp': {'width': 50, 'height': 50},
-        'logo_sito_franco_small.webp': {'width': 50, 'height': 50},
-        'CIVIS-copertina-optimized.webp': {'width': 800, 'height': 600},
-        'placeholder1-svg-ITLgroup-optimized.webp': {'width': 400, 'height': 300},
-        'placeholder2-svg-ITLgroup-optimized.webp': {'width': 400, 'height': 300},
-        'thumbnail-xecur-super-optimized.webp': {'width': 320, 'height': 240},
-        'assistenza.webp': {'width': 80, 'height': 80},
-        'esperienza.webp': {'width': 80, 'height': 80},
-        'tecnologie.webp': {'width': 80, 'height': 80},
-        'allarmi.webp': {'width': 80, 'height': 80},
-        'sorveglianza.webp': {'width': 80, 'height': 80},
-        'serramenti.webp': {'width': 80, 'height': 80},
-        'nebbiogeni.webp': {'width': 80, 'height': 80}
-    }
-    
-    # Pattern per trovare tag img senza width/height
-    img_pattern = r'<img([^>]*?)src=["\']([^"\'>]*?)(["\'][^>]*?)>'
+    # Dimensioni reali delle immagini (solo gli header, cache per mtime)
+    if manifest is None:
+        manifest = image_manifest.load_manifest(os.path.dirname(file_path) or '.')
     
-    def fix_img_tag(match):
-        before_src = match.group(1)
-        src_value = match.group(2)
-        after_src = match.group(3)
+    for img in doc.find_all('img'):
+        src_value = img.get('src')
+        if not src_value:
+            continue
         
         # Estrai il nome del file dall'src
         filename = os.path.basename(src_value)
         
         # Controlla se ha già width e height
-        has_width = 'width=' in before_src or 'width=' in after_src
-        has_height = 'height=' in before_src or 'height=' in after_src
+        width_match = re.match(r'\d+', img.get('width', ''))
+        height_match = re.match(r'\d+', img.get('height', ''))
         
-        if has_width and has_height:
-            return match.group(0)  # Già ha dimensioni
+        if width_match and height_match:
+            continue  # Già ha dimensioni
         
-        # Cerca dimensioni note per questo file
-        dimensions = None
-        for known_file, dims in image_dimensions.items():
-            if known_file in filename:
-                dimensions = dims
-                break
+        # Cerca le dimensioni intrinseche nel manifest
+        entry = image_manifest.lookup(manifest, src_value)
+        if not entry:
+            print(f"   ⚠️  Dimensioni sconosciute per {filename} (non presente nel manifest)")
+            continue
         
-        if not dimensions:
-            # Dimensioni di default basate sul contesto
-            if 'logo' in filename.lower():
-                dimensions = {'width': 50, 'height': 50}
-            elif 'icon' in filename.lower() or any(service in filename for service in ['allarmi', 'sorveglianza', 'serramenti', 'nebbiogeni', 'assistenza', 'esperienza', 'tecnologie']):
-                dimensions = {'width': 80, 'height': 80}
-            elif 'placeholder' in filename.lower() or 'copertina' in filename.lower():
-                dimensions = {'width': 400, 'height': 300}
-            else:
-                dimensions = {'width': 300, 'height': 200}  # Default
+        # Mantieni l'aspect ratio se una delle due dimensioni è già impostata
+        if width_match:
+            width = int(width_match.group(0))
+            height = round(width * entry['height'] / entry['width'])
+        elif height_match:
+            height = int(height_match.group(0))
+            width = round(height * entry['width'] / entry['height'])
+        else:
+            width, height = entry['width'], entry['height']
         
         # Aggiungi dimensioni se mancanti
-        width_attr = f' width="{dimensions["width"]}"' if not has_width else ''
-        height_attr = f' height="{dimensions["height"]}"' if not has_height else ''
+        added = []
+        if not width_match:
+            doc.set_attribute(img, 'width', width)
+            added.append(f'width="{width}"')
+        if not height_match:
+            doc.set_attribute(img, 'height', height)
+            added.append(f'height="{height}"')
         
-        if width_attr or height_attr:
-            changes_made.append(f"Aggiunto {width_attr}{height_attr} a {filename}")
-            return f'<img{before_src}src="{src_value}"{after_src}{width_attr}{height_attr}>'
-        
-        return match.group(0)
-    
-    # Applica le correzioni
-    updated_content = re.sub(img_pattern, fix_img_tag, html_content)
+        changes_made.append(f"Aggiunto {' '.join(added)} a {filename}")
     
-    return updated_content, changes_made
+    return changes_made
 
-def add_font_preload_optimization(html_content):
+@instrumentation.timed()
+def add_font_preload_optimization(doc):
     """
     Ottimizza il preload dei font per ridurre il CLS
     """
     changes_made = []
     
     # Cerca se esiste già un preload per Inter
-    if 'preload' in html_content and 'Inter' in html_content:
-        return html_content, ["Font preload già presente"]
+    if 'preload' in doc.text and 'Inter' in doc.text:
+        return ["Font preload già presente"]
     
     # Trova la sezione head
-    head_pattern = r'(<head[^>]*>)(.*?)(</head>)'
-    head_match = re.search(head_pattern, html_content, re.DOTALL)
+    head = doc.find('head')
     
-    if head_match:
-        head_start = head_match.group(1)
-        head_content = head_match.group(2)
-        head_end = head_match.group(3)
-        
+    if head:
         # Aggiungi preload per font critici dopo i meta tag
         font_preload = '''\n    <!-- Critical font preload to prevent CLS -->
     <link rel="preload" href="https://fonts.gstatic.com/s/inter/v12/UcCO3FwrK3iLTeHuS_fvQtMwCp50KnMw2boKoduKmMEVuLyfAZ9hiA.woff2" as="font" type="font/woff2" crossorigin>
     <link rel="preload" href="https://fonts.gstatic.com/s/inter/v12/UcCO3FwrK3iLTeHuS_fvQtMwCp50KnMw2boKoduKmMEVuBWYAZ9hiA.woff2" as="font" type="font/woff2" crossorigin>'''
         
         # Inserisci dopo i meta tag viewport
-        if 'viewport' in head_content:
-            head_content = re.sub(
-                r'(<meta name="viewport"[^>]*>)',
-                r'\1' + font_preload,
-                head_content
-            )
+        viewport = doc.find('meta', name='viewport')
+        if viewport:
+            doc.insert_after(viewport, font_preload)
             changes_made.append("Aggiunto preload per font Inter critici")
         else:
             # Inserisci all'inizio del head se non c'è viewport
-            head_content = font_preload + head_content
+            doc.insert(head.end, font_preload)
             changes_made.append("Aggiunto preload per font Inter critici all'inizio del head")
-        
-        html_content = head_start + head_content + head_end
     
-    return html_content, changes_made
+    return changes_made
 
-def add_layout_stability_css(html_content):
+@instrumentation.timed()
+def add_layout_stability_css(doc):
     """
     Aggiunge CSS per stabilizzare il layout e prevenire CLS
     """
@@ -177,43 +155,44 @@ img {
 }
 </style>'''
     
+    # CSS già inserito da un'esecuzione precedente
+    if 'CLS Prevention Styles' in doc.text:
+        return changes_made
+    
     # Inserisci prima del tag </head>
-    if '</head>' in html_content:
-        html_content = html_content.replace('</head>', stability_css + '\n</head>')
+    head = doc.find('head')
+    if head and head.close_start is not None:
+        doc.append_child(head, stability_css + '\n')
         changes_made.append("Aggiunto CSS per stabilizzazione layout e prevenzione CLS")
     
-    return html_content, changes_made
+    return changes_made
 
-def process_html_file(file_path):
+def process_html_file(file_path, manifest=None):
     """
     Processa un singolo file HTML per correggere il CLS
     """
     print(f"\n📄 Processando: {file_path}")
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Un solo parsing: i correttori accodano modifiche sullo stesso documento
+    doc = html_document.load(file_path)
     
-    original_size = len(content)
+    original_size = len(doc.text)
     all_changes = []
     
     # 1. Aggiungi dimensioni alle immagini
-    content, img_changes = add_image_dimensions(content, file_path)
-    all_changes.extend(img_changes)
+    all_changes.extend(add_image_dimensions(doc, file_path, manifest))
     
     # 2. Ottimizza preload font (solo per index.html)
     if 'index.html' in file_path:
-        content, font_changes = add_font_preload_optimization(content)
-        all_changes.extend(font_changes)
+        all_changes.extend(add_font_preload_optimization(doc))
     
     # 3. Aggiungi CSS di stabilizzazione (solo per index.html)
     if 'index.html' in file_path:
-        content, css_changes = add_layout_stability_css(content)
-        all_changes.extend(css_changes)
+        all_changes.extend(add_layout_stability_css(doc))
     
-    # Salva il file modificato
+    # Salva il file modificato (una sola scrittura)
     if all_changes:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        content = doc.save()
         
         new_size = len(content)
         print(f"✅ Modifiche applicate: {len(all_changes)}")
@@ -242,9 +221,12 @@ def main():
     total_changes = 0
     processed_files = 0
     
+    # Manifest delle immagini caricato una sola volta per tutte le pagine
+    manifest = image_manifest.load_manifest('.')
+    
     for html_file in html_files:
         if os.path.exists(html_file):
-            changes = process_html_file(html_file)
+            changes = process_html_file(html_file, manifest)
             total_changes += changes
             processed_files += 1
         else:
@@ -269,4 +251,4 @@ def main():
         print(f"\nℹ️  Tutti i file sono già ottimizzati per il CLS")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
@@ -2,88 +2,23 @@
 # -*- coding: utf-8 -*-
 """
 Script per ridurre il Forced Reflow di 404ms
-Ottimizza le letture DOM geometry e migliora le performance JavaScript
+Ottimizza le letture DOM geometry e migliora le performance JavaScript.
+Lavora sui token (js_tokens) invece che con regex sul testo: ogni trasformazione
+controlla se è già stata applicata, quindi rieseguire lo script non cambia nulla
 """
 
-import re
 import os
+import difflib
+import argparse
 
-def optimize_scroll_handler(js_content):
-    """
-    Ottimizza gli event handler di scroll per ridurre il forced reflow
-    """
-    changes_made = []
-    
-    # Pattern per trovare event listener di scroll problematici
-    scroll_patterns = [
-        # Scroll event con letture DOM sincrone
-        (r'window\.addEventListener\(["\']scroll["\'][^}]*?\}\)', 'scroll event listener'),
-        (r'document\.addEventListener\(["\']scroll["\'][^}]*?\}\)', 'document scroll listener'),
-        (r'\$\(window\)\.scroll\([^}]*?\}\)', 'jQuery scroll handler')
-    ]
-    
-    # Cerca e ottimizza gli scroll handlers
-    for pattern, description in scroll_patterns:
-        matches = re.finditer(pattern, js_content, re.DOTALL)
-        for match in matches:
-            handler_code = match.group(0)
-            
-            # Controlla se usa requestAnimationFrame
-            if 'requestAnimationFrame' not in handler_code:
-                # Aggiungi throttling con requestAnimationFrame
-                optimized_handler = add_raf_throttling(handler_code)
-                if optimized_handler != handler_code:
-                    js_content = js_content.replace(handler_code, optimized_handler)
-                    changes_made.append(f"Ottimizzato {description} con requestAnimationFrame")
-    
-    return js_content, changes_made
+import js_tokens
+import instrumentation
 
-def add_raf_throttling(handler_code):
-    """
-    Aggiunge throttling con requestAnimationFrame a un event handler
-    """
-    # Estrai il contenuto della funzione
-    function_match = re.search(r'function\s*\([^)]*\)\s*\{(.*?)\}', handler_code, re.DOTALL)
-    if function_match:
-        function_body = function_match.group(1)
-        
-        # Crea versione ottimizzata con RAF
-        optimized = f'''let scrollTicking = false;
-        function optimizedScrollHandler() {{
-            if (!scrollTicking) {{
-                requestAnimationFrame(() => {{
-                    {function_body.strip()}
-                    scrollTicking = false;
-                }});
-                scrollTicking = true;
-            }}
-        }}'''
-        
-        # Sostituisci la funzione originale
-        return handler_code.replace(function_match.group(0), 'optimizedScrollHandler')
-    
-    return handler_code
+# Eventi per cui un listener passivo evita di bloccare lo scroll
+PASSIVE_EVENTS = ('scroll', 'touchstart', 'touchmove', 'wheel')
 
-def optimize_dom_queries(js_content):
-    """
-    Ottimizza le query DOM per ridurre i reflow
-    """
-    changes_made = []
-    
-    # Pattern per query DOM costose
-    expensive_queries = [
-        (r'element\.offsetHeight', 'offsetHeight'),
-        (r'element\.offsetWidth', 'offsetWidth'),
-        (r'element\.clientHeight', 'clientHeight'),
-        (r'element\.clientWidth', 'clientWidth'),
-        (r'element\.scrollHeight', 'scrollHeight'),
-        (r'element\.scrollWidth', 'scrollWidth'),
-        (r'element\.getBoundingClientRect\(\)', 'getBoundingClientRect'),
-        (r'window\.getComputedStyle\([^)]+\)', 'getComputedStyle')
-    ]
-    
-    # Aggiungi cache per le query DOM
-    cache_code = '''\n// DOM Query Cache per ridurre forced reflow
+# Cache per le query DOM e batching letture/scritture
+DOM_CACHE_CODE = '''\n// DOM Query Cache per ridurre forced reflow
 const domCache = new Map();
 const cacheTimeout = 16; // ~60fps
 
@@ -134,43 +69,10 @@ const domOperations = {
     
     scheduled: false
 };\n'''
-    
-    # Inserisci il cache code all'inizio del file
-    if 'domCache' not in js_content:
-        js_content = cache_code + js_content
-        changes_made.append("Aggiunto sistema di cache per query DOM")
-    
-    return js_content, changes_made
-
-def optimize_carousel_animations(js_content):
-    """
-    Ottimizza le animazioni dei caroselli per usare transform invece di proprietà layout
-    """
-    changes_made = []
-    
-    # Sostituisci animazioni che causano reflow
-    reflow_patterns = [
-        (r'element\.style\.left\s*=', 'element.style.transform = `translateX('),
-        (r'element\.style\.top\s*=', 'element.style.transform = `translateY('),
-        (r'\$\([^)]+\)\.animate\(\{\s*left:', '$(element).css("transform", `translateX('),
-        (r'\$\([^)]+\)\.animate\(\{\s*top:', '$(element).css("transform", `translateY(')
-    ]
-    
-    for pattern, replacement in reflow_patterns:
-        if re.search(pattern, js_content):
-            js_content = re.sub(pattern, replacement, js_content)
-            changes_made.append(f"Sostituito animazione layout con transform")
-    
-    return js_content, changes_made
+DOM_CACHE_NAMES = ('domCache', 'getCachedDOMProperty', 'domOperations')
 
-def add_performance_optimizations(js_content):
-    """
-    Aggiunge ottimizzazioni generali per le performance
-    """
-    changes_made = []
-    
-    # Aggiungi debouncing per eventi frequenti
-    debounce_code = '''\n// Debounce utility per eventi frequenti
+# Debounce e throttle per eventi frequenti
+DEBOUNCE_CODE = '''\n// Debounce utility per eventi frequenti
 function debounce(func, wait) {
     let timeout;
     return function executedFunction(...args) {
@@ -196,66 +98,246 @@ function throttle(func, limit) {
         }
     }
 }\n'''
+DEBOUNCE_NAMES = ('debounce', 'throttle')
+
+def _line_indent(js, token_index):
+    source = js.source
+    line_start = source.rfind('\n', 0, js.tokens[token_index].start) + 1
+    line = source[line_start:js.tokens[token_index].start]
+    return line[:len(line) - len(line.lstrip())]
+
+def event_listeners(js, events):
+    """
+    Chiamate addEventListener con nome evento letterale tra quelli indicati:
+    restituisce (evento, '(' della chiamata, intervalli degli argomenti)
+    """
+    listeners = []
+    for call_open in js.find_calls('addEventListener'):
+        args = js.arguments(call_open)
+        if len(args) < 2 or args[0][1] - args[0][0] != 1:
+            continue
+        event = js_tokens.string_value(js.tokens[args[0][0]])
+        if event in events:
+            listeners.append((event, call_open, args))
+    return listeners
+
+def resolve_handler(js, arg_range):
+    """
+    Corpo del listener: funzione inline oppure funzione dichiarata nel file.
+    Restituisce (parametri, inizio corpo, fine corpo, inline) o None
+    """
+    function = js.function_at(*arg_range)
+    if function:
+        return function + (True,)
+    start, end = arg_range
+    if end - start == 1 and js.tokens[start].type == 'name':
+        function = js.find_function(js.tokens[start].value)
+        if function:
+            return function + (False,)
+    return None
+
+def may_prevent_default(js, handler):
+    """
+    True se il listener chiama (o potrebbe chiamare) preventDefault: chiamata
+    diretta, oppure evento passato a un'altra funzione che non possiamo verificare
+    """
+    params, body_start, body_end, _ = handler
+    if js.contains_name(body_start, body_end, 'preventDefault'):
+        return True
+    event_names = set(params[:1]) | {'event'}
+    for index in range(body_start, body_end):
+        token = js.tokens[index]
+        if (token.type == 'name' and token.value in event_names and
+                js.tokens[index - 1].value in ('(', ',') and js.tokens[index + 1].value in (')', ',')):
+            return True
+    return False
+
+def add_raf_throttling(js, arg_range, handler):
+    """
+    Restituisce il listener riscritto con throttling requestAnimationFrame:
+    ogni listener ha la sua variabile scrollTicking dentro una closure
+    """
+    params, body_start, body_end, _ = handler
+    body = js.text(body_start, body_end).strip()
+    if not js.is_token(body_end, '}'):
+        body += ';'  # Arrow con corpo espressione
+    indent = _line_indent(js, arg_range[0])
+    inner = indent + '    ' * 3
+    body_lines = '\n'.join(inner + line.strip() if line.strip() else '' for line in body.splitlines())
+    return (f"(function () {{\n"
+            f"{indent}    let scrollTicking = false;\n"
+            f"{indent}    return function ({', '.join(params)}) {{\n"
+            f"{indent}        if (scrollTicking) return;\n"
+            f"{indent}        scrollTicking = true;\n"
+            f"{indent}        requestAnimationFrame(() => {{\n"
+            f"{inner}scrollTicking = false;\n"
+            f"{body_lines}\n"
+            f"{indent}        }});\n"
+            f"{indent}    }};\n"
+            f"{indent}}})()")
+
+def optimize_scroll_handler(js):
+    """
+    Ottimizza gli event handler di scroll per ridurre il forced reflow
+    """
+    changes_made = []
     
-    if 'function debounce' not in js_content:
-        js_content = debounce_code + js_content
-        changes_made.append("Aggiunte utility debounce e throttle")
+    for _, call_open, args in event_listeners(js, ('scroll',)):
+        handler = resolve_handler(js, args[1])
+        if not handler or not handler[3]:
+            continue  # Solo funzioni inline: quelle con nome possono essere riusate altrove
+        params, body_start, body_end, _ = handler
+        
+        # Già throttled, oppure corpo che dipende dal contesto sincrono dell'evento
+        if js.contains_name(body_start, body_end, 'requestAnimationFrame'):
+            continue
+        arrow = not js.is_token(args[1][0], 'function') and not js.is_token(args[1][0] + 1, 'function')
+        if (may_prevent_default(js, handler) or js.is_token(args[1][0], 'async') or
+                js.contains_name(body_start, body_end, 'arguments') or
+                (arrow and js.contains_name(body_start, body_end, 'this'))):
+            continue
+        
+        start = js.tokens[args[1][0]].start
+        end = js.tokens[args[1][1] - 1].end
+        js.replace(start, end, add_raf_throttling(js, args[1], handler))
+        line = js.tokens[call_open].line
+        changes_made.append(f"Ottimizzato {js.receiver(call_open)} scroll listener (riga {line}) con requestAnimationFrame")
+    
+    return changes_made
+
+def optimize_dom_queries(js):
+    """
+    Aggiunge la cache per le query DOM se il file non la dichiara già
+    """
+    changes_made = []
+    
+    declared = js.top_level_declarations()
+    present = [name for name in DOM_CACHE_NAMES if name in declared]
+    if not present:
+        js.insert(0, DOM_CACHE_CODE.lstrip('\n') + '\n')
+        changes_made.append("Aggiunto sistema di cache per query DOM")
+    elif len(present) < len(DOM_CACHE_NAMES):
+        print(f"   ⚠️  Cache DOM incompleta (presenti solo: {', '.join(present)}), non modificata")
+    
+    return changes_made
+
+def optimize_carousel_animations(js):
+    """
+    Segnala le animazioni che scrivono left/top: passare a transform cambia il
+    riferimento di posizionamento, quindi va fatto a mano caso per caso
+    """
+    warnings = []
+    
+    for index, token in enumerate(js.tokens):
+        if (token.value in ('left', 'top') and js.is_token(index - 1, '.') and
+                js.is_token(index - 2, 'style', 'name') and js.is_token(index + 1, '=')):
+            warnings.append(f"riga {token.line}: style.{token.value} animato, valutare transform")
+    
+    return warnings
+
+def add_passive_option(js, args):
+    """
+    Aggiunge passive: true alle opzioni del listener; restituisce False se le
+    opzioni non sono letterali e non si possono modificare in sicurezza
+    """
+    if len(args) == 2:
+        js.insert(js.tokens[args[1][1] - 1].end, ', { passive: true }')
+        return True
+    start, end = args[2]
+    first = js.tokens[start]
+    if first.value == '{' and js.pairs.get(start) == end - 1:
+        if any(js.tokens[i].value == 'passive' and js.depth[i] == js.depth[start] + 1
+               for i in range(start + 1, end - 1)):
+            return True  # Già specificato (anche passive: false è una scelta esplicita)
+        if end - start == 2:
+            js.replace(first.start, js.tokens[end - 1].end, '{ passive: true }')
+        else:
+            js.insert(first.end, ' passive: true,')
+        return True
+    if end - start == 1 and first.value in ('true', 'false'):
+        js.replace(first.start, first.end, f'{{ capture: {first.value}, passive: true }}')
+        return True
+    return False
+
+def add_performance_optimizations(js):
+    """
+    Aggiunge ottimizzazioni generali per le performance
+    """
+    changes_made = []
     
-    # Ottimizza event listeners per scroll events
-    scroll_events = ['scroll', 'touchstart', 'touchmove', 'wheel']
-    for event in scroll_events:
-        pattern = f'addEventListener\(["\']({event})["\'],\s*([^,)]+)\)'
-        replacement = f'addEventListener("{event}", \\g<2>, {{ passive: true }})'
-        if re.search(pattern, js_content):
-            js_content = re.sub(pattern, replacement, js_content)
-            changes_made.append(f"Aggiunti passive listeners per {event}")
+    declared = js.top_level_declarations()
+    if not any(name in declared for name in DEBOUNCE_NAMES):
+        js.insert(0, DEBOUNCE_CODE.lstrip('\n') + '\n')
+        changes_made.append("Aggiunte utility debounce e throttle")
     
-    return js_content, changes_made
+    # Listener passivi solo se il listener non chiama mai preventDefault
+    for event, call_open, args in event_listeners(js, PASSIVE_EVENTS):
+        line = js.tokens[call_open].line
+        handler = resolve_handler(js, args[1])
+        already_passive = len(args) == 3 and 'passive' in js.text(*args[2])
+        if already_passive:
+            if handler and may_prevent_default(js, handler) and 'passive: true' in js.text(*args[2]):
+                print(f"   ⚠️  riga {line}: listener {event} passivo che chiama preventDefault (ignorato dal browser)")
+            continue
+        if handler is None:
+            print(f"   ⚠️  riga {line}: listener {event} non analizzabile, lasciato invariato")
+            continue
+        if may_prevent_default(js, handler):
+            continue
+        if add_passive_option(js, args):
+            changes_made.append(f"Aggiunto passive listener per {event} (riga {line})")
+    
+    return changes_made
 
-def process_js_file(file_path):
+def process_js_file(file_path, dry_run=False):
     """
     Processa un file JavaScript per ridurre il forced reflow
     """
     print(f"\n📄 Processando: {file_path}")
     
     with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+        original = f.read()
     
-    original_size = len(content)
+    js = js_tokens.JSSource(original)
     all_changes = []
     
+    # Tutte le modifiche sono calcolate sul sorgente originale e applicate insieme
     # 1. Ottimizza scroll handlers
-    content, scroll_changes = optimize_scroll_handler(content)
-    all_changes.extend(scroll_changes)
+    all_changes.extend(optimize_scroll_handler(js))
     
     # 2. Ottimizza query DOM
-    content, dom_changes = optimize_dom_queries(content)
-    all_changes.extend(dom_changes)
+    all_changes.extend(optimize_dom_queries(js))
     
-    # 3. Ottimizza animazioni caroselli
-    content, carousel_changes = optimize_carousel_animations(content)
-    all_changes.extend(carousel_changes)
+    # 3. Segnala animazioni caroselli su proprietà di layout
+    for warning in optimize_carousel_animations(js):
+        print(f"   ⚠️  {warning}")
     
     # 4. Aggiungi ottimizzazioni generali
-    content, perf_changes = add_performance_optimizations(content)
-    all_changes.extend(perf_changes)
+    all_changes.extend(add_performance_optimizations(js))
     
     # Salva il file modificato
     if all_changes:
-        # Crea backup
+        content = js.render()
+        diff = difflib.unified_diff(original.splitlines(keepends=True), content.splitlines(keepends=True),
+                                    f'a/{file_path}', f'b/{file_path}')
+        print(''.join(diff).rstrip('\n'))
+        
+        if dry_run:
+            print(f"🔍 Dry run: {len(all_changes)} modifiche non salvate")
+            return len(all_changes)
+        
+        # Crea backup dal contenuto originale già letto
         backup_path = file_path.replace('.js', '_backup.js')
         with open(backup_path, 'w', encoding='utf-8') as f:
-            with open(file_path, 'r', encoding='utf-8') as original:
-                f.write(original.read())
+            f.write(original)
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        new_size = len(content)
         print(f"✅ Modifiche applicate: {len(all_changes)}")
         for change in all_changes:
             print(f"   • {change}")
-        print(f"📏 Dimensione: {original_size:,} → {new_size:,} bytes")
+        print(f"📏 Dimensione: {len(original):,} → {len(content):,} bytes")
         print(f"💾 Backup salvato: {backup_path}")
     else:
         print("ℹ️  Nessuna modifica necessaria")
@@ -263,18 +345,25 @@ def process_js_file(file_path):
     return len(all_changes)
 
 def main():
+    parser = argparse.ArgumentParser(description='Riduce il forced reflow nei file JavaScript',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=['script.js'], help='file da processare')
+    parser.add_argument('--dry-run', action='store_true', help='mostra il diff senza salvare')
+    args = parser.parse_args()
+    
     print("⚡ Riduzione Forced Reflow (404ms → <100ms)")
     print("=" * 50)
     
     # File JavaScript da processare
-    js_files = ['script.js']
+    js_files = args.files
     
     total_changes = 0
     processed_files = 0
     
     for js_file in js_files:
         if os.path.exists(js_file):
-            changes = process_js_file(js_file)
+            changes = process_js_file(js_file, args.dry_run)
             total_changes += changes
             processed_files += 1
         else:
@@ -301,4 +390,4 @@ def main():
         print(f"\nℹ️  Il JavaScript è già ottimizzato per il forced reflow")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
@@ -5,41 +5,50 @@ Script per correggere gli avvisi di preload non utilizzati
 Rimuove i preload dei font specifici mantenendo solo quelli necessari
 """
 
-import re
 import os
 
-def fix_preload_warnings(file_path):
+import html_document
+import instrumentation
+
+# Preload dei font specifici da rimuovere e relativo commento
+FONT_PRELOAD_PREFIX = 'https://fonts.gstatic.com/s/inter/'
+FONT_PRELOAD_COMMENT = 'Preload critical Inter font files directly'
+
+def remove_font_preloads(doc):
     """
-    Rimuove i preload dei font non utilizzati per eliminare gli avvisi
+    Rimuove i preload dei font Inter (e il commento che li introduce) dal documento
     """
-    print(f"\n📄 Processando: {file_path}")
+    changes_made = []
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    font_preloads = [link for link in doc.find_all('link', rel='preload')
+                     if link.get('href', '').startswith(FONT_PRELOAD_PREFIX)]
+    for link in font_preloads:
+        doc.remove(link)
+    if font_preloads:
+        changes_made.append(f"Rimossi {len(font_preloads)} preload di font specifici")
     
-    original_size = len(content)
-    changes_made = []
+    comments = [c for c in doc.comments() if doc.comment_text(c) == FONT_PRELOAD_COMMENT]
+    for comment in comments:
+        doc.remove(comment)
+    if comments:
+        changes_made.append(f"Rimossi {len(comments)} commenti dei preload font")
     
-    # Pattern per i preload dei font specifici da rimuovere
-    font_preload_patterns = [
-        r'\s*<link rel="preload" href="https://fonts\.gstatic\.com/s/inter/[^>]+>\s*\n?',
-        r'\s*<!-- Preload critical Inter font files directly -->\s*\n?'
-    ]
+    return changes_made
+
+def fix_preload_warnings(file_path):
+    """
+    Rimuove i preload dei font non utilizzati per eliminare gli avvisi
+    """
+    print(f"\n📄 Processando: {file_path}")
     
-    # Rimuovi i preload dei font specifici
-    for pattern in font_preload_patterns:
-        matches = re.findall(pattern, content)
-        if matches:
-            content = re.sub(pattern, '', content)
-            changes_made.append(f"Rimossi {len(matches)} preload di font specifici")
+    doc = html_document.load(file_path)
     
-    # Pulisci righe vuote multiple
-    content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+    original_size = len(doc.text)
+    changes_made = remove_font_preloads(doc)
     
     # Salva il file se ci sono state modifiche
     if changes_made:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        content = doc.save()
         
         new_size = len(content)
         print(f"✅ Modifiche applicate: {len(changes_made)}")
@@ -93,4 +102,4 @@ def main():
         print(f"\nℹ️  I preload sono già ottimizzati")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per generare il service worker del sito a partire dal bundle in dist/
+Legge dist/asset-manifest.json (scritto dal passo fingerprint del build) e:
+  - precarica gli asset critici: CSS e JS con fingerprint collegati dalle
+    pagine, i font locali dichiarati da quei CSS e le immagini presenti in
+    tutte le pagine (il logo della navbar)
+  - precarica le pagine e le serve stale-while-revalidate, così la
+    navigazione tra le pagine è immediata anche senza rete
+  - versiona le cache con l'hash del loro contenuto ed elimina le versioni
+    precedenti all'attivazione
+La registrazione è in un file esterno con hash nel nome (la CSP non ammette
+script inline nuovi) e passa da una policy Trusted Types, richiesta da
+require-trusted-types-for 'script' per navigator.serviceWorker.register()
+"""
+
+import os
+import re
+import glob
+import json
+import fnmatch
+import hashlib
+import argparse
+
+import html_document
+import image_manifest
+import generate_sitemap
+import instrumentation
+
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'asset-manifest.json'
+SERVICE_WORKER_FILE = 'sw.js'
+REGISTER_PREFIX = 'sw-register.'
+CACHE_PREFIX = 'fbts-'
+
+# Immagini presenti in almeno questa quota di pagine: fanno parte della struttura del sito (logo)
+SHARED_IMAGE_RATIO = 0.5
+
+FONT_URL_PATTERN = re.compile(r'url\(\s*["\']?([^"\')]+\.(?:woff2?|ttf|otf))["\']?\s*\)', re.IGNORECASE)
+
+SERVICE_WORKER_TEMPLATE = """/* Service worker generato da generate_service_worker.py: non modificare */
+'use strict';
+
+const VERSION = '%(version)s';
+const CACHE_PREFIX = '%(prefix)s';
+const PRECACHE = `${CACHE_PREFIX}precache-${VERSION}`;
+const PAGES = `${CACHE_PREFIX}pages-${VERSION}`;
+const PRECACHE_URLS = %(precache)s;
+const PAGE_URLS = %(pages)s;
+const PRECACHED = new Set(PRECACHE_URLS);
+
+// Una sola voce per pagina: /index.html e le varianti ?lang= condividono l'HTML
+function pageKey(url) {
+    const { pathname } = new URL(url, self.location.origin);
+    return pathname.endsWith('/index.html') ? pathname.slice(0, -'index.html'.length) : pathname;
+}
+
+function reload(url) {
+    return new Request(url, { cache: 'reload' });
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const precache = await caches.open(PRECACHE);
+        await precache.addAll(PRECACHE_URLS.map(reload));
+        const pages = await caches.open(PAGES);
+        await pages.addAll(PAGE_URLS.map(reload));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        for (const name of await caches.keys()) {
+            if (name.startsWith(CACHE_PREFIX) && name !== PRECACHE && name !== PAGES) {
+                await caches.delete(name);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(PAGES);
+    const key = pageKey(event.request.url);
+    const cached = await cache.match(key);
+    const network = fetch(event.request).then(response => {
+        if (response.ok && response.type === 'basic' && !response.redirected) {
+            return cache.put(key, response.clone()).then(() => response);
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+    }
+    try {
+        return await network;
+    } catch (error) {
+        return (await cache.match('/')) || Response.error();
+    }
+}
+
+self.addEventListener('fetch', event => {
+    const { request } = event;
+    if (request.method !== 'GET') {
+        return;
+    }
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+    if (request.mode === 'navigate') {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (PRECACHED.has(url.pathname)) {
+        event.respondWith(caches.match(url.pathname, { cacheName: PRECACHE })
+            .then(response => response || fetch(request)));
+    }
+});
+"""
+
+REGISTER_TEMPLATE = """/* Registrazione del service worker, generata da generate_service_worker.py */
+(function () {
+    if (!('serviceWorker' in navigator)) {
+        return;
+    }
+    var url = '/%(sw)s';
+    if (window.trustedTypes && window.trustedTypes.createPolicy) {
+        url = window.trustedTypes.createPolicy('service-worker', {
+            createScriptURL: function (value) {
+                if (value !== '/%(sw)s') {
+                    throw new TypeError('URL del service worker non consentito: ' + value);
+                }
+                return value;
+            }
+        }).createScriptURL(url);
+    }
+    window.addEventListener('load', function () {
+        navigator.serviceWorker.register(url).catch(function () {});
+    });
+})();
+"""
+
+def site_url(rel_path):
+    return '/' + rel_path
+
+def page_url(rel_path):
+    return '/' if rel_path == 'index.html' else site_url(rel_path)
+
+def file_revision(path):
+    return image_manifest.file_sha256(path)[:8]
+
+def local_reference(value, page):
+    """Percorso in dist/ di un riferimento locale della pagina (None se esterno)"""
+    src = image_manifest.normalize_src(value or '')
+    if not src or src.startswith(('data:', '//')) or '://' in value:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(page), src)).replace(os.sep, '/')
+
+def discover_pages(dist):
+    """Pagine pubblicate presenti nel bundle (escluse quelle di test e debug e i frammenti senza <head>)"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(dist, '*.html'))):
+        if any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in generate_sitemap.EXCLUDED_PAGES):
+            continue
+        if html_document.load(path).find('head') is not None:
+            pages.append(os.path.relpath(path, dist).replace(os.sep, '/'))
+    return pages
+
+def critical_assets(dist, pages, fingerprinted):
+    """
+    Asset da precaricare: CSS/JS con fingerprint usati dalle pagine, font
+    locali di quei CSS e immagini condivise dalla maggior parte delle pagine
+    """
+    assets = set()
+    image_pages = {}
+    for page in pages:
+        doc = html_document.load(os.path.join(dist, page))
+        for node, attribute in [(node, 'href') for node in doc.find_all('link')] + \
+                               [(node, 'src') for node in doc.find_all('script')]:
+            path = local_reference(node.get(attribute), page)
+            if path in fingerprinted:
+                assets.add(path)
+        images = {local_reference(img.get('src'), page) for img in doc.find_all('img')}
+        for path in images:
+            if path and os.path.isfile(os.path.join(dist, path)):
+                image_pages[path] = image_pages.get(path, 0) + 1
+
+    for stylesheet in [path for path in assets if path.endswith('.css')]:
+        with open(os.path.join(dist, stylesheet), 'r', encoding='utf-8') as f:
+            for font in FONT_URL_PATTERN.findall(f.read()):
+                path = local_reference(font, stylesheet)
+                if path and os.path.isfile(os.path.join(dist, path)):
+                    assets.add(path)
+    shared = {path for path, count in image_pages.items() if count >= len(pages) * SHARED_IMAGE_RATIO}
+    return sorted(assets | shared)
+
+def add_register_script(dist, pages, register_file):
+    """Collega lo script di registrazione a ogni pagina (prima di </head>)"""
+    tag = f'<script src="{register_file}" defer></script>'
+    changes = 0
+    for page in pages:
+        doc = html_document.load(os.path.join(dist, page))
+        existing = [script for script in doc.find_all('script')
+                    if os.path.basename(script.get('src', '')).startswith(REGISTER_PREFIX)]
+        if existing and existing[0].get('src') == register_file:
+            continue
+        for script in existing:
+            doc.remove(script)
+        head = doc.find('head')
+        if head is None:
+            continue
+        doc.append_child(head, f"    {tag}\n")
+        doc.save()
+        changes += 1
+    return changes
+
+def generate(dist=DIST_DIR, dry_run=False):
+    """Scrive sw.js e lo script di registrazione; restituisce un riepilogo"""
+    with open(os.path.join(dist, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        fingerprinted = set(json.load(f).values())
+
+    pages = discover_pages(dist)
+    assets = critical_assets(dist, pages, fingerprinted)
+
+    # I file con fingerprint cambiano nome quando cambiano; per gli altri
+    # (immagini, pagine) la revisione entra nella versione del service worker
+    revisions = {site_url(path): None if path in fingerprinted else file_revision(os.path.join(dist, path))
+                 for path in assets}
+    revisions.update({page_url(page): file_revision(os.path.join(dist, page)) for page in pages})
+    version = hashlib.sha256((json.dumps(revisions, sort_keys=True) + SERVICE_WORKER_TEMPLATE)
+                             .encode('utf-8')).hexdigest()[:8]
+
+    service_worker = SERVICE_WORKER_TEMPLATE % {
+        'version': version,
+        'prefix': CACHE_PREFIX,
+        'precache': json.dumps([site_url(path) for path in assets], indent=4),
+        'pages': json.dumps([page_url(page) for page in pages], indent=4),
+    }
+    register = REGISTER_TEMPLATE % {'sw': SERVICE_WORKER_FILE}
+    register_file = f"{REGISTER_PREFIX}{hashlib.sha256(register.encode('utf-8')).hexdigest()[:8]}.js"
+
+    changes = 0
+    if not dry_run:
+        with open(os.path.join(dist, SERVICE_WORKER_FILE), 'w', encoding='utf-8') as f:
+            f.write(service_worker)
+        with open(os.path.join(dist, register_file), 'w', encoding='utf-8') as f:
+            f.write(register)
+        for old in glob.glob(os.path.join(dist, REGISTER_PREFIX + '*.js')):
+            if os.path.basename(old) != register_file:
+                os.remove(old)
+        changes = add_register_script(dist, pages, register_file)
+    return {'version': version, 'assets': assets, 'pages': pages,
+            'register_file': register_file, 'changes': changes}
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera il service worker dal bundle di deploy',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dist', default=DIST_DIR, help=f'cartella del bundle (default: {DIST_DIR})')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("⚙️  Generazione service worker")
+    print("=" * 50)
+
+    if not os.path.exists(os.path.join(args.dist, MANIFEST_FILE)):
+        print(f"❌ {args.dist}/{MANIFEST_FILE} non trovato: esegui prima il build (passo fingerprint)")
+        raise SystemExit(1)
+
+    result = generate(args.dist, args.dry_run)
+    print(f"🔖 Versione cache: {result['version']}")
+    print(f"📦 Asset precaricati: {len(result['assets'])}")
+    for path in result['assets']:
+        print(f"   • {path}")
+    print(f"📄 Pagine precaricate (stale-while-revalidate): {len(result['pages'])}")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"{'🔍 Da scrivere' if args.dry_run else '✅ Scritti'}: {args.dist}/{SERVICE_WORKER_FILE}, "
+          f"{args.dist}/{result['register_file']}")
+    print(f"🔧 Pagine collegate alla registrazione: {result['changes']}")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
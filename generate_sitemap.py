@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per generare sitemap.xml e la mappa per AI (ai-context-sitemap.json)
+Individua le pagine pubblicate (canonical verso se stesse e senza noindex),
+calcola l'hash del contenuto visibile (titolo, descrizione, testo, alt delle
+immagini) e lo confronta con .sitemap-state.json: il lastmod di una pagina
+avanza solo quando il contenuto cambia davvero, non quando il build riscrive
+markup, hint o hash degli asset. Sostituisce ai-sitemap-generator.js, che
+generava le stesse informazioni nel browser
+"""
+
+import os
+import re
+import html
+import glob
+import json
+import fnmatch
+import hashlib
+import argparse
+from datetime import date
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+import html_document
+import instrumentation
+
+SITE_URL = 'https://www.fbtotalsecurity.com/'
+SITEMAP_FILE = 'sitemap.xml'
+AI_SITEMAP_FILE = 'ai-context-sitemap.json'
+STATE_FILE = '.sitemap-state.json'
+
+# Pagine di sviluppo e copie che non vanno mai in sitemap
+EXCLUDED_PAGES = ['test-*.html', 'debug-*.html', '*_backup.*']
+
+# Metadati per pagina (priorità e frequenza dalla sitemap pubblicata, argomenti
+# e tipo di contenuto da ai-sitemap-generator.js); le pagine nuove usano DEFAULT_PAGE
+PAGES = {
+    'index.html': {
+        'priority': '1.0',
+        'changefreq': 'weekly',
+        'topics': ['sistemi sicurezza', 'nebbiogeni', 'videosorveglianza', 'Grate e Inferriate blindate', 'allarmi'],
+        'content_type': 'homepage',
+    },
+    'nebbiogeni.html': {
+        'priority': '0.8',
+        'changefreq': 'monthly',
+        'topics': ['nebbiogeni antifurto', 'sistema nebbia densa', 'protezione istantanea'],
+        'content_type': 'product-service',
+    },
+    'serramenti.html': {
+        'priority': '0.8',
+        'changefreq': 'monthly',
+        'topics': ['grate e inferriate blindate', 'sicurezza passiva', 'protezione antieffrazione'],
+        'content_type': 'product-service',
+    },
+    'sorveglianza.html': {
+        'priority': '0.8',
+        'changefreq': 'monthly',
+        'topics': ['videosorveglianza AI', 'telecamere intelligenti', 'monitoraggio remoto'],
+        'content_type': 'product-service',
+    },
+    'allarmi.html': {
+        'priority': '0.8',
+        'changefreq': 'monthly',
+        'topics': ['sistemi allarme', 'allarme wireless', 'sensori movimento'],
+        'content_type': 'product-service',
+    },
+    'chi-siamo.html': {
+        'priority': '0.7',
+        'changefreq': 'monthly',
+        'topics': ['azienda sicurezza', 'esperienza settore', 'team professionale'],
+        'content_type': 'about-company',
+    },
+    'lavora-con-noi.html': {
+        'priority': '0.5',
+        'changefreq': 'monthly',
+        'topics': ['lavora con noi', 'agenti sicurezza', 'collaborazioni'],
+        'content_type': 'careers',
+    },
+}
+DEFAULT_PAGE = {'priority': '0.5', 'changefreq': 'monthly', 'topics': [], 'content_type': 'page'}
+
+# Elementi il cui contenuto non è testo della pagina
+NON_CONTENT_TAGS = ('script', 'style', 'noscript', 'template', 'svg', html_document.COMMENT)
+
+TAG_PATTERN = re.compile(r'<[^>]*>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+LASTMOD_PATTERN = re.compile(r'<loc>([^<]+)</loc>\s*<lastmod>([^<]+)</lastmod>')
+
+def page_location(file_path):
+    return SITE_URL if file_path == 'index.html' else SITE_URL + file_path
+
+def is_published(doc, file_path):
+    """Pagina indicizzabile: canonical verso se stessa e nessun noindex"""
+    robots = doc.find('meta', name='robots')
+    if robots is not None and 'noindex' in robots.get('content', '').lower():
+        return False
+    canonical = doc.find('link', rel='canonical')
+    if canonical is None or not canonical.get('href'):
+        return False
+    return urlsplit(canonical.get('href'))._replace(query='', fragment='') == \
+        urlsplit(page_location(file_path))
+
+def discover_pages():
+    """Pagine pubblicate nella radice del sito, nell'ordine di PAGES; restituisce {file: documento}"""
+    order = list(PAGES)
+    pages = {}
+    for file_path in sorted(glob.glob('*.html'),
+                            key=lambda path: (order.index(path) if path in order else len(order), path)):
+        if any(fnmatch.fnmatch(file_path, pattern) for pattern in EXCLUDED_PAGES):
+            continue
+        doc = html_document.load(file_path)
+        if is_published(doc, file_path):
+            pages[file_path] = doc
+    return pages
+
+def content_text(doc):
+    """Contenuto che un lettore (o un motore di ricerca) vede, senza markup né script"""
+    parts = []
+    title = doc.find('title')
+    if title is not None:
+        parts.append(doc.inner_text(title))
+    description = doc.find('meta', name='description')
+    if description is not None:
+        parts.append(description.get('content', ''))
+
+    body = doc.find('body')
+    if body is not None:
+        start, end = body.inner_span
+        text = []
+        pos = start
+        for node in doc.nodes:
+            if start <= node.start < end and node.start >= pos and node.tag in NON_CONTENT_TAGS:
+                text.append(doc.text[pos:node.start])
+                pos = node.outer_end
+        text.append(doc.text[pos:end])
+        parts.append(TAG_PATTERN.sub(' ', ''.join(text)))
+        parts.extend(img.get('alt', '') for img in doc.find_all('img') if start <= img.start < end)
+    return WHITESPACE_PATTERN.sub(' ', html.unescape(' '.join(parts))).strip()
+
+def content_hash(doc):
+    return hashlib.sha256(content_text(doc).encode('utf-8')).hexdigest()
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def published_lastmods(path=SITEMAP_FILE):
+    """lastmod della sitemap esistente, per non perdere le date alla prima esecuzione"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {loc: lastmod for loc, lastmod in LASTMOD_PATTERN.findall(f.read())}
+
+def update_state(pages, state, today):
+    """Aggiorna hash e lastmod; restituisce (nuovo stato, pagine cambiate)"""
+    previous_lastmods = published_lastmods()
+    new_state = {}
+    changed = []
+    for file_path, doc in pages.items():
+        digest = content_hash(doc)
+        entry = state.get(file_path)
+        if entry and entry['hash'] == digest:
+            new_state[file_path] = entry
+            continue
+        if entry is None and page_location(file_path) in previous_lastmods:
+            lastmod = previous_lastmods[page_location(file_path)]
+        else:
+            lastmod = today
+            changed.append(file_path)
+        new_state[file_path] = {'hash': digest, 'lastmod': lastmod}
+    return new_state, changed
+
+def alternates(doc):
+    """Varianti hreflang dichiarate dalla pagina"""
+    return [(link.get('hreflang'), link.get('href')) for link in doc.find_all('link', rel='alternate')
+            if link.get('hreflang') and link.get('href')]
+
+def render_sitemap(pages, state):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"',
+        '        xmlns:xhtml="http://www.w3.org/1999/xhtml">',
+    ]
+    for file_path, doc in pages.items():
+        metadata = PAGES.get(file_path, DEFAULT_PAGE)
+        lines += [
+            '    <url>',
+            f'        <loc>{escape(page_location(file_path))}</loc>',
+            f'        <lastmod>{state[file_path]["lastmod"]}</lastmod>',
+            f'        <changefreq>{metadata["changefreq"]}</changefreq>',
+            f'        <priority>{metadata["priority"]}</priority>',
+        ]
+        for hreflang, href in alternates(doc):
+            lines.append(f'        <xhtml:link rel="alternate" hreflang="{escape(hreflang)}" '
+                         f'href="{escape(href, {chr(34): "&quot;"})}"/>')
+        lines.append('    </url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+def render_ai_sitemap(pages, state, path=AI_SITEMAP_FILE):
+    """
+    Aggiorna nella mappa per AI le parti derivate dalle pagine (distribuzione
+    e dateModified); il resto del file è curato a mano e resta invariato
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['dateModified'] = max(entry['lastmod'] for entry in state.values())
+    data['distribution'] = []
+    for file_path, doc in pages.items():
+        metadata = PAGES.get(file_path, DEFAULT_PAGE)
+        title = doc.find('title')
+        entry = {
+            '@type': 'DataDownload',
+            'name': WHITESPACE_PATTERN.sub(' ', html.unescape(doc.inner_text(title))).strip() if title else file_path,
+            'contentUrl': page_location(file_path),
+            'encodingFormat': 'text/html',
+            'dateModified': state[file_path]['lastmod'],
+        }
+        if metadata['topics']:
+            entry['about'] = metadata['topics']
+        entry['additionalType'] = metadata['content_type']
+        data['distribution'].append(entry)
+    return json.dumps(data, indent=2, ensure_ascii=False) + '\n'
+
+def write_if_changed(path, content, dry_run=False):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    if not dry_run:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera sitemap.xml e ai-context-sitemap.json dalle pagine pubblicate',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("🗺️  Generazione sitemap")
+    print("=" * 50)
+
+    pages = discover_pages()
+    state, changed = update_state(pages, load_state(), date.today().isoformat())
+    for file_path in pages:
+        marker = '🆕' if file_path in changed else '📄'
+        print(f"{marker} {page_location(file_path)} (lastmod {state[file_path]['lastmod']})")
+
+    outputs = [
+        (SITEMAP_FILE, render_sitemap(pages, state)),
+        (AI_SITEMAP_FILE, render_ai_sitemap(pages, state)),
+        (STATE_FILE, json.dumps(state, indent=2, ensure_ascii=False) + '\n'),
+    ]
+    written = [path for path, content in outputs if write_if_changed(path, content, args.dry_run)]
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 Pagine in sitemap: {len(pages)}")
+    print(f"🔧 Contenuto cambiato: {len(changed)}")
+    for path in written:
+        print(f"   {'🔍 Da aggiornare' if args.dry_run else '✅ Aggiornato'}: {path}")
+    if not written:
+        print("ℹ️  Nessuna modifica necessaria")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
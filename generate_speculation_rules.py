@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per generare le speculation rules di navigazione tra le pagine
+Per ogni pagina stima le pagine successive più probabili dal grafo dei link
+interni (i link nel contenuto pesano più di quelli di navbar e footer) e,
+se indicato, dalle transizioni Referer → pagina di un access log (JSON di
+server.py --access-log o formato combined). Scrive un <script type="speculationrules"> con:
+  - prefetch immediato delle destinazioni indicizzabili più probabili (non le
+    pagine noindex come i termini), finché il loro HTML (gzip) sta nel budget
+    di byte della pagina
+  - prefetch "moderate" (al passaggio del mouse) per gli altri link interni
+Dopo la modifica gli hash CSP vanno ricalcolati con calculate_csp_hashes.py,
+che include gli script speculationrules (nel build è il passo successivo)
+"""
+
+import os
+import re
+import json
+import argparse
+from urllib.parse import urlsplit
+
+import html_document
+import generate_sitemap
+import simulate_waterfall
+import instrumentation
+
+RULES_ID = 'speculation-rules'
+
+MAX_PREFETCH = 3
+DEFAULT_BUDGET_BYTES = 40 * 1024
+MIN_SHARE = 0.1
+
+# Peso dei link fuori dalla struttura della pagina rispetto a navbar e footer
+CONTENT_LINK_WEIGHT = 3
+CHROME_TAGS = ('nav', 'header', 'footer')
+
+# Transizioni osservate necessarie perché il log pesi quanto il grafo dei link
+LOG_PRIOR = 20
+
+SITE_HOSTS = ('www.fbtotalsecurity.com', 'fbtotalsecurity.com', 'localhost', '127.0.0.1')
+COMBINED_LOG_PATTERN = re.compile(
+    r'"(?:GET|HEAD) (?P<path>\S+) [^"]*" (?P<status>\d{3}) \S+ "(?P<referer>[^"]*)"')
+
+HTML_FILES = simulate_waterfall.HTML_FILES
+
+def page_for(url, base_page=''):
+    """Pagina del sito puntata da un URL (None se esterna o non HTML)"""
+    parts = urlsplit(url)
+    if parts.scheme and parts.scheme not in ('http', 'https'):
+        return None
+    if parts.netloc and parts.netloc.split(':')[0] not in SITE_HOSTS:
+        return None
+    path = parts.path
+    if not path:
+        return base_page or None
+    if not path.startswith('/'):
+        path = os.path.join(os.path.dirname('/' + base_page), path)
+    path = os.path.normpath(path).lstrip('/').replace(os.sep, '/')
+    if path in ('', '.'):
+        return 'index.html'
+    return path if path.endswith('.html') else None
+
+def link_scores(doc, page, pages):
+    """Peso dei link interni della pagina verso ciascuna delle altre pagine"""
+    scores = {}
+    for anchor in doc.find_all('a'):
+        target = page_for(anchor.get('href', ''), page)
+        if target is None or target == page or target not in pages:
+            continue
+        in_chrome = any(ancestor.tag in CHROME_TAGS for ancestor in anchor.ancestors())
+        scores[target] = scores.get(target, 0) + (1 if in_chrome else CONTENT_LINK_WEIGHT)
+    return scores
+
+def log_entry(line):
+    """(percorso, stato, referer) di una riga del log JSON dei server locali o combined"""
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        return record.get('path') or '', str(record.get('status')), record.get('referer') or ''
+    match = COMBINED_LOG_PATTERN.search(line)
+    return match.group('path', 'status', 'referer') if match else None
+
+def log_transitions(path, pages):
+    """Conteggio delle navigazioni pagina → pagina in un access log"""
+    transitions = {}
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            entry = log_entry(line)
+            if entry is None or not entry[1].startswith(('2', '3')):
+                continue
+            source = page_for(entry[2])
+            target = page_for(entry[0])
+            if source in pages and target in pages and source != target:
+                transitions.setdefault(source, {})
+                transitions[source][target] = transitions[source].get(target, 0) + 1
+    return transitions
+
+def shares(scores):
+    total = sum(scores.values())
+    return {target: score / total for target, score in scores.items()} if total else {}
+
+def next_pages(link_weights, observed):
+    """
+    Probabilità delle pagine successive: il grafo dei link come stima di
+    partenza, il log che prevale man mano che le transizioni osservate crescono
+    """
+    links = shares(link_weights)
+    log = shares(observed)
+    weight = sum(observed.values()) / (sum(observed.values()) + LOG_PRIOR)
+    targets = set(links) | set(log)
+    return {target: (1 - weight) * links.get(target, 0) + weight * log.get(target, 0) for target in targets}
+
+def ranked(probabilities):
+    return sorted(probabilities.items(), key=lambda item: (-item[1], item[0]))
+
+def choose_prefetch(probabilities, eligible, budget):
+    """Destinazioni da scaricare subito, dalla più probabile, entro budget e limite di numero"""
+    chosen = []
+    used = 0
+    for target, probability in ranked(probabilities):
+        if len(chosen) >= MAX_PREFETCH or probability < MIN_SHARE:
+            break
+        if target not in eligible:
+            continue
+        size = simulate_waterfall.transfer_size(target)
+        if used + size > budget:
+            continue
+        chosen.append(target)
+        used += size
+    return chosen, used
+
+def rules_json(prefetch):
+    rules = {'prefetch': []}
+    if prefetch:
+        rules['prefetch'].append({'source': 'list', 'urls': prefetch, 'eagerness': 'immediate'})
+    rules['prefetch'].append({
+        'source': 'document',
+        'where': {'and': [{'href_matches': '/*.html'}, {'not': {'selector_matches': '[rel~=nofollow]'}}]},
+        'eagerness': 'moderate',
+    })
+    return json.dumps(rules, separators=(',', ':'))
+
+def update_rules(doc, rules):
+    """Sostituisce o aggiunge il blocco speculationrules; True se la pagina cambia"""
+    block = f'<script type="speculationrules" id="{RULES_ID}">{rules}</script>'
+    existing = doc.find('script', id=RULES_ID)
+    if existing is not None:
+        if doc.source(existing) == block:
+            return False
+        doc.replace(existing.start, existing.outer_end, block)
+        return True
+    head = doc.find('head')
+    if head is None:
+        return False
+    doc.append_child(head, f"    {block}\n")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera le speculation rules per la navigazione tra le pagine',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da processare')
+    parser.add_argument('--access-log', help='access log (JSON dei server locali o combined) con le transizioni reali')
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET_BYTES,
+                        help=f'byte (gzip) di HTML da prefetchare per pagina (default: {DEFAULT_BUDGET_BYTES})')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("🔮 Generazione speculation rules")
+    print("=" * 50)
+
+    pages = [page for page in args.files if os.path.exists(page)]
+    for page in args.files:
+        if page not in pages:
+            print(f"⚠️  File non trovato: {page}")
+    eligible = {page for page in pages if generate_sitemap.is_published(html_document.load(page), page)}
+    transitions = log_transitions(args.access_log, pages) if args.access_log else {}
+    if args.access_log:
+        print(f"📜 Transizioni dal log: {sum(sum(targets.values()) for targets in transitions.values())}")
+
+    total_changes = 0
+    for page in pages:
+        print(f"\n📄 Processando: {page}")
+        doc = html_document.load(page)
+        probabilities = next_pages(link_scores(doc, page, pages), transitions.get(page, {}))
+        prefetch, used = choose_prefetch(probabilities, eligible, args.budget)
+        for target, probability in ranked(probabilities)[:MAX_PREFETCH + 2]:
+            marker = '⚡' if target in prefetch else '  '
+            print(f"   {marker} {target}: {probability * 100:.0f}%")
+        print(f"   📦 Prefetch immediato: {len(prefetch)} pagine, {used / 1024:.1f} KB gzip")
+        if update_rules(doc, rules_json(prefetch)):
+            if not args.dry_run:
+                doc.save()
+            print(f"{'🔍 Modifiche previste' if args.dry_run else '✅ Modifiche applicate'}: speculation rules aggiornate")
+            total_changes += 1
+        else:
+            print("ℹ️  Nessuna modifica necessaria")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File processati: {len(pages)}/{len(args.files)}")
+    print(f"🔧 Pagine aggiornate: {total_changes}")
+    if total_changes:
+        print("🔐 Ricalcola gli hash CSP con calculate_csp_hashes.py")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modello condiviso dei documenti HTML per gli script di ottimizzazione
+Tokenizza la pagina in un solo passaggio e costruisce un indice leggero dei nodi
+(tag, attributi, offset); le modifiche sono giunte per offset applicate tutte
+insieme, così una catena di correttori costa un parsing e una scrittura per pagina.
+L'indice resta in cache per hash del contenuto, in memoria e su disco
+(.html-index-cache/): i passi del build, che girano ognuno nel proprio processo,
+non ritokenizzano una pagina che un passo precedente ha lasciato invariata
+"""
+
+import os
+import re
+import pickle
+import hashlib
+
+import instrumentation
+
+# Elementi senza tag di chiusura
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'source', 'track', 'wbr'}
+
+# Elementi il cui contenuto è testo grezzo (non contiene tag)
+RAW_TEXT_ELEMENTS = {'script', 'style', 'textarea', 'title'}
+
+COMMENT = '#comment'
+
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->'                              # commento
+    r'|<![^>]*>'                               # doctype / CDATA
+    r'|</([a-zA-Z][\w:-]*)\s*>'                # tag di chiusura
+    r'|<([a-zA-Z][\w:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',  # tag di apertura
+    re.DOTALL)
+
+ATTRIBUTE_PATTERN = re.compile(
+    r'\s*([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+
+# Indici già calcolati, per hash del contenuto: gli script eseguiti nello stesso
+# processo non rifanno il parsing della stessa pagina
+_INDEX_CACHE = {}
+MAX_CACHED_INDEXES = 64
+
+# Cache su disco condivisa tra processi; la variabile d'ambiente sceglie un'altra
+# cartella o, se vuota, la disattiva
+CACHE_DIR_ENV = 'HTML_INDEX_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.html-index-cache')
+MAX_CACHED_FILES = 256
+
+# Gli indici salvati valgono solo per questa versione del tokenizer
+with open(__file__, 'rb') as _source:
+    TOKENIZER_VERSION = hashlib.sha256(_source.read()).hexdigest()[:16]
+
+
+class Node:
+    """
+    Elemento (o commento) del documento con gli offset nel testo originale:
+    start/end delimitano il tag di apertura, close_start/close_end quello di chiusura
+    """
+
+    __slots__ = ('tag', 'start', 'end', 'attrs', 'attr_spans', 'attrs_end',
+                 'close_start', 'close_end', 'parent')
+
+    def __init__(self, tag, start, end, attrs=None, attr_spans=None, attrs_end=None, parent=None):
+        self.tag = tag
+        self.start = start
+        self.end = end
+        self.attrs = attrs or {}
+        self.attr_spans = attr_spans or {}
+        self.attrs_end = attrs_end if attrs_end is not None else end
+        self.close_start = None
+        self.close_end = None
+        self.parent = parent
+
+    def get(self, name, default=None):
+        return self.attrs.get(name.lower(), default)
+
+    def has(self, name):
+        return name.lower() in self.attrs
+
+    @property
+    def outer_end(self):
+        """Fine dell'elemento completo (tag di chiusura incluso, se presente)"""
+        return self.close_end if self.close_end is not None else self.end
+
+    @property
+    def inner_span(self):
+        """Offset del contenuto dell'elemento (vuoto per i tag senza chiusura)"""
+        return self.end, self.close_start if self.close_start is not None else self.end
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def __repr__(self):
+        return f'<Node {self.tag} {self.start}:{self.outer_end}>'
+
+
+def parse_attributes(text, offset):
+    """
+    Legge gli attributi di un tag; restituisce (valori, span) con gli span
+    assoluti (spazio iniziale incluso) per poterli sostituire o rimuovere
+    """
+    attrs = {}
+    spans = {}
+    pos = 0
+    while True:
+        match = ATTRIBUTE_PATTERN.match(text, pos)
+        if not match or match.end() == pos:
+            break
+        name = match.group(1).lower()
+        value = next((g for g in match.group(2, 3, 4) if g is not None), '')
+        if name not in attrs:  # come nei browser vale la prima occorrenza
+            attrs[name] = value
+            spans[name] = (offset + match.start(), offset + match.end())
+        pos = match.end()
+    return attrs, spans
+
+
+def tokenize(text):
+    """
+    Un solo passaggio sul testo: restituisce i nodi in ordine di documento.
+    Il contenuto di script/style viene saltato fino al relativo tag di chiusura
+    """
+    nodes = []
+    stack = []
+    pos = 0
+    length = len(text)
+
+    while pos < length:
+        lt = text.find('<', pos)
+        if lt == -1:
+            break
+        match = TOKEN_PATTERN.match(text, lt)
+        if not match:
+            pos = lt + 1
+            continue
+        pos = match.end()
+        token = match.group(0)
+        parent = stack[-1] if stack else None
+
+        if token.startswith('<!--'):
+            nodes.append(Node(COMMENT, lt, pos, parent=parent))
+        elif token.startswith('<!'):
+            continue
+        elif match.group(1):
+            tag = match.group(1).lower()
+            # Chiude l'elemento corrispondente più vicino (tollerante ai tag non chiusi)
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index].tag == tag:
+                    stack[index].close_start = lt
+                    stack[index].close_end = pos
+                    del stack[index:]
+                    break
+        else:
+            tag = match.group(2).lower()
+            raw_attrs = match.group(3)
+            attrs_offset = match.start(3)
+            attrs_end = match.end(3)
+            if raw_attrs.rstrip().endswith('/'):
+                raw_attrs = raw_attrs.rstrip()[:-1].rstrip()
+                attrs_end = attrs_offset + len(raw_attrs)
+            attrs, spans = parse_attributes(raw_attrs, attrs_offset)
+            node = Node(tag, lt, pos, attrs, spans, attrs_end, parent)
+            nodes.append(node)
+
+            if tag in RAW_TEXT_ELEMENTS:
+                close = re.compile(rf'</{tag}\s*>', re.IGNORECASE).search(text, pos)
+                if close:
+                    node.close_start, node.close_end = close.start(), close.end()
+                    pos = close.end()
+            elif tag not in VOID_ELEMENTS and not match.group(3).rstrip().endswith('/'):
+                stack.append(node)
+    return nodes
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def cache_dir():
+    return os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+
+def _load_cached_index(key):
+    directory = cache_dir()
+    if not directory:
+        return None
+    path = os.path.join(directory, key + '.pickle')
+    try:
+        with open(path, 'rb') as f:
+            version, index = pickle.load(f)
+        os.utime(path)  # I file usati di recente sopravvivono alla pulizia
+    except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+        return None
+    return index if version == TOKENIZER_VERSION else None
+
+
+def _store_cached_index(key, index):
+    """Scrittura atomica (file temporaneo + rename): più passi del build girano in parallelo"""
+    directory = cache_dir()
+    if not directory:
+        return
+    path = os.path.join(directory, key + '.pickle')
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            pickle.dump((TOKENIZER_VERSION, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        entries = [entry for entry in os.scandir(directory) if entry.name.endswith('.pickle')]
+        if len(entries) > MAX_CACHED_FILES:
+            entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+            for entry in entries[:len(entries) - MAX_CACHED_FILES]:
+                os.remove(entry.path)
+    except OSError:
+        pass  # La cache su disco è solo un'ottimizzazione
+
+
+def build_index(text):
+    """Restituisce (nodi, nodi per tag), riusando la cache per hash del contenuto"""
+    key = content_hash(text)
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        index = _load_cached_index(key)
+    if index is None:
+        with instrumentation.stage('html tokenize'):
+            nodes = tokenize(text)
+        by_tag = {}
+        for node in nodes:
+            by_tag.setdefault(node.tag, []).append(node)
+        index = (nodes, by_tag)
+        _store_cached_index(key, index)
+    if key not in _INDEX_CACHE:
+        if len(_INDEX_CACHE) >= MAX_CACHED_INDEXES:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)))
+        _INDEX_CACHE[key] = index
+    return index
+
+
+def _attribute_name(keyword):
+    # class_='x' -> class, http_equiv='x' -> http-equiv
+    return keyword.rstrip('_').replace('_', '-')
+
+
+class HTMLDocument:
+    """
+    Documento HTML indicizzato con modifiche differite.
+    Tutti gli offset si riferiscono al testo originale: le modifiche vengono
+    accumulate e applicate in un colpo solo da render()/save()
+    """
+
+    def __init__(self, text, path=None):
+        self.text = text
+        self.path = path
+        self.nodes, self._by_tag = build_index(text)
+        self._edits = []
+
+    # --- Interrogazioni ---
+
+    def find_all(self, tag, **attrs):
+        """
+        Nodi con il tag indicato; gli attributi filtrano per valore esatto
+        (True = attributo presente). Es. find_all('link', rel='preload')
+        """
+        result = []
+        for node in self._by_tag.get(tag.lower(), ()):
+            if all(node.has(_attribute_name(name)) if value is True
+                   else node.get(_attribute_name(name)) == value
+                   for name, value in attrs.items()):
+                result.append(node)
+        return result
+
+    def find(self, tag, **attrs):
+        nodes = self.find_all(tag, **attrs)
+        return nodes[0] if nodes else None
+
+    def comments(self):
+        return self._by_tag.get(COMMENT, [])
+
+    def source(self, node):
+        """Testo originale dell'elemento completo"""
+        return self.text[node.start:node.outer_end]
+
+    def inner_text(self, node):
+        """Contenuto dell'elemento (es. il codice di uno script inline)"""
+        start, end = node.inner_span
+        return self.text[start:end]
+
+    def comment_text(self, node):
+        return self.text[node.start + 4:node.end - 3].strip()
+
+    # --- Modifiche ---
+
+    def replace(self, start, end, new_text):
+        self._edits.append((start, end, len(self._edits), new_text))
+
+    def insert(self, pos, new_text):
+        self.replace(pos, pos, new_text)
+
+    def insert_before(self, node, new_text):
+        self.insert(node.start, new_text)
+
+    def insert_after(self, node, new_text):
+        self.insert(node.outer_end, new_text)
+
+    def append_child(self, node, new_text):
+        """Inserisce subito prima del tag di chiusura (es. prima di </head>)"""
+        self.insert(node.close_start if node.close_start is not None else node.end, new_text)
+
+    def remove(self, node, whole_line=True):
+        """
+        Rimuove l'elemento; con whole_line elimina anche l'indentazione e
+        l'a capo quando l'elemento occupa una riga da solo
+        """
+        start, end = node.start, node.outer_end
+        if whole_line:
+            line_start = self.text.rfind('\n', 0, start) + 1
+            line_end = self.text.find('\n', end)
+            line_end = len(self.text) if line_end == -1 else line_end
+            if not self.text[line_start:start].strip() and not self.text[end:line_end].strip():
+                start, end = line_start, min(line_end + 1, len(self.text))
+        self.replace(start, end, '')
+
+    def set_attribute(self, node, name, value):
+        name = name.lower()
+        attribute = f' {name}="{str(value).replace(chr(34), "&quot;")}"' if value is not None else f' {name}'
+        if name in node.attr_spans:
+            self.replace(*node.attr_spans[name], attribute)
+        else:
+            self.insert(node.attrs_end, attribute)
+
+    def remove_attribute(self, node, name):
+        span = node.attr_spans.get(name.lower())
+        if span:
+            self.replace(*span, '')
+
+    @property
+    def changed(self):
+        return bool(self._edits)
+
+    def render(self):
+        """
+        Applica le modifiche in ordine di offset; gli inserimenti nella stessa
+        posizione mantengono l'ordine di chiamata. Modifiche sovrapposte sono un errore
+        """
+        if not self._edits:
+            return self.text
+        parts = []
+        pos = 0
+        for start, end, _, new_text in sorted(self._edits):
+            if start < pos:
+                raise ValueError(f'modifiche sovrapposte vicino all\'offset {start}'
+                                 f'{" in " + self.path if self.path else ""}')
+            parts.append(self.text[pos:start])
+            parts.append(new_text)
+            pos = end
+        parts.append(self.text[pos:])
+        return ''.join(parts)
+
+    def save(self, path=None):
+        """Scrive il documento solo se ci sono modifiche; restituisce il nuovo testo"""
+        path = path or self.path
+        if not self.changed:
+            return self.text
+        content = self.render()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return content
+
+
+def load(file_path):
+    """Legge e indicizza una pagina HTML"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return HTMLDocument(f.read(), file_path)
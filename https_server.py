@@ -3,10 +3,14 @@ import http.server
 import socketserver
 import ssl
 import os
+import argparse
 import ipaddress
 from urllib.parse import urlparse
 
-class SecureHTTPSRequestHandler(http.server.SimpleHTTPRequestHandler):
+import csp_policy
+import access_log
+
+class SecureHTTPSRequestHandler(access_log.AccessLogMixin, http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
         # Aggiungi header di sicurezza avanzati
         self.send_header('Strict-Transport-Security', 'max-age=31536000; includeSubDomains; preload')
@@ -14,7 +18,8 @@ class SecureHTTPSRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('X-Content-Type-Options', 'nosniff')
         self.send_header('X-XSS-Protection', '1; mode=block')
         self.send_header('Referrer-Policy', 'strict-origin-when-cross-origin')
-        self.send_header('Content-Security-Policy', "default-src 'self'; script-src 'self' 'unsafe-inline' https://fonts.googleapis.com https://www.googletagmanager.com https://www.google-analytics.com; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data: https://www.google-analytics.com; connect-src 'self' https://www.google-analytics.com")
+        self.send_header('Content-Security-Policy',
+                         csp_policy.header_value(https=True, path=urlparse(getattr(self, 'path', '')).path))
         super().end_headers()
 
     def do_GET(self):
@@ -84,6 +89,10 @@ def create_self_signed_cert():
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Server HTTPS locale con header di sicurezza')
+    parser.add_argument('--access-log', nargs='?', const=access_log.DEFAULT_LOG_FILE, metavar='FILE',
+                        help=f'scrive una riga JSON per richiesta (default: {access_log.DEFAULT_LOG_FILE})')
+    args = parser.parse_args()
     PORT = 8443  # Porta HTTPS standard per sviluppo
     
     # Verifica se esistono già i certificati
@@ -99,8 +108,13 @@ def main():
         context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
         context.load_cert_chain("server.crt", "server.key")
         httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+        if args.access_log:
+            SecureHTTPSRequestHandler.access_log = access_log.AccessLog(args.access_log)
+            SecureHTTPSRequestHandler.access_log.start()
         
         print(f"🔒 Server HTTPS sicuro avviato su https://localhost:{PORT}/")
+        if args.access_log:
+            print(f"📝 Access log JSON: {args.access_log}")
         print(f"📋 Nota: Il browser mostrerà un avviso per il certificato auto-firmato.")
         print(f"    Clicca 'Avanzate' > 'Procedi verso localhost (non sicuro)' per continuare.")
         print(f"🛑 Premi Ctrl+C per fermare il server")
@@ -109,6 +123,9 @@ def main():
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n🛑 Server fermato")
+        finally:
+            if SecureHTTPSRequestHandler.access_log is not None:
+                SecureHTTPSRequestHandler.access_log.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
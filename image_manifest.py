@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifest delle immagini del sito (image-manifest.json)
+Legge le dimensioni intrinseche dai soli byte di header di WebP/PNG/JPEG/GIF/SVG,
+senza decodificare l'immagine, e le salva in una cache riutilizzata dagli altri script
+"""
+
+import os
+import re
+import json
+import struct
+import hashlib
+
+import instrumentation
+
+MANIFEST_FILE = 'image-manifest.json'
+
+IMAGE_EXTENSIONS = ('.webp', '.png', '.jpg', '.jpeg', '.gif', '.svg')
+
+# Cartelle che non fanno parte del sito
+EXCLUDED_DIRS = {'.git', '.vscode', '__pycache__', 'node_modules', 'dist'}
+
+# Marker JPEG SOFn che contengono le dimensioni (esclusi DHT, JPG e DAC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Unità SVG convertibili in pixel CSS
+SVG_UNITS = {'': 1.0, 'px': 1.0, 'pt': 4 / 3, 'pc': 16.0, 'in': 96.0,
+             'cm': 96 / 2.54, 'mm': 96 / 25.4}
+
+
+def _probe_png(header):
+    if header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', header[16:24])
+    return width, height
+
+
+def _probe_gif(header):
+    if header[:6] not in (b'GIF87a', b'GIF89a'):
+        return None
+    width, height = struct.unpack('<HH', header[6:10])
+    return width, height
+
+
+def _probe_webp(header):
+    if header[:4] != b'RIFF' or header[8:12] != b'WEBP':
+        return None
+    chunk = header[12:16]
+    if chunk == b'VP8 ':
+        # Frame lossy: start code 9d 01 2a seguito da larghezza/altezza a 14 bit
+        if header[23:26] != b'\x9d\x01\x2a':
+            return None
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        # Frame lossless: signature 0x2f, poi 14 bit larghezza-1 e 14 bit altezza-1
+        if header[20] != 0x2F:
+            return None
+        bits = struct.unpack('<I', header[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        # Formato esteso: canvas a 24 bit (valore-1)
+        width = int.from_bytes(header[24:27], 'little') + 1
+        height = int.from_bytes(header[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def _probe_jpeg(f):
+    """
+    Scorre i segmenti JPEG fino al primo SOFn, saltando i dati con seek
+    """
+    f.seek(0)
+    if f.read(2) != b'\xff\xd8':
+        return None
+    while True:
+        byte = f.read(1)
+        # Salta eventuali byte di riempimento tra i marker
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # Marker senza payload
+        if marker == 0xD9 or marker == 0xDA:
+            return None  # Fine immagine o inizio scansione senza SOF
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _svg_length(value):
+    match = re.match(r'^\s*([0-9.]+)\s*([a-z]*)\s*$', value or '')
+    if not match or match.group(2) not in SVG_UNITS:
+        return None
+    return float(match.group(1)) * SVG_UNITS[match.group(2)]
+
+
+def _probe_svg(header):
+    """
+    Legge width/height dal tag <svg> radice, con fallback sul viewBox
+    """
+    text = header.decode('utf-8', errors='ignore')
+    tag_match = re.search(r'<svg\b([^>]*)>', text, re.IGNORECASE)
+    if not tag_match:
+        return None
+    attrs = dict(re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag_match.group(1)))
+    width = _svg_length(attrs.get('width'))
+    height = _svg_length(attrs.get('height'))
+
+    viewbox = attrs.get('viewBox') or attrs.get('viewbox')
+    if viewbox:
+        parts = re.split(r'[\s,]+', viewbox.strip())
+        if len(parts) == 4:
+            vb_width, vb_height = float(parts[2]), float(parts[3])
+            if width and not height and vb_width:
+                height = width * vb_height / vb_width
+            elif height and not width and vb_height:
+                width = height * vb_width / vb_height
+            elif not width and not height:
+                width, height = vb_width, vb_height
+
+    if not width or not height:
+        return None
+    return int(round(width)), int(round(height))
+
+
+def probe_image_size(file_path):
+    """
+    Restituisce (larghezza, altezza, formato) leggendo solo l'header del file,
+    oppure None se il formato non è riconosciuto
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(64)
+        if header[:8] == b'\x89PNG\r\n\x1a\n':
+            size, fmt = _probe_png(header), 'png'
+        elif header[:3] == b'GIF':
+            size, fmt = _probe_gif(header), 'gif'
+        elif header[:4] == b'RIFF':
+            size, fmt = _probe_webp(header), 'webp'
+        elif header[:2] == b'\xff\xd8':
+            size, fmt = _probe_jpeg(f), 'jpeg'
+        else:
+            # Gli SVG possono avere prolog XML e commenti prima del tag <svg>
+            header += f.read(4096)
+            size, fmt = _probe_svg(header), 'svg'
+
+    if not size:
+        return None
+    return size[0], size[1], fmt
+
+
+def file_sha256(file_path):
+    """Calcola l'hash SHA-256 del contenuto di un file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_image_files(root='.'):
+    """Elenca le immagini del sito come percorsi relativi in stile URL"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS)
+        for filename in sorted(filenames):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                full_path = os.path.join(dirpath, filename)
+                yield os.path.relpath(full_path, root).replace(os.sep, '/')
+
+
+def build_manifest(root='.', manifest_path=None, verbose=False):
+    """
+    Costruisce (o aggiorna in modo incrementale) il manifest delle immagini.
+    Le voci con mtime e dimensione invariate vengono riutilizzate senza rileggere il file
+    """
+    manifest_path = manifest_path or os.path.join(root, MANIFEST_FILE)
+    cached = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f).get('images', {})
+        except (ValueError, OSError):
+            cached = {}
+
+    images = {}
+    probed = 0
+    for rel_path in iter_image_files(root):
+        full_path = os.path.join(root, rel_path)
+        stat = os.stat(full_path)
+        entry = cached.get(rel_path)
+        if entry and entry.get('bytes') == stat.st_size and entry.get('mtime') == stat.st_mtime_ns:
+            images[rel_path] = entry
+            continue
+
+        probed += 1
+        size = probe_image_size(full_path)
+        if not size:
+            if verbose:
+                print(f"⚠️  Formato non riconosciuto: {rel_path}")
+            continue
+        entry = {
+            'width': size[0],
+            'height': size[1],
+            'format': size[2],
+            'bytes': stat.st_size,
+            'sha256': file_sha256(full_path),
+            'mtime': stat.st_mtime_ns,
+        }
+        # Mantieni i dati derivati se il contenuto non è cambiato
+        if cached.get(rel_path, {}).get('sha256') == entry['sha256']:
+            entry = dict(cached[rel_path], **entry)
+        images[rel_path] = entry
+
+    if probed or set(images) != set(cached):
+        save_manifest(images, manifest_path=manifest_path)
+
+    if verbose:
+        print(f"📁 Immagini nel manifest: {len(images)} ({probed} analizzate, {len(images) - probed} dalla cache)")
+
+    return images
+
+
+def save_manifest(images, root='.', manifest_path=None):
+    """Salva il manifest (usato anche dagli script che aggiungono dati derivati)"""
+    manifest_path = manifest_path or os.path.join(root, MANIFEST_FILE)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'images': images}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_manifest(root='.'):
+    """Restituisce il manifest aggiornato (ricostruisce solo le voci modificate)"""
+    return build_manifest(root)
+
+
+def normalize_src(src):
+    """
+    Converte un attributo src/href nel percorso relativo usato come chiave del manifest
+    """
+    src = src.strip().split('#')[0].split('?')[0]
+    src = re.sub(r'^https?://(www\.)?fbtotalsecurity\.com', '', src)
+    if re.match(r'^[a-z]+:', src) or src.startswith('//'):
+        return None  # Risorsa esterna o data URI
+    src = src.lstrip('/')
+    while src.startswith('./'):
+        src = src[2:]
+    return src
+
+
+def lookup(manifest, src):
+    """Restituisce la voce del manifest per un src HTML, o None se non è un'immagine locale"""
+    key = normalize_src(src)
+    if not key:
+        return None
+    return manifest.get(key)
+
+
+def main():
+    print("🖼️  Generazione manifest immagini")
+    print("=" * 50)
+
+    images = build_manifest('.', verbose=True)
+    total_bytes = sum(entry['bytes'] for entry in images.values())
+
+    for rel_path, entry in sorted(images.items()):
+        print(f"   • {rel_path}: {entry['width']}x{entry['height']} {entry['format']} - {entry['bytes']/1024:.1f} KB")
+
+    print(f"\n📊 Totale: {len(images)} immagini, {total_bytes/1024:.1f} KB")
+    print(f"✅ Manifest salvato: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
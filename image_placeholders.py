@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per generare placeholder LQIP per le immagini caricate in lazy loading
+Calcola colore dominante e griglia 4x3 con NumPy e li inserisce come background
+inline, così la pagina mostra contenuto stabile prima dell'immagine reale
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+from PIL import Image
+
+import image_manifest
+import instrumentation
+
+# Griglia della sfumatura (colonne x righe)
+GRID_COLUMNS = 4
+GRID_ROWS = 3
+
+# Lato massimo dell'immagine ridotta su cui si calcolano i placeholder
+SAMPLE_SIZE = 32
+
+# Sotto questa opacità media l'immagine è considerata trasparente
+ALPHA_THRESHOLD = 0.98
+
+
+def _srgb_to_linear(values):
+    values = values / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(values):
+    values = np.clip(values, 0.0, 1.0)
+    srgb = np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+    return np.round(srgb * 255).astype(int)
+
+
+def _hex_color(rgb):
+    r, g, b = (int(c) for c in rgb)
+    color = f'{r:02x}{g:02x}{b:02x}'
+    # Forma corta quando possibile (#aabbcc -> #abc)
+    if color[0::2] == color[1::2]:
+        color = color[0::2]
+    return '#' + color
+
+
+def load_sample(file_path):
+    """
+    Carica l'immagine già ridotta (draft JPEG + reduce) come array RGBA float
+    """
+    with Image.open(file_path) as img:
+        img.draft('RGB', (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+        img.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BOX, reducing_gap=2.0)
+        img = img.convert('RGBA')
+        return np.asarray(img, dtype=np.float64)
+
+
+def compute_placeholder(file_path):
+    """
+    Calcola i dati del placeholder: colore dominante e griglia 4x3
+    """
+    pixels = load_sample(file_path)
+    alpha = pixels[..., 3] / 255.0
+    linear = _srgb_to_linear(pixels[..., :3])
+
+    # Colore dominante: media in spazio lineare (pesata per l'alpha)
+    weights = alpha[..., None]
+    total_weight = max(float(alpha.sum()), 1e-6)
+    dominant = (linear * weights).sum(axis=(0, 1)) / total_weight
+
+    # Griglia 4x3: medie a blocchi tramite reshape sull'immagine riscalata
+    grid_img = Image.fromarray(pixels.astype(np.uint8), 'RGBA').resize(
+        (GRID_COLUMNS * 8, GRID_ROWS * 8), Image.Resampling.BOX)
+    grid_linear = _srgb_to_linear(np.asarray(grid_img, dtype=np.float64)[..., :3])
+    grid = grid_linear.reshape(GRID_ROWS, 8, GRID_COLUMNS, 8, 3).mean(axis=(1, 3))
+
+    return {
+        'color': _hex_color(_linear_to_srgb(dominant)),
+        'grid': [_hex_color(c) for c in _linear_to_srgb(grid).reshape(-1, 3)],
+        'transparent': bool(alpha.mean() < ALPHA_THRESHOLD),
+    }
+
+
+def placeholder_css(placeholder, mode='gradient'):
+    """
+    Restituisce la dichiarazione CSS background per il placeholder
+    """
+    if mode != 'gradient':
+        return f"background:{placeholder['color']}"
+
+    # Una sfumatura orizzontale per ogni riga della griglia, impilate in verticale
+    layers = []
+    grid = placeholder['grid']
+    for row in range(GRID_ROWS):
+        colors = ','.join(grid[row * GRID_COLUMNS:(row + 1) * GRID_COLUMNS])
+        position = f'0 {row * 100 // (GRID_ROWS - 1)}%'
+        layers.append(f'linear-gradient(90deg,{colors}) {position}/100% {100 / GRID_ROWS + 0.1:.1f}% no-repeat')
+    return f"background:{','.join(layers)},{placeholder['color']}"
+
+
+def update_manifest_placeholders(manifest, root='.'):
+    """
+    Calcola i placeholder mancanti e li salva nel manifest (cache per sha256)
+    """
+    computed = 0
+    for rel_path, entry in manifest.items():
+        if entry['format'] == 'svg':
+            continue
+        cached = entry.get('placeholder')
+        if cached and cached.get('sha256') == entry['sha256']:
+            continue
+        placeholder = compute_placeholder(os.path.join(root, rel_path))
+        placeholder['sha256'] = entry['sha256']
+        entry['placeholder'] = placeholder
+        computed += 1
+
+    if computed:
+        image_manifest.save_manifest(manifest, root)
+    return computed
+
+
+def add_placeholders(html_content, manifest, mode='gradient'):
+    """
+    Aggiunge il placeholder come background inline alle immagini con loading="lazy"
+    """
+    changes_made = []
+    img_pattern = r'<img\b[^>]*>'
+
+    def fix_img_tag(match):
+        tag = match.group(0)
+        if not re.search(r'\bloading=["\']lazy["\']', tag):
+            return tag
+
+        src_match = re.search(r'\bsrc=["\']([^"\']+)["\']', tag)
+        entry = image_manifest.lookup(manifest, src_match.group(1)) if src_match else None
+        placeholder = entry.get('placeholder') if entry else None
+        if not placeholder:
+            return tag
+
+        filename = os.path.basename(src_match.group(1))
+        marker = placeholder['sha256'][:8]
+        marker_match = re.search(r'\sdata-lqip=["\']([^"\']*)["\']', tag)
+        if marker_match and marker_match.group(1) == marker:
+            return tag  # Placeholder già aggiornato
+
+        # Le immagini trasparenti mostrerebbero lo sfondo anche dopo il caricamento
+        if placeholder['transparent']:
+            print(f"   ⚠️  {filename}: immagine trasparente, placeholder non applicato")
+            return tag
+
+        css = placeholder_css(placeholder, mode)
+        style_match = re.search(r'\sstyle=(["\'])(.*?)\1', tag)
+        if style_match:
+            style = style_match.group(2).strip()
+            if marker_match:
+                # Rimuovi il background inserito in precedenza (sempre l'ultima dichiarazione)
+                style = re.sub(r';?\s*background:[^;]*$', '', style)
+            style = f'{style.rstrip(";")};{css}' if style else css
+            tag = tag[:style_match.start()] + f' style="{style}"' + tag[style_match.end():]
+        else:
+            tag = tag[:4] + f' style="{css}"' + tag[4:]
+
+        tag = re.sub(r'\sdata-lqip=["\'][^"\']*["\']', '', tag)
+        tag = tag[:4] + f' data-lqip="{marker}"' + tag[4:]
+
+        changes_made.append(f"Placeholder {mode} aggiunto a {filename}")
+        return tag
+
+    updated_content = re.sub(img_pattern, fix_img_tag, html_content)
+    return updated_content, changes_made
+
+
+def process_html_file(file_path, manifest, mode='gradient'):
+    """
+    Processa un singolo file HTML aggiungendo i placeholder
+    """
+    print(f"\n📄 Processando: {file_path}")
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    original_size = len(content)
+    content, changes = add_placeholders(content, manifest, mode)
+
+    if changes:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        print(f"✅ Modifiche applicate: {len(changes)}")
+        for change in changes:
+            print(f"   • {change}")
+        print(f"📏 Dimensione: {original_size:,} → {len(content):,} bytes")
+    else:
+        print("ℹ️  Nessuna modifica necessaria")
+
+    return len(changes)
+
+
+def main():
+    # Modalità: gradient (griglia 4x3), color (solo colore dominante)
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'gradient'
+    if mode not in ('gradient', 'color'):
+        print(f"❌ Modalità non valida: {mode} (usa gradient o color)")
+        return
+
+    print("🎨 Generazione placeholder LQIP per immagini lazy")
+    print("=" * 50)
+
+    html_files = [
+        'index.html',
+        'sorveglianza.html',
+        'allarmi.html',
+        'serramenti.html',
+        'nebbiogeni.html',
+        'chi-siamo.html'
+    ]
+
+    manifest = image_manifest.load_manifest('.')
+    computed = update_manifest_placeholders(manifest, '.')
+    print(f"🧮 Placeholder calcolati: {computed} (gli altri dalla cache del manifest)")
+
+    total_changes = 0
+    for html_file in html_files:
+        if os.path.exists(html_file):
+            total_changes += process_html_file(html_file, manifest, mode)
+        else:
+            print(f"⚠️  File non trovato: {html_file}")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"🔧 Placeholder inseriti: {total_changes}")
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Helper comuni per ridimensionare le immagini in modo veloce
+Usa Image.draft per i JPEG (decodifica DCT già ridotta) e Image.reduce come
+pre-riduzione intera prima del filtro finale di alta qualità (LANCZOS)
+"""
+
+from math import ceil, floor
+
+from PIL import Image
+
+import instrumentation
+
+# Margine tra pre-riduzione intera e dimensione finale (lo stesso di Image.thumbnail):
+# valori più alti avvicinano il risultato a un LANCZOS a piena risoluzione
+REDUCING_GAP = 2.0
+
+
+def fit_size(source_size, max_size):
+    """
+    Calcola la dimensione finale che entra in max_size mantenendo le proporzioni
+    (stesso arrotondamento di Image.thumbnail, così le dimensioni non cambiano)
+    """
+    width, height = source_size
+    x, y = floor(max_size[0]), floor(max_size[1])
+    if x >= width and y >= height:
+        return width, height
+
+    def round_aspect(number, key):
+        return max(min(floor(number), ceil(number), key=key), 1)
+
+    aspect = width / height
+    if x / y >= aspect:
+        x = round_aspect(y * aspect, key=lambda n: abs(aspect - n / y))
+    else:
+        y = round_aspect(x / aspect, key=lambda n: 0 if n == 0 else abs(aspect - x / n))
+    return x, y
+
+
+def _has_transparency(img):
+    if img.mode in ('RGBA', 'LA'):
+        return img.getchannel('A').getextrema()[0] < 255
+    return img.mode == 'P' and 'transparency' in img.info
+
+
+@instrumentation.timed('resize')
+def downscale(img, target_size, mode=None, resample=Image.Resampling.LANCZOS,
+              reducing_gap=REDUCING_GAP):
+    """
+    Riduce un'immagine appena aperta (non ancora caricata) a target_size esatto.
+
+    - JPEG: draft() fa decodificare direttamente a 1/2, 1/4 o 1/8 della risoluzione
+    - resize(reducing_gap=...) applica prima Image.reduce con fattore intero e poi
+      il filtro finale solo sull'immagine già ridotta
+    - la conversione di modo (es. RGBA -> RGB) avviene dopo la riduzione, quando
+      il risultato è identico, così non si converte l'immagine a piena risoluzione
+    """
+    target_size = tuple(target_size)
+    box = None
+    if img.format == 'JPEG' and reducing_gap:
+        draft = img.draft(None, (int(target_size[0] * reducing_gap), int(target_size[1] * reducing_gap)))
+        if draft is not None:
+            # Area sorgente nella scala ridotta: evita spostamenti dovuti all'arrotondamento DCT
+            box = draft[1]
+
+    # Palette e immagini con alpha reale vanno convertite prima, come faceva il codice originale
+    if mode and img.mode != mode and (img.mode in ('P', '1') or _has_transparency(img)):
+        img = img.convert(mode)
+
+    if img.size != target_size or box is not None:
+        img = img.resize(target_size, resample, box=box, reducing_gap=reducing_gap)
+
+    if mode and img.mode != mode:
+        img = img.convert(mode)
+    return img
+
+
+def thumbnail(img, max_size, mode=None, **kwargs):
+    """Equivalente veloce di img.convert(mode) + img.thumbnail(max_size)"""
+    return downscale(img, fit_size(img.size, max_size), mode, **kwargs)
+
+
+def resize_to_width(img, max_width, mode=None, **kwargs):
+    """
+    Riduce l'immagine alla larghezza massima indicata (altezza proporzionale);
+    le immagini già più strette restano invariate
+    """
+    width, height = img.size
+    if width <= max_width:
+        return img.convert(mode) if mode and img.mode != mode else img
+    new_height = int(height * (max_width / width))
+    return downscale(img, (max_width, new_height), mode, **kwargs)
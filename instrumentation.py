@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Strumentazione comune degli script di ottimizzazione
+  - stage(nome): misura la durata di una fase (e il picco di memoria con
+    tracemalloc, se attivo); le fasi si possono annidare e usare da più thread
+  - run(main): punto di ingresso degli script; riconosce e toglie da sys.argv
+    le opzioni comuni prima che lo script legga i suoi argomenti:
+      --timings        riepilogo dei tempi per fase a fine esecuzione
+      --memory         picco di memoria per fase (tracemalloc, più lento)
+      --profile        profilo cProfile in <script>.prof (pstats/snakeviz)
+      --trace FILE     trace JSON in formato Chrome trace-event (chrome://tracing,
+                       Perfetto) con tutte le fasi dell'esecuzione
+Trace e memoria arrivano agli script lanciati da build.py tramite le variabili
+d'ambiente INSTRUMENTATION_*: il build raccoglie le loro fasi nel proprio
+riepilogo e in un unico trace dell'intera esecuzione
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import argparse
+import threading
+import subprocess
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+TRACE_ENV = 'INSTRUMENTATION_TRACE'
+MEMORY_ENV = 'INSTRUMENTATION_MEMORY'
+
+# run() toglie queste opzioni da sys.argv prima dell'argparse dello script:
+# gli script le riportano nell'epilog del proprio --help
+OPTIONS_HELP = '''opzioni di strumentazione (comuni agli script, vedi instrumentation.py):
+  --timings     riepilogo dei tempi per fase a fine esecuzione
+  --memory      picco di memoria per fase (tracemalloc, più lento)
+  --profile     profilo cProfile in <script>.prof (pstats/snakeviz)
+  --trace FILE  trace JSON in formato Chrome trace-event (chrome://tracing, Perfetto)'''
+
+# perf_counter è monotono ma con origine arbitraria: l'offset porta i tempi
+# sull'orologio di sistema, così i trace di processi diversi si allineano
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+_events = []
+_lock = threading.Lock()
+_local = threading.local()
+_settings = {'trace': None, 'timings': False, 'process': None}
+
+
+def now_us():
+    return (time.perf_counter() + _EPOCH_OFFSET) * 1e6
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def stage(name, **args):
+    """Fase misurata: durata sempre, picco di memoria se tracemalloc è attivo"""
+    tracing = tracemalloc.is_tracing()
+    stack = _stack()
+    if tracing:
+        # Il picco misurato finora appartiene alla fase che contiene questa
+        if stack:
+            stack[-1]['child_peak'] = max(stack[-1]['child_peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    frame = {'child_peak': 0}
+    stack.append(frame)
+    start = now_us()
+    try:
+        yield
+    finally:
+        end = now_us()
+        stack.pop()
+        event = {'name': name, 'cat': args.pop('cat', 'stage'), 'ph': 'X', 'ts': round(start, 1),
+                 'dur': round(end - start, 1), 'pid': os.getpid(), 'tid': threading.get_ident(),
+                 'args': {key: str(value) for key, value in args.items()}}
+        if tracing:
+            peak = max(frame['child_peak'], tracemalloc.get_traced_memory()[1])
+            event['args']['peak_kb'] = round(peak / 1024, 1)
+            if stack:
+                stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+        with _lock:
+            _events.append(event)
+
+
+def timed(name=None):
+    """Decoratore: ogni chiamata della funzione è una fase"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name or function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def events():
+    with _lock:
+        return list(_events)
+
+
+def add_events(new_events):
+    """Aggiunge fasi registrate da un altro processo (es. uno script lanciato dal build)"""
+    with _lock:
+        _events.extend(new_events)
+
+
+def active():
+    """True se è richiesto almeno un riepilogo, un trace o la misura della memoria"""
+    return _settings['trace'] is not None or _settings['timings'] or tracemalloc.is_tracing()
+
+
+def run_child(command, trace_file, **kwargs):
+    """
+    subprocess.run con la strumentazione attiva anche nel figlio: le sue fasi
+    vengono scritte in trace_file e aggiunte a quelle di questo processo
+    """
+    if not active():
+        return subprocess.run(command, **kwargs)
+    env = dict(os.environ, **{TRACE_ENV: trace_file})
+    if tracemalloc.is_tracing():
+        env[MEMORY_ENV] = '1'
+    try:
+        return subprocess.run(command, env=env, **kwargs)
+    finally:
+        if os.path.exists(trace_file):
+            if os.path.getsize(trace_file):
+                with open(trace_file, 'r', encoding='utf-8') as f:
+                    add_events(json.load(f).get('traceEvents', []))
+            os.remove(trace_file)
+
+
+def summary(stage_events=None):
+    """Tempo totale, numero di chiamate e picco di memoria per nome di fase, dal più lento"""
+    totals = {}
+    for event in events() if stage_events is None else stage_events:
+        if event.get('ph') != 'X':
+            continue
+        entry = totals.setdefault(event['name'], {'name': event['name'], 'calls': 0, 'total_ms': 0.0, 'peak_kb': None})
+        entry['calls'] += 1
+        entry['total_ms'] += event['dur'] / 1000
+        peak = event.get('args', {}).get('peak_kb')
+        if peak is not None:
+            entry['peak_kb'] = max(entry['peak_kb'] or 0, peak)
+    return sorted(totals.values(), key=lambda entry: -entry['total_ms'])
+
+
+def print_summary():
+    rows = summary()
+    if not rows:
+        return
+    print(f"\n⏱️  Tempi per fase:")
+    for row in rows:
+        memory = f"  picco {row['peak_kb'] / 1024:.1f} MB" if row['peak_kb'] is not None else ''
+        print(f"   {row['total_ms']:>10.1f} ms  {row['calls']:>5}×  {row['name']}{memory}")
+
+
+def write_trace(path):
+    """Scrive le fasi in formato Chrome trace-event, con i nomi dei processi"""
+    stage_events = events()
+    names = {os.getpid(): _settings['process']}
+    for event in stage_events:
+        if event.get('ph') == 'M' and event.get('name') == 'process_name':
+            names[event['pid']] = event['args']['name']
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': name}}
+                for pid, name in names.items() if name]
+    trace = {'traceEvents': metadata + [event for event in stage_events if event.get('ph') != 'M'],
+             'displayTimeUnit': 'ms'}
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(trace, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+
+def parse_options(argv):
+    """Opzioni di strumentazione da argv e dall'ambiente; restituisce (opzioni, argomenti rimanenti)"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--timings', action='store_true')
+    parser.add_argument('--memory', action='store_true')
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--trace', metavar='FILE')
+    options, remaining = parser.parse_known_args(argv)
+    # Il riepilogo si stampa solo se richiesto qui: per i figli del build lo stampa il build
+    options.summary = options.timings or options.memory
+    options.trace = options.trace or os.environ.get(TRACE_ENV)
+    options.memory = options.memory or os.environ.get(MEMORY_ENV) == '1'
+    return options, remaining
+
+
+def run(main, name=None):
+    """Esegue main() di uno script come fase principale, con le opzioni di strumentazione"""
+    options, remaining = parse_options(sys.argv[1:])
+    sys.argv[1:] = remaining
+    script = name or os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    _settings.update(trace=options.trace, timings=options.timings, process=script)
+
+    if options.memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if options.profile else None
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(f'{script}.prof')
+            print(f"🔬 Profilo cProfile: {script}.prof")
+        if options.trace:
+            write_trace(options.trace)
+        if options.summary:
+            print_summary()
+
+    # atexit copre anche gli script che terminano con sys.exit()
+    atexit.register(finish)
+    if profiler is not None:
+        profiler.enable()
+    with stage(script, cat='script'):
+        return main()
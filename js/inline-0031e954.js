@@ -0,0 +1,24 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const liteYTEmbeds = document.querySelectorAll('.lite-youtube-embed');
+
+    liteYTEmbeds.forEach(function(liteYTEmbed) {
+        liteYTEmbed.addEventListener('click', function() {
+            const videoId = this.getAttribute('data-id');
+            const iframe = document.createElement('iframe');
+
+            iframe.setAttribute('src', `https://www.youtube.com/embed/${videoId}?autoplay=1&rel=0`);
+            iframe.setAttribute('frameborder', '0');
+            iframe.setAttribute('allow', 'accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture');
+            iframe.setAttribute('allowfullscreen', '');
+            iframe.setAttribute('title', this.getAttribute('data-title'));
+            iframe.setAttribute('loading', 'lazy');
+
+            // Remove the thumbnail and play button, then add the iframe
+            this.innerHTML = '';
+            this.appendChild(iframe);
+
+            // Remove the click event after it's been triggered
+            this.removeEventListener('click', arguments.callee);
+        });
+    });
+});
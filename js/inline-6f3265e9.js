@@ -0,0 +1,70 @@
+let currentSlideIndexGrateInferriate = 0;
+let previousSlideIndexGrateInferriate = -1;
+const slidesGrateInferriate = document.querySelectorAll('.grate-inferriate-carousel .carousel-slide');
+const indicatorsGrateInferriate = document.querySelectorAll('.grate-inferriate-carousel .indicator');
+const totalSlidesGrateInferriate = slidesGrateInferriate.length;
+
+function showSlideGrateInferriate(index) {
+    // Only update if index has changed to avoid unnecessary DOM operations
+    if (index === previousSlideIndexGrateInferriate) return;
+
+    // Remove active class only from previous slide (more efficient)
+    if (previousSlideIndexGrateInferriate >= 0 && slidesGrateInferriate[previousSlideIndexGrateInferriate]) {
+        slidesGrateInferriate[previousSlideIndexGrateInferriate].classList.remove('active');
+        if (indicatorsGrateInferriate[previousSlideIndexGrateInferriate]) {
+            indicatorsGrateInferriate[previousSlideIndexGrateInferriate].classList.remove('active');
+        }
+    }
+
+    // Add active class to current slide
+    if (slidesGrateInferriate[index]) {
+        slidesGrateInferriate[index].classList.add('active');
+    }
+
+    // Update current indicator
+    if (indicatorsGrateInferriate[index]) {
+        indicatorsGrateInferriate[index].classList.add('active');
+    }
+
+    previousSlideIndexGrateInferriate = index;
+}
+
+function changeSlideGrateInferriate(direction) {
+    currentSlideIndexGrateInferriate += direction;
+
+    if (currentSlideIndexGrateInferriate >= totalSlidesGrateInferriate) {
+        currentSlideIndexGrateInferriate = 0;
+    } else if (currentSlideIndexGrateInferriate < 0) {
+        currentSlideIndexGrateInferriate = totalSlidesGrateInferriate - 1;
+    }
+
+    showSlideGrateInferriate(currentSlideIndexGrateInferriate);
+}
+
+function currentSlideGrateInferriate(index) {
+    currentSlideIndexGrateInferriate = index - 1;
+    showSlideGrateInferriate(currentSlideIndexGrateInferriate);
+}
+
+// Auto-slide ogni 5 secondi con performance ottimizzata
+if (totalSlidesGrateInferriate > 1) {
+    // Usa requestAnimationFrame per operazioni DOM più fluide
+    let intervalId = setInterval(() => {
+        requestAnimationFrame(() => {
+            changeSlideGrateInferriate(1);
+        });
+    }, 5000);
+
+    // Pausa l'auto-slide quando la tab non è visibile per risparmiare risorse
+    document.addEventListener('visibilitychange', () => {
+        if (document.hidden) {
+            clearInterval(intervalId);
+        } else if (totalSlidesGrateInferriate > 1) {
+            intervalId = setInterval(() => {
+                requestAnimationFrame(() => {
+                    changeSlideGrateInferriate(1);
+                });
+            }, 5000);
+        }
+    });
+}
@@ -0,0 +1,150 @@
+// Disabilita Zaraz debug mode
+if (typeof window !== 'undefined') {
+    // Rimuovi parametri debug dall'URL se presenti
+    if (window.location.search.includes('zaraz_debug') || window.location.search.includes('debug')) {
+        const url = new URL(window.location);
+        url.searchParams.delete('zaraz_debug');
+        url.searchParams.delete('debug');
+        window.history.replaceState({}, document.title, url.pathname + url.search);
+    }
+
+    // Disabilita debug mode tramite localStorage
+    try {
+        localStorage.removeItem('zaraz_debug');
+        localStorage.removeItem('zaraz-debug');
+        localStorage.setItem('zaraz_debug', 'false');
+    } catch (e) {
+        // Ignora errori localStorage
+    }
+
+    // Disabilita debug mode tramite sessionStorage
+    try {
+        sessionStorage.removeItem('zaraz_debug');
+        sessionStorage.removeItem('zaraz-debug');
+        sessionStorage.setItem('zaraz_debug', 'false');
+    } catch (e) {
+        // Ignora errori sessionStorage
+    }
+
+    // Override console methods per bloccare messaggi debug Zaraz
+    const originalLog = console.log;
+    const originalWarn = console.warn;
+    const originalInfo = console.info;
+
+    console.log = function(...args) {
+        const message = args.join(' ');
+        if (!message.includes('Zaraz') && !message.includes('zaraz')) {
+            originalLog.apply(console, args);
+        }
+    };
+
+    console.warn = function(...args) {
+        const message = args.join(' ');
+        if (!message.includes('Zaraz') && !message.includes('zaraz')) {
+            originalWarn.apply(console, args);
+        }
+    };
+
+    console.info = function(...args) {
+        const message = args.join(' ');
+        if (!message.includes('Zaraz') && !message.includes('zaraz')) {
+            originalInfo.apply(console, args);
+        }
+    };
+
+    // Blocca popup e alert relativi a Zaraz
+    const originalAlert = window.alert;
+    window.alert = function(message) {
+        if (typeof message === 'string' && (message.includes('Zaraz') || message.includes('zaraz'))) {
+            return; // Blocca l'alert
+        }
+        originalAlert.call(window, message);
+    };
+
+    // Prevenzione completa errori Zaraz con inizializzazione sicura
+    (function() {
+        // Crea un oggetto zaraz stub sicuro per prevenire errori
+        const safeZarazStub = {
+            debug: false,
+            set: function(key, value) {
+                // Stub sicuro che non fa nulla ma previene errori
+                return this;
+            },
+            track: function() {
+                // Stub sicuro per tracking
+                return this;
+            },
+            init: function() {
+                // Stub sicuro per init
+                return this;
+            }
+        };
+
+        // Inizializza zaraz con stub sicuro se non esiste
+        if (!window.zaraz) {
+            window.zaraz = safeZarazStub;
+        }
+
+        // Disabilita Zaraz debug se l'oggetto zaraz esiste
+        if (window.zaraz) {
+            window.zaraz.debug = false;
+            if (window.zaraz.set && typeof window.zaraz.set === 'function') {
+                try {
+                    window.zaraz.set('debug', false);
+                } catch (e) {
+                    // Silenzioso per evitare spam console
+                }
+            }
+        }
+
+        // Intercetta la creazione dell'oggetto zaraz con controlli di sicurezza avanzati
+        let zarazValue = window.zaraz || safeZarazStub;
+
+        Object.defineProperty(window, 'zaraz', {
+            set: function(value) {
+                if (value && typeof value === 'object') {
+                    // Assicura che tutti i metodi essenziali esistano
+                    if (!value.set || typeof value.set !== 'function') {
+                        value.set = safeZarazStub.set;
+                    }
+                    if (!value.track || typeof value.track !== 'function') {
+                        value.track = safeZarazStub.track;
+                    }
+                    if (!value.init || typeof value.init !== 'function') {
+                        value.init = safeZarazStub.init;
+                    }
+
+                    value.debug = false;
+
+                    // Wrappa i metodi per prevenire errori
+                    const originalSet = value.set;
+                    value.set = function(key, val) {
+                        try {
+                            return originalSet.call(this, key, val);
+                        } catch (e) {
+                            return this;
+                        }
+                    };
+
+                    const originalInit = value.init;
+                    value.init = function() {
+                        try {
+                            return originalInit.call(this);
+                        } catch (e) {
+                            return this;
+                        }
+                    };
+                } else if (!value) {
+                    // Se value è null/undefined, usa lo stub sicuro
+                    value = safeZarazStub;
+                }
+                zarazValue = value;
+            },
+            get: function() {
+                return zarazValue;
+            },
+            configurable: true,
+            enumerable: true
+        });
+    })();
+}
@@ -0,0 +1,69 @@
+let currentSlideIndex = 0;
+let previousSlideIndex = -1;
+const slides = document.querySelectorAll('.carousel-slide');
+const indicators = document.querySelectorAll('.indicator');
+
+function showSlide(index) {
+    // Only update if index has changed to avoid unnecessary DOM operations
+    if (index === previousSlideIndex) return;
+
+    // Remove active class only from previous slide (more efficient)
+    if (previousSlideIndex >= 0 && slides[previousSlideIndex]) {
+        slides[previousSlideIndex].classList.remove('active');
+        if (indicators[previousSlideIndex]) {
+            indicators[previousSlideIndex].classList.remove('active');
+        }
+    }
+
+    // Add active class to current slide
+    if (slides[index]) {
+        slides[index].classList.add('active');
+    }
+
+    // Update current indicator
+    if (indicators[index]) {
+        indicators[index].classList.add('active');
+    }
+
+    previousSlideIndex = index;
+}
+
+function changeSlide(direction) {
+    currentSlideIndex += direction;
+
+    if (currentSlideIndex >= slides.length) {
+        currentSlideIndex = 0;
+    } else if (currentSlideIndex < 0) {
+        currentSlideIndex = slides.length - 1;
+    }
+
+    showSlide(currentSlideIndex);
+}
+
+function currentSlide(index) {
+    currentSlideIndex = index - 1;
+    showSlide(currentSlideIndex);
+}
+
+// Auto-slide ogni 5 secondi con performance ottimizzata
+if (slides.length > 1) {
+    // Usa requestAnimationFrame per operazioni DOM più fluide
+    let intervalId = setInterval(() => {
+        requestAnimationFrame(() => {
+            changeSlide(1);
+        });
+    }, 5000);
+
+    // Pausa l'auto-slide quando la tab non è visibile per risparmiare risorse
+    document.addEventListener('visibilitychange', () => {
+        if (document.hidden) {
+            clearInterval(intervalId);
+        } else if (slides.length > 1) {
+            intervalId = setInterval(() => {
+                requestAnimationFrame(() => {
+                    changeSlide(1);
+                });
+            }, 5000);
+        }
+    });
+}
@@ -0,0 +1,138 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const liteYTEmbed = document.querySelector('.lite-youtube-embed');
+
+    if (liteYTEmbed) {
+        liteYTEmbed.addEventListener('click', function() {
+            const videoId = this.getAttribute('data-id');
+            const iframe = document.createElement('iframe');
+
+            iframe.setAttribute('src', `https://www.youtube.com/embed/${videoId}?autoplay=1&rel=0`);
+            iframe.setAttribute('frameborder', '0');
+            iframe.setAttribute('allow', 'accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture');
+            iframe.setAttribute('allowfullscreen', '');
+            iframe.setAttribute('title', this.getAttribute('data-title'));
+            iframe.setAttribute('loading', 'lazy');
+
+            // Remove the thumbnail and play button, then add the iframe
+            this.innerHTML = '';
+            this.appendChild(iframe);
+
+            // Remove the click event after it's been triggered
+            this.removeEventListener('click', arguments.callee);
+        });
+    }
+});
+
+// Image Slider Functionality
+const slider = document.querySelector('.image-slider');
+if (slider) {
+    const slides = slider.querySelectorAll('.slide');
+    const dots = slider.querySelectorAll('.dot');
+    const prevBtn = slider.querySelector('.prev-btn');
+    const nextBtn = slider.querySelector('.next-btn');
+
+    let currentSlide = 0;
+    let previousSlide = -1;
+    const totalSlides = slides.length;
+
+    function showSlide(index) {
+        // Only update if index has changed to avoid unnecessary DOM operations
+        if (index === previousSlide) return;
+
+        // Remove active class only from previous slide and dot (more efficient)
+        if (previousSlide >= 0) {
+            if (slides[previousSlide]) {
+                slides[previousSlide].classList.remove('active');
+            }
+            if (dots[previousSlide]) {
+                dots[previousSlide].classList.remove('active');
+            }
+        }
+
+        // Add active class to current slide and dot
+        if (slides[index]) {
+            slides[index].classList.add('active');
+        }
+        if (dots[index]) {
+            dots[index].classList.add('active');
+        }
+
+        previousSlide = index;
+    }
+
+    function nextSlide() {
+        currentSlide = (currentSlide + 1) % totalSlides;
+        showSlide(currentSlide);
+    }
+
+    function prevSlide() {
+        currentSlide = (currentSlide - 1 + totalSlides) % totalSlides;
+        showSlide(currentSlide);
+    }
+
+    // Event listeners for navigation buttons
+    if (nextBtn) {
+        nextBtn.addEventListener('click', nextSlide);
+    }
+
+    if (prevBtn) {
+        prevBtn.addEventListener('click', prevSlide);
+    }
+
+    // Event listeners for dots
+    dots.forEach((dot, index) => {
+        dot.addEventListener('click', () => {
+            currentSlide = index;
+            showSlide(currentSlide);
+        });
+    });
+
+    // Auto-advance slides every 5 seconds with performance optimization
+    if (totalSlides > 1) {
+        // Use requestAnimationFrame for smoother DOM operations
+        let intervalId = setInterval(() => {
+            requestAnimationFrame(nextSlide);
+        }, 5000);
+
+        // Pause auto-slide when tab is not visible to save resources
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                clearInterval(intervalId);
+            } else if (totalSlides > 1) {
+                intervalId = setInterval(() => {
+                    requestAnimationFrame(nextSlide);
+                }, 5000);
+            }
+        });
+    }
+
+    // Keyboard navigation
+    document.addEventListener('keydown', (e) => {
+        if (e.key === 'ArrowLeft') {
+            prevSlide();
+        } else if (e.key === 'ArrowRight') {
+            nextSlide();
+        }
+    });
+
+    // Touch/swipe support for mobile
+    let startX = 0;
+    let endX = 0;
+
+    slider.addEventListener('touchstart', (e) => {
+        startX = e.touches[0].clientX;
+    }, { passive: true });
+
+    slider.addEventListener('touchend', (e) => {
+        endX = e.changedTouches[0].clientX;
+        const diff = startX - endX;
+
+        if (Math.abs(diff) > 50) { // Minimum swipe distance
+            if (diff > 0) {
+                nextSlide(); // Swipe left - next slide
+            } else {
+                prevSlide(); // Swipe right - previous slide
+            }
+        }
+    });
+}
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenizer JavaScript leggero per gli script di ottimizzazione
+Distingue stringhe, template literal, regex e commenti (così un '{' dentro una
+stringa non rompe l'analisi), accoppia le parentesi e riconosce chiamate,
+argomenti e corpi di funzione. Le modifiche sono giunte per offset sul sorgente
+originale, applicate tutte insieme come in html_document
+"""
+
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', 'type value start end line')
+
+PUNCTUATORS = sorted([
+    '>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+    '=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=',
+    '*=', '/=', '%=', '&=', '|=', '^=', '**', '<<', '>>',
+    '{', '}', '(', ')', '[', ']', ';', ',', '<', '>', '+', '-', '*', '/', '%',
+    '&', '|', '^', '!', '~', '?', ':', '=', '.', '@', '#',
+], key=len, reverse=True)
+
+# Dopo queste parole chiave una '/' apre una regex, non una divisione
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+                  'void', 'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+NAME_PATTERN = re.compile(r'[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*')
+NUMBER_PATTERN = re.compile(r'0[xXbBoO][\da-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?')
+SPACE_PATTERN = re.compile(r'\s+')
+
+OPENING = {'(': ')', '[': ']', '{': '}'}
+
+# Parole chiave seguite da (...) { che non sono metodi
+METHOD_EXCLUDED = {'if', 'for', 'while', 'switch', 'catch', 'with', 'function', 'return'}
+
+
+def _scan_string(source, pos):
+    quote = source[pos]
+    pos += 1
+    while pos < len(source):
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == quote or char == '\n':
+            return pos + 1
+        pos += 1
+    return pos
+
+
+def _scan_template(source, pos):
+    """Template literal completo, comprese le espressioni ${...} annidate"""
+    pos += 1
+    while pos < len(source):
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == '`':
+            return pos + 1
+        if source.startswith('${', pos):
+            pos = _scan_expression(source, pos + 2)
+            continue
+        pos += 1
+    return pos
+
+
+def _scan_expression(source, pos):
+    """Salta un'espressione ${...} fino alla '}' di chiusura"""
+    depth = 1
+    while pos < len(source):
+        char = source[pos]
+        if char in '\'"':
+            pos = _scan_string(source, pos)
+            continue
+        if char == '`':
+            pos = _scan_template(source, pos)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    return pos
+
+
+def _scan_regex(source, pos):
+    pos += 1
+    in_class = False
+    while pos < len(source):
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == '\n':
+            return None
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            pos += 1
+            while pos < len(source) and (source[pos].isalnum() or source[pos] in '_$'):
+                pos += 1
+            return pos
+        pos += 1
+    return None
+
+
+def _regex_allowed(previous):
+    if previous is None:
+        return True
+    if previous.type == 'punct':
+        return previous.value not in (')', ']', '}')
+    return previous.type == 'name' and previous.value in REGEX_KEYWORDS
+
+
+def tokenize(source):
+    """
+    Restituisce (token di codice, commenti). Gli spazi non producono token:
+    gli offset bastano per ricostruire il testo originale
+    """
+    tokens = []
+    comments = []
+    pos = 0
+    line = 1
+    length = len(source)
+
+    while pos < length:
+        space = SPACE_PATTERN.match(source, pos)
+        if space:
+            line += space.group(0).count('\n')
+            pos = space.end()
+            continue
+
+        char = source[pos]
+        start = pos
+        if source.startswith('//', pos):
+            end = source.find('\n', pos)
+            pos = length if end == -1 else end
+            comments.append(Token('comment', source[start:pos], start, pos, line))
+            continue
+        if source.startswith('/*', pos):
+            end = source.find('*/', pos + 2)
+            pos = length if end == -1 else end + 2
+            comments.append(Token('comment', source[start:pos], start, pos, line))
+            line += source.count('\n', start, pos)
+            continue
+
+        previous = tokens[-1] if tokens else None
+        if char in '\'"':
+            kind, pos = 'string', _scan_string(source, pos)
+        elif char == '`':
+            kind, pos = 'template', _scan_template(source, pos)
+        elif char == '/' and _regex_allowed(previous) and _scan_regex(source, pos):
+            kind, pos = 'regex', _scan_regex(source, pos)
+        else:
+            match = NAME_PATTERN.match(source, pos) or NUMBER_PATTERN.match(source, pos)
+            if match and match.end() > pos:
+                kind = 'name' if NAME_PATTERN.match(source, pos) else 'number'
+                pos = match.end()
+            else:
+                kind = 'punct'
+                value = next((p for p in PUNCTUATORS if source.startswith(p, pos)), char)
+                pos += len(value)
+
+        tokens.append(Token(kind, source[start:pos], start, pos, line))
+        line += source.count('\n', start, pos)
+
+    return tokens, comments
+
+
+def string_value(token):
+    """Contenuto di un token stringa senza virgolette (None per gli altri token)"""
+    if token.type == 'string' or (token.type == 'template' and '${' not in token.value):
+        return token.value[1:-1]
+    return None
+
+
+class JSSource:
+    """
+    Sorgente JavaScript tokenizzato con le parentesi accoppiate.
+    Gli intervalli di token sono semiaperti: (inizio, fine) con fine esclusa
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens, self.comments = tokenize(source)
+        self.pairs = {}
+        self.depth = []
+        stack = []
+        for index, token in enumerate(self.tokens):
+            self.depth.append(len(stack))
+            if token.type != 'punct':
+                continue
+            if token.value in OPENING:
+                stack.append(index)
+            elif token.value in (')', ']', '}') and stack:
+                opening = stack.pop()
+                self.pairs[opening] = index
+                self.pairs[index] = opening
+                self.depth[index] = len(stack)
+        self._edits = []
+
+    def text(self, start, end):
+        """Testo originale dei token [start, end)"""
+        if start >= end:
+            return ''
+        return self.source[self.tokens[start].start:self.tokens[end - 1].end]
+
+    def is_token(self, index, value, kind=None):
+        if not 0 <= index < len(self.tokens):
+            return False
+        token = self.tokens[index]
+        return token.value == value and (kind is None or token.type == kind)
+
+    def find_calls(self, method):
+        """Indici delle '(' delle chiamate obj.method(...)"""
+        calls = []
+        for index, token in enumerate(self.tokens):
+            if (token.type == 'name' and token.value == method and
+                    self.is_token(index - 1, '.') and self.is_token(index + 1, '(')):
+                calls.append(index + 1)
+        return calls
+
+    def receiver(self, call_open):
+        """Testo dell'oggetto su cui è chiamato il metodo (es. 'window')"""
+        index = call_open - 3
+        start = index
+        while start > 0:
+            token = self.tokens[start]
+            if token.value in (')', ']') and start in self.pairs:
+                start = self.pairs[start] - 1
+                continue
+            if self.is_token(start - 1, '.') or self.is_token(start - 1, '?.'):
+                start -= 2
+                continue
+            break
+        return self.text(start, index + 1)
+
+    def arguments(self, call_open):
+        """Intervalli di token degli argomenti di una chiamata"""
+        close = self.pairs.get(call_open)
+        if close is None:
+            return []
+        args = []
+        start = call_open + 1
+        index = start
+        while index < close:
+            if index in self.pairs and self.tokens[index].value in OPENING:
+                index = self.pairs[index] + 1
+                continue
+            if self.is_token(index, ',', 'punct'):
+                args.append((start, index))
+                start = index + 1
+            index += 1
+        if start < close:
+            args.append((start, close))
+        return args
+
+    def function_at(self, start, end):
+        """
+        Se i token [start, end) sono una funzione (function o arrow), restituisce
+        (parametri, inizio corpo, fine corpo); per le arrow senza graffe il corpo
+        è l'espressione stessa
+        """
+        index = start
+        if self.is_token(index, 'async', 'name'):
+            index += 1
+        if self.is_token(index, 'function', 'name'):
+            index += 1
+            if self.is_token(index, '*'):
+                index += 1
+            if index < end and self.tokens[index].type == 'name':
+                index += 1
+            if not self.is_token(index, '('):
+                return None
+            params_close = self.pairs.get(index)
+            if params_close is None or not self.is_token(params_close + 1, '{'):
+                return None
+            params = self._param_names(index + 1, params_close)
+            body_open = params_close + 1
+            return params, body_open + 1, self.pairs[body_open]
+
+        if self.is_token(index, '(') and index in self.pairs:
+            params_close = self.pairs[index]
+            params = self._param_names(index + 1, params_close)
+            arrow = params_close + 1
+        elif index < end and self.tokens[index].type == 'name':
+            params = [self.tokens[index].value]
+            arrow = index + 1
+        else:
+            return None
+        if not self.is_token(arrow, '=>'):
+            return None
+        if self.is_token(arrow + 1, '{'):
+            return params, arrow + 2, self.pairs.get(arrow + 1, end)
+        return params, arrow + 1, end
+
+    def _param_names(self, start, end):
+        names = []
+        for index in range(start, end):
+            token = self.tokens[index]
+            if token.type == 'name' and (index == start or self.tokens[index - 1].value in (',', '(', '...')):
+                names.append(token.value)
+        return names
+
+    def find_function(self, name):
+        """
+        Corpo di una funzione dichiarata con 'function name(...)' oppure
+        'const/let/var name = function/arrow'; None se non si trova
+        """
+        for index, token in enumerate(self.tokens):
+            if token.type != 'name' or token.value != name:
+                continue
+            if self.is_token(index - 1, 'function', 'name'):
+                return self.function_at(index - 1, len(self.tokens))
+            if (self.is_token(index + 1, '=') and index > 0 and
+                    self.tokens[index - 1].value in ('const', 'let', 'var')):
+                end = index + 2
+                while end < len(self.tokens) and not self.is_token(end, ';'):
+                    if end in self.pairs and self.tokens[end].value in OPENING:
+                        end = self.pairs[end]
+                    end += 1
+                return self.function_at(index + 2, end)
+        return None
+
+    def _expression_end(self, index):
+        """Fine di un'espressione: primo ',' ';' o parentesi di chiusura allo stesso livello"""
+        while index < len(self.tokens):
+            token = self.tokens[index]
+            if token.value in OPENING and index in self.pairs:
+                index = self.pairs[index] + 1
+                continue
+            if token.type == 'punct' and token.value in (',', ';', ')', ']', '}'):
+                break
+            index += 1
+        return index
+
+    def functions(self):
+        """
+        Tutte le funzioni del file (dichiarazioni, espressioni, arrow e metodi):
+        lista ordinata di (primo token, parametri, inizio corpo, fine corpo)
+        """
+        found = []
+        for index, token in enumerate(self.tokens):
+            if token.type == 'name' and token.value == 'function':
+                start = index - 1 if self.is_token(index - 1, 'async', 'name') else index
+                function = self.function_at(start, len(self.tokens))
+            elif token.value == '=>' and index > 0:
+                start = index - 1
+                if self.is_token(start, ')') and start in self.pairs:
+                    start = self.pairs[start]
+                if self.is_token(start - 1, 'async', 'name'):
+                    start -= 1
+                function = self.function_at(start, self._expression_end(index + 1))
+            elif (token.type == 'name' and token.value not in METHOD_EXCLUDED and
+                    not self.is_token(index - 1, '.') and not self.is_token(index - 1, 'function') and
+                    self.is_token(index + 1, '(') and index + 1 in self.pairs and
+                    self.is_token(self.pairs[index + 1] + 1, '{')):
+                # Metodo abbreviato di oggetto o classe: name(...) { ... }
+                start = index
+                params_close = self.pairs[index + 1]
+                body_open = params_close + 1
+                function = (self._param_names(index + 2, params_close), body_open + 1,
+                            self.pairs.get(body_open, len(self.tokens)))
+            else:
+                continue
+            if function:
+                found.append((start,) + function)
+        return sorted(found)
+
+    def top_level_declarations(self):
+        """Nomi dichiarati a livello di file (function, class, const, let, var)"""
+        names = set()
+        for index, token in enumerate(self.tokens):
+            if self.depth[index] != 0 or token.type != 'name':
+                continue
+            if token.value in ('function', 'class', 'const', 'let', 'var'):
+                following = index + 1
+                if self.is_token(following, '*'):
+                    following += 1
+                if following < len(self.tokens) and self.tokens[following].type == 'name':
+                    names.add(self.tokens[following].value)
+        return names
+
+    def contains_name(self, start, end, name):
+        return any(token.type == 'name' and token.value == name for token in self.tokens[start:end])
+
+    # --- Modifiche ---
+
+    def replace(self, start, end, new_text):
+        """Sostituisce il testo tra due offset del sorgente originale"""
+        self._edits.append((start, end, len(self._edits), new_text))
+
+    def insert(self, pos, new_text):
+        self.replace(pos, pos, new_text)
+
+    @property
+    def changed(self):
+        return bool(self._edits)
+
+    def render(self):
+        """Applica le modifiche in ordine di offset (sovrapposizioni = errore)"""
+        parts = []
+        pos = 0
+        for start, end, _, new_text in sorted(self._edits):
+            if start < pos:
+                raise ValueError(f'modifiche sovrapposte vicino all\'offset {start}')
+            parts.append(self.source[pos:start])
+            parts.append(new_text)
+            pos = end
+        parts.append(self.source[pos:])
+        return ''.join(parts)
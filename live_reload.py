@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supporto per la modalità --watch di server.py
+Osserva la cartella del sito (inotify su Linux, altrimenti polling), rigenera
+solo gli artefatti interessati con le funzioni di minify esistenti, invalida la
+cache del server per quei file e notifica i browser aperti tramite SSE
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import select
+import struct
+import hashlib
+import threading
+import ctypes
+import ctypes.util
+
+import minify_css
+import minify_js
+import image_manifest
+
+# Sorgente -> (artefatto generato, funzione che lo produce)
+REBUILD_RULES = {
+    'styles.css': ('styles.min.css', minify_css.minify_css),
+    'script.js': ('script.min.js', minify_js.minify_js),
+}
+
+# Endpoint riservati al live reload
+EVENTS_PATH = '/__livereload'
+CLIENT_PATH = '/__livereload.js'
+
+# Attesa dopo il primo evento per raccogliere le scritture dello stesso salvataggio
+DEBOUNCE_SECONDS = 0.03
+POLL_INTERVAL = 0.05
+HEARTBEAT_SECONDS = 15
+
+IGNORED_DIRS = image_manifest.EXCLUDED_DIRS | {'icons_backup'}
+IGNORED_FILES = {'.build-state.json', image_manifest.MANIFEST_FILE}
+IGNORED_SUFFIXES = ('~', '.swp', '.swx', '.tmp', '.pyc')
+
+# Script esterno (non inline) così resta compatibile con script-src 'self'.
+# Se sono cambiati solo fogli di stile li ricarica senza ricaricare la pagina
+CLIENT_JS = """(function () {
+  var source = new EventSource('%s');
+  source.addEventListener('reload', function (event) {
+    var files = JSON.parse(event.data).files;
+    var cssOnly = files.every(function (file) { return /\\.css$/.test(file); });
+    if (!cssOnly) {
+      location.reload();
+      return;
+    }
+    document.querySelectorAll('link[rel="stylesheet"]').forEach(function (link) {
+      var url = new URL(link.href);
+      url.searchParams.set('livereload', Date.now());
+      link.href = url.href;
+    });
+  });
+})();
+""" % EVENTS_PATH
+
+CLIENT_TAG = f'<script src="{CLIENT_PATH}" defer></script>'.encode('utf-8')
+
+
+def is_ignored(rel_path):
+    parts = rel_path.split('/')
+    if any(part in IGNORED_DIRS or part.startswith('.') for part in parts[:-1]):
+        return True
+    name = parts[-1]
+    return name in IGNORED_FILES or name.startswith('.') or name.endswith(IGNORED_SUFFIXES)
+
+
+def inject_client(body):
+    """Aggiunge lo script di live reload prima di </body> (o in fondo alla pagina)"""
+    index = body.lower().rfind(b'</body>')
+    if index == -1:
+        return body + CLIENT_TAG
+    return body[:index] + CLIENT_TAG + body[index:]
+
+
+class FileCache:
+    """
+    Contenuto dei file servito dalla memoria. In modalità watch le voci restano
+    valide finché il watcher non invalida esattamente i file modificati;
+    all'avvio si può precaricare con i file più richiesti dall'access log
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, loader):
+        return self.lookup(path, loader)[0]
+
+    def lookup(self, path, loader):
+        """Restituisce (voce, True se era già in cache)"""
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None:
+            return entry, True
+        entry = loader(path)
+        with self._lock:
+            self._entries[path] = entry
+        return entry, False
+
+    def warm(self, paths, loader):
+        """Carica in anticipo i file indicati; restituisce quanti sono stati caricati"""
+        loaded = 0
+        for path in paths:
+            if os.path.isfile(path):
+                self.get(path, loader)
+                loaded += 1
+        return loaded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, paths):
+        with self._lock:
+            for path in paths:
+                self._entries.pop(path, None)
+
+
+class ReloadHub:
+    """Client SSE collegati: ogni browser ha la sua coda di messaggi"""
+
+    def __init__(self):
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        client = queue.Queue()
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def broadcast(self, files):
+        message = f"event: reload\ndata: {json.dumps({'files': sorted(files)})}\n\n"
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.put(message)
+        return len(clients)
+
+    def stream(self, wfile):
+        """Invia gli eventi a un client finché la connessione resta aperta"""
+        client = self.subscribe()
+        try:
+            wfile.write(b'retry: 500\n\n')
+            wfile.flush()
+            while True:
+                try:
+                    message = client.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    message = ': ping\n\n'
+                wfile.write(message.encode('utf-8'))
+                wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            self.unsubscribe(client)
+
+
+class PollingWatcher:
+    """Confronta periodicamente mtime e dimensione dei file del sito"""
+
+    def __init__(self, root):
+        self.root = root
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                if is_ignored(rel_path):
+                    continue
+                try:
+                    stat = os.stat(full_path)
+                except FileNotFoundError:
+                    continue
+                snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self):
+        """Blocca finché qualcosa cambia; restituisce i percorsi modificati"""
+        while True:
+            time.sleep(POLL_INTERVAL)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+
+
+class InotifyWatcher:
+    """Notifiche del kernel Linux via ctypes (nessuna dipendenza esterna)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError('inotify non disponibile')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 fallita')
+        self._dirs = {}
+        self.overflowed = False
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS and not d.startswith('.')]
+            self._add_watch(dirpath)
+
+    def _add_watch(self, dirpath):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch fallita per {dirpath}')
+        self._dirs[wd] = os.path.relpath(dirpath, self.root).replace(os.sep, '/')
+
+    def _read_events(self):
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                # Eventi persi: il ciclo del watcher tratterà tutto come modificato
+                self.overflowed = True
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            rel_path = name if directory == '.' else f'{directory}/{name}'
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not is_ignored(rel_path + '/x'):
+                    self._add_watch(os.path.join(self.root, rel_path))
+                continue
+            if not is_ignored(rel_path):
+                changed.add(rel_path)
+        return changed
+
+    def wait(self):
+        """Come PollingWatcher.wait; None se il kernel ha perso degli eventi"""
+        while True:
+            select.select([self._fd], [], [])
+            changed = self._read_events()
+            # Un salvataggio può generare più eventi (scrittura, rename): raccoglili tutti
+            deadline = time.monotonic() + DEBOUNCE_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                    break
+                changed |= self._read_events()
+            if self.overflowed:
+                self.overflowed = False
+                return None
+            if changed:
+                return changed
+
+
+def create_watcher(root):
+    try:
+        return InotifyWatcher(root), 'inotify'
+    except (OSError, AttributeError):
+        return PollingWatcher(root), 'polling'
+
+
+class SiteWatcher(threading.Thread):
+    """
+    Ciclo del watcher: ricostruisce gli artefatti, invalida la cache e notifica i browser
+    """
+
+    def __init__(self, root, cache, hub, log=print):
+        super().__init__(daemon=True)
+        self.root = os.path.abspath(root)
+        self.cache = cache
+        self.hub = hub
+        self.log = log
+        self.watcher, self.mode = create_watcher(self.root)
+        # Artefatti scritti da noi: l'evento che generano non va notificato due volte
+        self._written = {}
+
+    def _digest(self, rel_path):
+        try:
+            with open(os.path.join(self.root, rel_path), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def rebuild(self, source):
+        """Rigenera l'artefatto di un sorgente; restituisce il percorso se è cambiato"""
+        target, function = REBUILD_RULES[source]
+        with open(os.path.join(self.root, source), 'r', encoding='utf-8') as f:
+            output = function(f.read())
+        data = output.encode('utf-8')
+        target_path = os.path.join(self.root, target)
+        if os.path.exists(target_path):
+            with open(target_path, 'rb') as f:
+                if f.read() == data:
+                    return None
+        with open(target_path, 'wb') as f:
+            f.write(data)
+        self._written[target] = hashlib.sha256(data).hexdigest()
+        return target
+
+    def handle_changes(self, changed):
+        start = time.perf_counter()
+        if changed is None:
+            # Coda inotify piena: rigenera tutto e svuota la cache
+            changed = set(REBUILD_RULES)
+            self.cache.clear()
+        for path in list(changed):
+            expected = self._written.pop(path, None)
+            if expected is not None and expected == self._digest(path):
+                changed.discard(path)
+        if not changed:
+            return
+
+        rebuilt = set()
+        for path in sorted(changed):
+            if path in REBUILD_RULES and os.path.exists(os.path.join(self.root, path)):
+                try:
+                    target = self.rebuild(path)
+                except Exception as e:
+                    self.log(f"❌ Errore rigenerando da {path}: {e}")
+                    continue
+                if target:
+                    rebuilt.add(target)
+
+        files = changed | rebuilt
+        self.cache.invalidate(os.path.join(self.root, path) for path in files)
+        clients = self.hub.broadcast('/' + path for path in files)
+        elapsed = (time.perf_counter() - start) * 1000
+        rebuilt_note = f" (rigenerati: {', '.join(sorted(rebuilt))})" if rebuilt else ''
+        self.log(f"🔄 {', '.join(sorted(changed))}{rebuilt_note} → {clients} browser in {elapsed:.0f} ms")
+
+    def run(self):
+        while True:
+            self.handle_changes(self.watcher.wait())
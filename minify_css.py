@@ -7,6 +7,8 @@ Script per minimizzare il CSS rimuovendo commenti, spazi extra e ottimizzando le
 import re
 import os
 
+import instrumentation
+
 def minify_css(css_content):
     """
     Minimizza il contenuto CSS
@@ -61,7 +63,8 @@ def main():
     print(f"📏 Dimensione originale: {original_size:,} bytes ({original_size/1024:.1f} KB)")
     
     # Minimizza il CSS
-    minified_css = minify_css(original_css)
+    with instrumentation.stage('minify', file=input_file):
+        minified_css = minify_css(original_css)
     
     # Salva il file minimizzato
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -88,4 +91,4 @@ def main():
     print("3. Considera l'utilizzo di un CDN per servire il CSS minimizzato")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
@@ -7,6 +7,8 @@ Script per minimizzare il JavaScript rimuovendo commenti, spazi extra e ottimizz
 import re
 import os
 
+import instrumentation
+
 def minify_js(js_content):
     """
     Minimizza il contenuto JavaScript
@@ -88,7 +90,8 @@ def main():
     print(f"📏 Dimensione originale: {original_size:,} bytes ({original_size/1024:.1f} KB)")
     
     # Minimizza il JavaScript
-    minified_js = minify_js(original_js)
+    with instrumentation.stage('minify', file=input_file):
+        minified_js = minify_js(original_js)
     
     # Salva il file minimizzato
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -116,4 +119,4 @@ def main():
     print("\n⚠️  Nota: Testa sempre il codice minimizzato prima del deploy!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
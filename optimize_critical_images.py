@@ -4,8 +4,11 @@ Script per ottimizzare le immagini critiche identificate da Google PageSpeed
 """
 
 import os
-from PIL import Image
 import shutil
+from PIL import Image
+
+import image_resize
+import instrumentation
 
 def optimize_image(input_path, output_path, target_width, target_height, quality=85):
     """
@@ -13,18 +16,18 @@ def optimize_image(input_path, output_path, target_width, target_height, quality
     """
     try:
         with Image.open(input_path) as img:
-            # Converti in RGB se necessario
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
+            # Converti in RGB se necessario (dopo la riduzione, quando possibile)
+            mode = 'RGB' if img.mode in ('RGBA', 'LA', 'P') else None
             
-            # Ridimensiona mantenendo le proporzioni
-            img.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
+            # Ridimensiona mantenendo le proporzioni (draft JPEG + reduce + LANCZOS)
+            img = image_resize.thumbnail(img, (target_width, target_height), mode)
             
             # Salva con compressione ottimizzata
-            if output_path.endswith('.webp'):
-                img.save(output_path, 'WEBP', quality=quality, optimize=True)
-            else:
-                img.save(output_path, 'JPEG', quality=quality, optimize=True)
+            with instrumentation.stage('encode', file=os.path.basename(output_path)):
+                if output_path.endswith('.webp'):
+                    img.save(output_path, 'WEBP', quality=quality, optimize=True)
+                else:
+                    img.save(output_path, 'JPEG', quality=quality, optimize=True)
             
             print(f"✓ Ottimizzato: {input_path} -> {output_path}")
             return True
@@ -109,4 +112,4 @@ def main():
         print("3. Testa le performance con Google PageSpeed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
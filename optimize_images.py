@@ -6,8 +6,11 @@ Riduce le dimensioni mantenendo una qualità accettabile
 """
 
 import os
-from PIL import Image
 import shutil
+from PIL import Image
+
+import image_resize
+import instrumentation
 
 def optimize_webp_image(input_path, output_path, quality=80, max_width=1200):
     """
@@ -29,15 +32,14 @@ def optimize_webp_image(input_path, output_path, quality=80, max_width=1200):
             print(f"  Dimensioni originali: {original_width}x{original_height}")
             print(f"  Dimensione file originale: {original_size/1024:.1f} KB")
             
-            # Ridimensiona se necessario
+            # Ridimensiona se necessario (pre-riduzione con reduce + LANCZOS finale)
             if original_width > max_width:
-                ratio = max_width / original_width
-                new_height = int(original_height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                print(f"  Ridimensionata a: {max_width}x{new_height}")
+                img = image_resize.resize_to_width(img, max_width)
+                print(f"  Ridimensionata a: {img.size[0]}x{img.size[1]}")
             
             # Salva con compressione ottimizzata
-            img.save(output_path, 'WEBP', quality=quality, optimize=True)
+            with instrumentation.stage('encode', file=os.path.basename(output_path)):
+                img.save(output_path, 'WEBP', quality=quality, optimize=True)
             
             new_size = os.path.getsize(output_path)
             reduction = ((original_size - new_size) / original_size) * 100
@@ -108,4 +110,4 @@ def main():
     print("puoi ripristinare i backup dalla cartella icons_backup.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
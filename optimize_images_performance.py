@@ -6,8 +6,11 @@ Riduce le dimensioni delle immagini alle dimensioni effettivamente utilizzate
 """
 
 import os
-from PIL import Image
 import sys
+from PIL import Image
+
+import image_resize
+import instrumentation
 
 def optimize_image(input_path, output_path, target_width, target_height, quality=85):
     """
@@ -15,15 +18,15 @@ def optimize_image(input_path, output_path, target_width, target_height, quality
     """
     try:
         with Image.open(input_path) as img:
-            # Converti in RGB se necessario
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
+            # Converti in RGB se necessario (dopo la riduzione, quando possibile)
+            mode = 'RGB' if img.mode in ('RGBA', 'LA', 'P') else None
             
-            # Ridimensiona mantenendo le proporzioni
-            img.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
+            # Ridimensiona mantenendo le proporzioni (draft JPEG + reduce + LANCZOS)
+            img = image_resize.thumbnail(img, (target_width, target_height), mode)
             
             # Salva con compressione ottimizzata
-            img.save(output_path, 'WEBP', quality=quality, optimize=True)
+            with instrumentation.stage('encode', file=os.path.basename(output_path)):
+                img.save(output_path, 'WEBP', quality=quality, optimize=True)
             
             # Calcola la riduzione
             original_size = os.path.getsize(input_path)
@@ -113,4 +116,4 @@ def main():
     print("3. Esegui nuovamente PageSpeed Insights per verificare i miglioramenti")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    instrumentation.run(main)
\ No newline at end of file
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per deduplicare i dati strutturati JSON-LD tra le pagine
+I blocchi ld+json scritti a mano ripetono per intero gli stessi oggetti
+annidati (venditore, publisher, offerte...). Le entità strutturalmente
+identiche ricevono un @id stabile a livello di sito (<sito>/#<tipo>-<hash>):
+in ogni pagina la prima occorrenza resta la definizione completa, le altre
+diventano riferimenti {"@id": ...}. Un crawler legge una pagina alla volta,
+quindi ogni riferimento deve risolversi nei blocchi della pagina stessa.
+Le Organization anonime con il nome (o un nome alternativo) di
+/#organization del grafo compilato sono l'azienda: ricevono quell'@id,
+così si collegano all'entità completa.
+Un @id generato viene usato solo se fa risparmiare almeno MIN_SAVED_BYTES
+senza aumentare i byte gzip delle pagine. A ogni esecuzione riferimenti e
+@id aggiunti in precedenza vengono risolti e il piano ricalcolato da capo.
+Prima di salvare verifica che ogni riferimento sia definito nella sua pagina
+e che risolvendoli ogni pagina descriva esattamente lo stesso grafo di
+partenza; riporta il risparmio per pagina in byte grezzi e gzip. Il blocco
+compilato da compile_structured_data.py non viene toccato (è rigenerato a
+ogni build)
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import hashlib
+import argparse
+
+import html_document
+import compile_structured_data
+import instrumentation
+
+SITE_URL = 'https://www.fbtotalsecurity.com/'
+SITE_ORGANIZATION_ID = SITE_URL + '#organization'
+MIN_SAVED_BYTES = 32
+
+# Valori che hanno senso solo nella posizione in cui compaiono (un elemento
+# di breadcrumb, un indirizzo, un prezzo): non diventano mai riferimenti
+STRUCTURAL_TYPES = ('ListItem', 'PostalAddress', 'GeoCoordinates', 'PriceSpecification',
+                    'UnitPriceSpecification', 'QuantitativeValue', 'PropertyValue',
+                    'OpeningHoursSpecification')
+
+MINTED_ID_PATTERN = re.compile(r'#[a-z]+-[0-9a-f]{8}$')
+
+HTML_FILES = compile_structured_data.HTML_FILES
+
+canonical = compile_structured_data.canonical
+
+def minify(data):
+    """JSON minificato, sicuro dentro <script> (niente '</' letterale)"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+def organization_names():
+    """Nome e nomi alternativi di /#organization nel grafo compilato"""
+    sources = [source for source in compile_structured_data.SOURCES if os.path.exists(source)]
+    graph, _, _ = compile_structured_data.compile_graph(sources)
+    for entity in graph:
+        if entity.get('@id') == SITE_ORGANIZATION_ID:
+            names = [entity.get('name')] + compile_structured_data.as_list(entity.get('alternateName', []))
+            return {name for name in names if isinstance(name, str)}
+    return set()
+
+def is_added_id(entity_id):
+    """@id assegnati da questo script (generati o quello dell'azienda)"""
+    return isinstance(entity_id, str) and \
+        (MINTED_ID_PATTERN.search(entity_id) is not None or entity_id == SITE_ORGANIZATION_ID)
+
+def is_candidate(value):
+    """Entità annidata anonima che può diventare un riferimento"""
+    return isinstance(value, dict) and '@id' not in value and \
+        bool(compile_structured_data.types_of(value)) and \
+        not any(entity_type in STRUCTURAL_TYPES for entity_type in compile_structured_data.types_of(value))
+
+def nested_entities(value, top=True):
+    """Entità annidate (non quelle di primo livello del blocco), in ordine di documento"""
+    if isinstance(value, dict):
+        if not top and '@type' in value:
+            yield value
+        for key, child in value.items():
+            if key != '@graph':
+                yield from nested_entities(child, False)
+            else:
+                for entity in child:
+                    yield from nested_entities(entity, True)
+    elif isinstance(value, list):
+        for child in value:
+            yield from nested_entities(child, top)
+
+def minted_id(entity):
+    entity_type = compile_structured_data.types_of(entity)[0].lower()
+    digest = hashlib.sha256(canonical(entity).encode('utf-8')).hexdigest()[:8]
+    return f"{SITE_URL}#{entity_type}-{digest}"
+
+def with_id(entity, entity_id):
+    """Copia dell'entità con @id subito dopo @type"""
+    result = {}
+    for key, value in entity.items():
+        result[key] = value
+        if key == '@type':
+            result['@id'] = entity_id
+    return result
+
+def replace_entities(value, targets, definitions, top=True):
+    """
+    Sostituisce le entità annidate la cui forma canonica è in `targets`
+    ({canonica: @id}): la prima volta che un @id non ancora definito compare
+    diventa la definizione completa, le altre un riferimento
+    """
+    if isinstance(value, list):
+        return [replace_entities(child, targets, definitions, top) for child in value]
+    if not isinstance(value, dict):
+        return value
+    entity_id = targets.get(canonical(value)) if not top and is_candidate(value) else None
+    if entity_id is not None and entity_id in definitions:
+        return {'@id': entity_id}
+    result = {key: replace_entities(child, targets, definitions, top=(key == '@graph'))
+              for key, child in value.items()}
+    if entity_id is not None:
+        definitions.add(entity_id)
+        return with_id(result, entity_id)
+    return result
+
+def references(value):
+    """@id dei riferimenti {"@id": ...} contenuti nel valore"""
+    if isinstance(value, dict):
+        if set(value) == {'@id'}:
+            yield value['@id']
+        for child in value.values():
+            yield from references(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from references(child)
+
+def defined_entities(values):
+    """{@id: definizione} delle entità con un @id aggiunto da questo script"""
+    return {entity['@id']: entity for value in values for entity in nested_entities(value)
+            if is_added_id(entity.get('@id')) and len(entity) > 1}
+
+def resolve(value, definitions):
+    """Grafo con i riferimenti sostituiti dalle definizioni e senza gli @id aggiunti"""
+    if isinstance(value, list):
+        return [resolve(child, definitions) for child in value]
+    if not isinstance(value, dict):
+        return value
+    if set(value) == {'@id'}:
+        return resolve(definitions[value['@id']], definitions) if value['@id'] in definitions else value
+    return {key: resolve(child, definitions) for key, child in value.items()
+            if not (key == '@id' and is_added_id(child))}
+
+class Page:
+    """Blocchi ld+json modificabili di una pagina"""
+
+    def __init__(self, file_path):
+        self.path = file_path
+        self.doc = html_document.load(file_path)
+        self.blocks = []
+        # Impostati da expand(): i blocchi come scritti a mano e la variante
+        # di Organization che nella pagina riceve l'@id dell'azienda
+        self.original = []
+        self.linked = {}
+        for script in self.doc.find_all('script', type='application/ld+json'):
+            if script.get('id') in compile_structured_data.MANAGED_BLOCK_IDS:
+                continue
+            try:
+                self.blocks.append((script, json.loads(self.doc.inner_text(script))))
+            except ValueError as e:
+                print(f"   ⚠️  {file_path}: blocco JSON-LD non valido ignorato ({e})")
+
+def expand(pages, names):
+    """
+    Ricostruisce i blocchi come scritti a mano risolvendo i riferimenti e gli
+    @id aggiunti dalle esecuzioni precedenti (comprese le versioni che
+    definivano un'entità in una sola pagina e la referenziavano dalle altre),
+    e sceglie per ogni pagina la prima Organization anonima che è l'azienda
+    """
+    shared = defined_entities(data for page in pages for _, data in page.blocks)
+    for page in pages:
+        definitions = dict(shared)
+        definitions.update(defined_entities(data for _, data in page.blocks))
+        page.original = [resolve(data, definitions) for _, data in page.blocks]
+        page.linked = {}
+        for data in page.original:
+            for entity in nested_entities(data):
+                if not page.linked and is_candidate(entity) and entity.get('name') in names and \
+                        'Organization' in compile_structured_data.types_of(entity):
+                    page.linked[canonical(entity)] = SITE_ORGANIZATION_ID
+
+def plan(pages):
+    """Sceglie le entità da deduplicare. Restituisce {canonica: @id}"""
+    targets = {}
+    occurrences = {}
+    linked = {key for page in pages for key in page.linked}
+    for page in pages:
+        for data in page.original:
+            for entity in nested_entities(data):
+                key = canonical(entity)
+                if is_candidate(entity) and key not in linked:
+                    occurrences[key] = occurrences.get(key, 0) + 1
+
+    # Le entità più grandi per prime: quelle annidate dentro una copia sostituita spariscono con lei.
+    # gzip comprime già le ripetizioni nella stessa pagina, quindi un riferimento
+    # resta solo se riduce i byte grezzi senza far crescere le risposte compresse
+    current = measure(pages, targets)
+    for key in sorted(occurrences, key=len, reverse=True):
+        if occurrences[key] < 2:
+            continue
+        trial = dict(targets)
+        trial[key] = minted_id(json.loads(key))
+        sizes = measure(pages, trial)
+        if current[0] - sizes[0] >= MIN_SAVED_BYTES and sizes[1] <= current[1]:
+            targets, current = trial, sizes
+    return targets
+
+def measure(pages, targets):
+    """Byte grezzi e gzip delle pagine con i riferimenti applicati e i blocchi minificati"""
+    result, _ = optimize(pages, targets)
+    raw = compressed = 0
+    for page in pages:
+        doc = html_document.HTMLDocument(page.doc.text, page.path)
+        for index, (script, _) in enumerate(page.blocks):
+            doc.replace(*script.inner_span, minify(result[(page.path, index)]))
+        text = doc.render()
+        raw += len(text.encode('utf-8'))
+        compressed += gzip_size(text)
+    return raw, compressed
+
+def optimize(pages, targets):
+    """
+    Nuovi dati per ogni blocco: {(pagina, indice): dati}, più le definizioni
+    di ogni pagina ({pagina: {@id: definizione}}). Le definizioni ripartono da
+    zero in ogni pagina: la prima occorrenza nella pagina è quella completa
+    """
+    result = {}
+    definitions = {}
+    for page in pages:
+        page_targets = dict(targets, **page.linked)
+        defined = set()
+        for index, data in enumerate(page.original):
+            result[(page.path, index)] = replace_entities(data, page_targets, defined)
+        definitions[page.path] = defined_entities(result[(page.path, index)]
+                                                  for index in range(len(page.original)))
+    return result, definitions
+
+def verify(pages, result, definitions):
+    """
+    Controlla che ogni riferimento aggiunto sia definito nella sua pagina e
+    che ogni blocco, risolti i riferimenti, sia identico all'originale
+    """
+    errors = []
+    for page in pages:
+        own = definitions[page.path]
+        for index, data in enumerate(page.original):
+            new_data = result[(page.path, index)]
+            for entity_id in sorted(set(references(new_data))):
+                if is_added_id(entity_id) and entity_id not in own:
+                    errors.append(f"{page.path}: riferimento senza definizione nella pagina: {entity_id}")
+            if canonical(resolve(new_data, own)) != canonical(data):
+                errors.append(f"{page.path}: il blocco JSON-LD {index + 1} non è equivalente all'originale")
+    return errors
+
+def gzip_size(text):
+    return len(gzip.compress(text.encode('utf-8'), compresslevel=9, mtime=0))
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplica le entità JSON-LD ripetute tra le pagine',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da processare')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("🧬 Deduplicazione dati strutturati JSON-LD")
+    print("=" * 50)
+
+    pages = []
+    for html_file in args.files:
+        if os.path.exists(html_file):
+            pages.append(Page(html_file))
+        else:
+            print(f"⚠️  File non trovato: {html_file}")
+
+    expand(pages, organization_names())
+    targets = plan(pages)
+    result, definitions = optimize(pages, targets)
+    errors = verify(pages, result, definitions)
+    if errors:
+        for error in errors:
+            print(f"   ❌ {error}")
+        print(f"\n❌ Il grafo deduplicato non è equivalente: nessuna pagina modificata")
+        sys.exit(1)
+
+    shared = {}
+    for path, page_definitions in definitions.items():
+        for entity_id, entity in page_definitions.items():
+            shared.setdefault(entity_id, (compile_structured_data.types_of(entity)[0], []))[1].append(path)
+    for entity_id, (entity_type, paths) in sorted(shared.items()):
+        print(f"🔗 {entity_id} ({entity_type}): {', '.join(paths)}")
+
+    total_changes = 0
+    totals = {'dedup': [0, 0], 'minify': [0, 0]}
+    for page in pages:
+        print(f"\n📄 Processando: {page.path}")
+        changes_made = []
+        # Stessa pagina con i blocchi modificati solo minificati: separa il
+        # risparmio dovuto ai riferimenti da quello della minificazione
+        minified = html_document.HTMLDocument(page.doc.text, page.path)
+        for index, (script, data) in enumerate(page.blocks):
+            new_data = result[(page.path, index)]
+            if canonical(new_data) == canonical(data):
+                continue
+            ids = [entity['@id'] for entity in nested_entities(new_data)
+                   if entity.get('@id') in definitions[page.path] and len(entity) > 1]
+            refs = [entity_id for entity_id in references(new_data) if entity_id in definitions[page.path]]
+            block_type = (compile_structured_data.types_of(data) or ['JSON-LD'])[0]
+            page.doc.replace(*script.inner_span, minify(new_data))
+            minified.replace(*script.inner_span, minify(data))
+            changes_made.append(f"Blocco {block_type}: {len(ids)} definizioni, {len(refs)} riferimenti @id")
+
+        if changes_made:
+            original, compact, optimized = page.doc.text, minified.render(), page.doc.render()
+            savings = {
+                'minify': (len(original.encode('utf-8')) - len(compact.encode('utf-8')),
+                           gzip_size(original) - gzip_size(compact)),
+                'dedup': (len(compact.encode('utf-8')) - len(optimized.encode('utf-8')),
+                          gzip_size(compact) - gzip_size(optimized)),
+            }
+            for kind, (raw, compressed) in savings.items():
+                totals[kind][0] += raw
+                totals[kind][1] += compressed
+            if not args.dry_run:
+                page.doc.save()
+            print(f"{'🔍 Modifiche previste' if args.dry_run else '✅ Modifiche applicate'}: {len(changes_made)}")
+            for change in changes_made:
+                print(f"   • {change}")
+            print(f"   📉 Riferimenti @id: {savings['dedup'][0]} byte ({savings['dedup'][1]} byte gzip), "
+                  f"minificazione: {savings['minify'][0]} byte ({savings['minify'][1]} byte gzip)")
+        else:
+            print("ℹ️  Nessuna modifica necessaria")
+        total_changes += len(changes_made)
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File processati: {len(pages)}/{len(args.files)}")
+    print(f"🔧 Modifiche totali: {total_changes}")
+    print(f"🔗 Entità con @id: {len(shared)}")
+    print(f"📉 Risparmio riferimenti @id: {totals['dedup'][0]} byte ({totals['dedup'][1]} byte gzip)")
+    print(f"📉 Risparmio minificazione: {totals['minify'][0]} byte ({totals['minify'][1]} byte gzip)")
+    print("✅ Grafo verificato: equivalente all'originale una volta risolti i riferimenti")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
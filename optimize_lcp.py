@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per assegnare fetchpriority e loading alle immagini in base alla piega
+Stima la posizione verticale di testi e immagini dall'ordine del DOM e dalle
+dimensioni del manifest (viewport mobile e desktop), individua il probabile
+elemento LCP e imposta:
+  - fetchpriority="high" + decoding="async" (senza lazy) sull'immagine LCP
+  - loading="lazy" su tutte le immagini sotto la piega
+Le immagini precaricate con <link rel="preload"> non vengono rese lazy; il
+controllo dei preload lazy è in check_budgets.py, dopo la riscrittura dei hint
+"""
+
+import os
+import re
+import html
+import math
+import argparse
+
+import html_document
+import image_manifest
+import instrumentation
+
+# Viewport usati da PageSpeed Insights (mobile: Moto G Power, desktop)
+VIEWPORTS = {'mobile': (412, 823), 'desktop': (1350, 940)}
+
+# Spazio occupato dall'header fisso (padding-top del body nel CSS critico)
+HEADER_OFFSET = 110
+MAX_CONTENT_WIDTH = 1200
+PAGE_PADDING = 16
+SECTION_PADDING = 64
+IMAGE_GAP = 16
+
+# Blocchi di testo: (dimensione font in px, interlinea)
+TEXT_STYLES = {
+    'h1': (32, 1.2), 'h2': (28, 1.3), 'h3': (22, 1.3), 'h4': (18, 1.4),
+    'p': (16, 1.6), 'li': (16, 1.6), 'blockquote': (16, 1.6), 'figcaption': (14, 1.5),
+}
+CHAR_WIDTH_RATIO = 0.5
+
+# Contenitori fuori dal flusso principale: non spostano il contenuto della pagina
+FIXED_CONTAINERS = ('header', 'nav')
+SKIPPED_CONTAINERS = ('noscript', 'template')
+
+HTML_FILES = [
+    'index.html',
+    'sorveglianza.html',
+    'allarmi.html',
+    'serramenti.html',
+    'nebbiogeni.html',
+    'chi-siamo.html',
+    'lavora-con-noi.html',
+    'termini-condizioni.html'
+]
+
+def _is_hidden(node):
+    for element in (node,) + tuple(node.ancestors()):
+        if element.has('hidden') or 'display:none' in element.get('style', '').replace(' ', '').lower():
+            return True
+    return False
+
+def _plain_text(doc, node):
+    text = re.sub(r'<[^>]+>', ' ', doc.inner_text(node))
+    return ' '.join(html.unescape(text).split())
+
+def _length(value):
+    match = re.match(r'\s*(\d+(?:\.\d+)?)\s*(px)?\s*$', value or '')
+    return float(match.group(1)) if match else None
+
+def image_size(img, manifest):
+    """Dimensioni dichiarate (attributi) o intrinseche (manifest) di un'immagine"""
+    width, height = _length(img.get('width')), _length(img.get('height'))
+    entry = image_manifest.lookup(manifest, img.get('src', '')) if img.get('src') else None
+    if entry and (width is None or height is None):
+        if width is None and height is None:
+            width, height = entry['width'], entry['height']
+        elif width is None:
+            width = height * entry['width'] / entry['height']
+        else:
+            height = width * entry['height'] / entry['width']
+    if width is None or height is None:
+        return None
+    return width, height
+
+class LayoutItem:
+    """Testo o immagine con la posizione stimata (in px CSS) in un viewport"""
+
+    __slots__ = ('node', 'kind', 'y', 'width', 'height')
+
+    def __init__(self, node, kind, y, width, height):
+        self.node = node
+        self.kind = kind
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def visible_area(self, fold):
+        return self.width * max(0, min(self.y + self.height, fold) - self.y)
+
+def estimate_layout(doc, manifest, viewport):
+    """
+    Layout a blocchi semplificato: testi uno sotto l'altro, immagini affiancate
+    finché stanno nella larghezza del contenuto. Restituisce la lista di LayoutItem
+    """
+    viewport_width, _ = viewport
+    content_width = min(viewport_width, MAX_CONTENT_WIDTH) - 2 * PAGE_PADDING
+    items = []
+    y = HEADER_OFFSET
+    row_x = row_height = 0
+
+    body = doc.find('body')
+    for node in doc.nodes:
+        if body is None or node.start < body.end or node.tag == html_document.COMMENT:
+            continue
+        ancestors = [ancestor.tag for ancestor in node.ancestors()]
+        if any(tag in SKIPPED_CONTAINERS for tag in ancestors) or node.tag in SKIPPED_CONTAINERS:
+            continue
+        fixed = any(tag in FIXED_CONTAINERS for tag in ancestors)
+
+        if node.tag == 'section' and not fixed:
+            y += row_height + SECTION_PADDING
+            row_x = row_height = 0
+        elif node.tag in TEXT_STYLES and not fixed and not any(tag in TEXT_STYLES for tag in ancestors):
+            text = _plain_text(doc, node)
+            if not text or _is_hidden(node):
+                continue
+            font_size, line_height = TEXT_STYLES[node.tag]
+            text_width = len(text) * font_size * CHAR_WIDTH_RATIO
+            lines = max(1, math.ceil(text_width / content_width))
+            height = lines * font_size * line_height
+            y += row_height
+            row_x = row_height = 0
+            items.append(LayoutItem(node, 'text', y, min(text_width, content_width), height))
+            y += height + font_size
+        elif node.tag == 'img':
+            if _is_hidden(node):
+                continue
+            size = image_size(node, manifest)
+            if size is None:
+                continue
+            width, height = size
+            if width > content_width:
+                width, height = content_width, height * content_width / width
+            if fixed:
+                items.append(LayoutItem(node, 'image', 0, width, height))
+                continue
+            if row_x and row_x + width > content_width:
+                y += row_height
+                row_x = row_height = 0
+            items.append(LayoutItem(node, 'image', y, width, height))
+            row_x += width + IMAGE_GAP
+            row_height = max(row_height, height + IMAGE_GAP)
+    return items
+
+def find_lcp(items, fold):
+    """Elemento con la maggiore area visibile sopra la piega (a parità vince il primo)"""
+    best = None
+    for item in items:
+        if item.y < fold and (best is None or item.visible_area(fold) > best.visible_area(fold)):
+            best = item
+    return best
+
+def analyze_page(doc, manifest):
+    """
+    Restituisce (LCP stimato su mobile, id dei nodi immagine sopra la piega in
+    almeno un viewport, immagini analizzate)
+    """
+    above_fold = set()
+    images = {}
+    lcp = None
+    for name, viewport in VIEWPORTS.items():
+        items = estimate_layout(doc, manifest, viewport)
+        fold = viewport[1]
+        for item in items:
+            if item.kind == 'image':
+                images[id(item.node)] = item.node
+                if item.y < fold:
+                    above_fold.add(id(item.node))
+        if name == 'mobile':
+            lcp = find_lcp(items, fold)
+    return lcp, above_fold, list(images.values())
+
+def find_lcp_image(doc, manifest=None):
+    """Immagine LCP stimata della pagina, o None se l'LCP è un blocco di testo"""
+    if manifest is None:
+        manifest = image_manifest.load_manifest(os.path.dirname(doc.path or '') or '.')
+    lcp, _, _ = analyze_page(doc, manifest)
+    return lcp.node if lcp is not None and lcp.kind == 'image' else None
+
+def preloaded_images(doc):
+    """URL delle immagini precaricate (href e candidati di imagesrcset)"""
+    urls = set()
+    for link in doc.find_all('link', rel='preload', as_='image'):
+        urls.add(image_manifest.normalize_src(link.get('href', '')))
+        for candidate in link.get('imagesrcset', '').split(','):
+            if candidate.strip():
+                urls.add(image_manifest.normalize_src(candidate.split()[0]))
+    urls.discard(None)
+    return urls
+
+def image_urls(img):
+    urls = {image_manifest.normalize_src(img.get('src', ''))}
+    for candidate in img.get('srcset', '').split(','):
+        if candidate.strip():
+            urls.add(image_manifest.normalize_src(candidate.split()[0]))
+    urls.discard(None)
+    return urls
+
+def lazy_preloads(doc):
+    """Immagini lazy che la pagina precarica: il preload le scarica comunque, in anticipo"""
+    preloaded = preloaded_images(doc)
+    return [img.get('src') for img in doc.find_all('img')
+            if img.get('loading', '').lower() == 'lazy' and image_urls(img) & preloaded]
+
+def apply_priorities(doc, manifest):
+    """
+    Imposta fetchpriority/decoding/loading; restituisce (modifiche, LCP stimato)
+    """
+    changes_made = []
+    lcp, above_fold, images = analyze_page(doc, manifest)
+    lcp_image = lcp.node if lcp is not None and lcp.kind == 'image' else None
+    preloaded = preloaded_images(doc)
+
+    for img in images:
+        name = os.path.basename(img.get('src', ''))
+        loading = img.get('loading', '').lower()
+        is_preloaded = bool(image_urls(img) & preloaded)
+
+        if img is lcp_image:
+            if img.get('fetchpriority') != 'high':
+                doc.set_attribute(img, 'fetchpriority', 'high')
+                changes_made.append(f"fetchpriority=\"high\" su {name} (LCP)")
+            if img.get('decoding') != 'async':
+                doc.set_attribute(img, 'decoding', 'async')
+                changes_made.append(f"decoding=\"async\" su {name} (LCP)")
+            if loading == 'lazy':
+                doc.remove_attribute(img, 'loading')
+                changes_made.append(f"Rimosso loading=\"lazy\" da {name} (LCP)")
+            continue
+
+        # Una sola immagine ad alta priorità per pagina
+        if img.get('fetchpriority') == 'high':
+            doc.remove_attribute(img, 'fetchpriority')
+            changes_made.append(f"Rimosso fetchpriority=\"high\" da {name}")
+
+        if id(img) in above_fold:
+            if loading == 'lazy':
+                doc.remove_attribute(img, 'loading')
+                changes_made.append(f"Rimosso loading=\"lazy\" da {name} (sopra la piega)")
+        elif loading != 'lazy':
+            if is_preloaded:
+                continue  # Il preload dichiara l'immagine critica: non la rendiamo lazy
+            doc.set_attribute(img, 'loading', 'lazy')
+            changes_made.append(f"loading=\"lazy\" su {name} (sotto la piega)")
+
+    return changes_made, lcp
+
+def describe_lcp(doc, lcp):
+    if lcp is None:
+        return 'nessuno'
+    if lcp.kind == 'image':
+        return f"<img src=\"{lcp.node.get('src')}\"> a {lcp.y:.0f}px"
+    text = _plain_text(doc, lcp.node)
+    return f"<{lcp.node.tag}> \"{text[:50]}{'…' if len(text) > 50 else ''}\" a {lcp.y:.0f}px"
+
+def process_html_file(file_path, manifest, dry_run=False):
+    """
+    Processa una pagina; restituisce il numero di modifiche
+    """
+    print(f"\n📄 Processando: {file_path}")
+
+    doc = html_document.load(file_path)
+    all_changes, lcp = apply_priorities(doc, manifest)
+    print(f"🎯 LCP stimato (mobile): {describe_lcp(doc, lcp)}")
+
+    if all_changes:
+        if not dry_run:
+            doc.save()
+        print(f"{'🔍 Modifiche previste' if dry_run else '✅ Modifiche applicate'}: {len(all_changes)}")
+        for change in all_changes:
+            print(f"   • {change}")
+    else:
+        print("ℹ️  Nessuna modifica necessaria")
+
+    return len(all_changes)
+
+def main():
+    parser = argparse.ArgumentParser(description='Imposta fetchpriority e loading in base alla piega stimata',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da processare')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("🖼️  Priorità immagini: LCP e lazy loading")
+    print("=" * 50)
+
+    manifest = image_manifest.load_manifest('.')
+    total_changes = 0
+    processed_files = 0
+
+    for html_file in args.files:
+        if os.path.exists(html_file):
+            total_changes += process_html_file(html_file, manifest, args.dry_run)
+            processed_files += 1
+        else:
+            print(f"⚠️  File non trovato: {html_file}")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File processati: {processed_files}/{len(args.files)}")
+    print(f"🔧 Modifiche totali: {total_changes}")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
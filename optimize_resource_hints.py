@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per generare e deduplicare i resource hint nel <head> delle pagine
+Calcola per ogni pagina l'insieme minimo di preload/preconnect/dns-prefetch a
+partire dalle risorse critiche reali (immagine LCP, CSS, font effettivamente
+dichiarati da quel CSS) e riscrive i hint rimuovendo duplicati e conflitti
+(es. preload di due versioni diverse dello stesso font). Deduplica anche i
+fogli di stile e gli alternate hreflang ripetuti
+"""
+
+import os
+import re
+import argparse
+from urllib.parse import urlsplit
+
+import html_document
+import optimize_lcp
+import instrumentation
+
+HINT_RELS = ('preload', 'preconnect', 'dns-prefetch')
+
+# Commento che introduce il blocco generato
+HINTS_COMMENT = 'Resource hints generati da optimize_resource_hints.py'
+
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff'}
+IMAGE_TYPES = {'.webp': 'image/webp', '.avif': 'image/avif', '.png': 'image/png',
+               '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.svg': 'image/svg+xml'}
+
+CSS_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+FONT_FACE_PATTERN = re.compile(r'@font-face\s*\{([^}]*)\}', re.IGNORECASE)
+DESCRIPTOR_PATTERN = re.compile(r'([\w-]+)\s*:\s*([^;]+)')
+FONT_URL_PATTERN = re.compile(r'url\(\s*["\']?([^"\')]+\.woff2?)["\']?\s*\)', re.IGNORECASE)
+BACKGROUND_URL_PATTERN = re.compile(r'url\(\s*["\']?([^"\')]+\.(?:webp|avif|png|jpe?g))["\']?\s*\)', re.IGNORECASE)
+FONT_FAMILY_PATTERN = re.compile(r'font-family\s*:\s*([^;}]+)', re.IGNORECASE)
+ORIGIN_PATTERN = re.compile(r'(?:https?:)?//([a-z0-9-]+(?:\.[a-z0-9-]+)+)', re.IGNORECASE)
+SCRIPT_ORIGIN_PATTERN = re.compile(r'https?://([a-z0-9-]+(?:\.[a-z0-9-]+)+)', re.IGNORECASE)
+LOCAL_SCRIPT_PATTERN = re.compile(r'["\']([^"\':\s]+\.js)["\']')
+
+# Host che compaiono negli script come identificatori (namespace, vocabolari), non come risorse
+IDENTIFIER_HOSTS = {'schema.org', 'www.w3.org'}
+
+# Origini contattate dagli script di terze parti stessi (non visibili nei nostri sorgenti)
+THIRD_PARTY_ORIGINS = {
+    'www.googletagmanager.com': ['www.google-analytics.com'],
+    'connect.facebook.net': ['www.facebook.com'],
+}
+
+# Script di terze parti caricati da js/third-party-loader.js entro pochi secondi:
+# meritano un preconnect (senza crossorigin, sono script classici)
+PRECONNECT_ORIGINS = ['www.googletagmanager.com', 'connect.facebook.net']
+
+# Elementi che caricano sottorisorse (gli <a href> sono navigazione, non contano)
+SUBRESOURCE_ATTRIBUTES = {'script': 'src', 'img': 'src', 'iframe': 'src', 'source': 'src',
+                          'video': 'src', 'audio': 'src', 'embed': 'src'}
+
+HTML_FILES = [
+    'index.html',
+    'sorveglianza.html',
+    'allarmi.html',
+    'serramenti.html',
+    'nebbiogeni.html',
+    'chi-siamo.html',
+    'lavora-con-noi.html',
+    'termini-condizioni.html'
+]
+
+def _family(value):
+    return value.strip().strip('"\'').strip().lower()
+
+def in_noscript(node):
+    """Elemento dentro un <noscript> (ignorato dal browser con JavaScript attivo)"""
+    return any(ancestor.tag == 'noscript' for ancestor in node.ancestors())
+
+def _is_local(url):
+    return not urlsplit(url).netloc and not url.startswith(('data:', '#'))
+
+def _local_path(url, base_dir):
+    return os.path.join(base_dir, urlsplit(url).path.lstrip('/'))
+
+def read_text(path):
+    """Contenuto di un file locale, stringa vuota se manca o non è testo"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return ''
+
+def is_async_stylesheet(link):
+    """Foglio di stile caricato senza bloccare il rendering (media=print+onload o preload+onload)"""
+    rel = link.get('rel', '').lower()
+    if rel == 'stylesheet':
+        return link.get('media', '').lower() == 'print' and 'onload' in link.attrs
+    return rel == 'preload' and link.get('as') == 'style' and 'stylesheet' in link.get('onload', '')
+
+def stylesheets(doc):
+    """Link ai fogli di stile della pagina (esclusi quelli dentro <noscript>)"""
+    return [link for link in doc.find_all('link')
+            if not in_noscript(link) and link.get('href') and
+            (link.get('rel', '').lower() == 'stylesheet' or is_async_stylesheet(link))]
+
+def css_sources(doc, base_dir):
+    """CSS della pagina in ordine di documento: <style> inline e fogli di stile locali"""
+    sources = []
+    links = set(id(link) for link in stylesheets(doc))
+    for node in doc.nodes:
+        if node.tag == 'style':
+            sources.append(doc.inner_text(node))
+        elif id(node) in links and _is_local(node.get('href')):
+            sources.append(read_text(_local_path(node.get('href'), base_dir)))
+    return [CSS_COMMENT_PATTERN.sub('', css) for css in sources]
+
+def critical_fonts(css_list):
+    """
+    Font effettivamente usati: per ogni famiglia/peso/stile vale l'ultima regola
+    @font-face dichiarata, come nel browser. Restituisce (url, conflitti)
+    """
+    faces = {}
+    conflicts = []
+    used_families = set()
+    for css in css_list:
+        for match in FONT_FACE_PATTERN.finditer(css):
+            descriptors = {name.lower(): value.strip()
+                           for name, value in DESCRIPTOR_PATTERN.findall(match.group(1))}
+            url = FONT_URL_PATTERN.search(descriptors.get('src', ''))
+            if 'font-family' not in descriptors or not url:
+                continue
+            key = (_family(descriptors['font-family']), descriptors.get('font-weight', '400'),
+                   descriptors.get('font-style', 'normal'))
+            if key in faces and faces[key] != url.group(1):
+                conflicts.append(f"@font-face {key[0]} {key[1]}: {faces[key]} sostituito da {url.group(1)}")
+            faces[key] = url.group(1)
+        for match in FONT_FAMILY_PATTERN.finditer(FONT_FACE_PATTERN.sub('', css)):
+            used_families.update(_family(name) for name in match.group(1).split(','))
+
+    fonts = []
+    for (family, _, _), url in faces.items():
+        if family in used_families and url not in fonts:
+            fonts.append(url)
+    return fonts, conflicts
+
+def find_lcp_image(doc):
+    """
+    Immagine LCP: quella marcata fetchpriority="high" (da optimize_lcp.py o a
+    mano), altrimenti la stima di optimize_lcp se l'LCP è un'immagine
+    """
+    for img in doc.find_all('img'):
+        if img.get('fetchpriority') == 'high' and img.get('src') and not in_noscript(img):
+            return img
+    return optimize_lcp.find_lcp_image(doc)
+
+def critical_background_images(doc):
+    """Immagini di sfondo locali dichiarate nel CSS inline (critico) della pagina"""
+    images = []
+    for style in doc.find_all('style'):
+        css = CSS_COMMENT_PATTERN.sub('', doc.inner_text(style))
+        for url in BACKGROUND_URL_PATTERN.findall(css):
+            if _is_local(url) and url not in images:
+                images.append(url)
+    return images
+
+def script_origins(path, base_dir, visited):
+    """
+    Host citati da uno script locale e dagli script locali che inietta
+    (es. js/third-party-loader.js carica js/facebook-pixel-optimized.js)
+    """
+    if path in visited:
+        return set()
+    visited.add(path)
+    text = read_text(path)
+    origins = set(host.lower() for host in SCRIPT_ORIGIN_PATTERN.findall(text))
+    for url in LOCAL_SCRIPT_PATTERN.findall(text):
+        if _is_local(url):
+            origins |= script_origins(_local_path(url, base_dir), base_dir, visited)
+    return origins
+
+def referenced_origins(doc, base_dir):
+    """Host delle sottorisorse caricate dalla pagina e dagli script locali che include"""
+    origins = set()
+    visited = set()
+    for tag, attribute in SUBRESOURCE_ATTRIBUTES.items():
+        for node in doc.find_all(tag):
+            value = node.get(attribute, '')
+            if in_noscript(node) or not value:
+                continue
+            match = ORIGIN_PATTERN.match(value)
+            if match:
+                origins.add(match.group(1).lower())
+            elif tag == 'script' and _is_local(value):
+                origins |= script_origins(_local_path(value, base_dir), base_dir, visited)
+    for node in doc.find_all('script'):
+        if node.get('type') != 'application/ld+json':
+            origins.update(host.lower() for host in SCRIPT_ORIGIN_PATTERN.findall(doc.inner_text(node)))
+    for host in list(origins):
+        origins.update(THIRD_PARTY_ORIGINS.get(host, []))
+    return origins - IDENTIFIER_HOSTS
+
+def site_origin(doc):
+    canonical = doc.find('link', rel='canonical')
+    return urlsplit(canonical.get('href', '')).netloc.lower() if canonical else ''
+
+def hint_key(link):
+    """Forma normalizzata di un hint, per confrontare quelli presenti con quelli calcolati"""
+    rel = link['rel'] if isinstance(link, dict) else link.get('rel', '').lower()
+    get = link.get
+    href = get('href', '')
+    if rel == 'dns-prefetch':
+        href = '//' + urlsplit(href if '//' in href else '//' + href).netloc
+    return (rel, href, get('as'), get('type'), get('crossorigin') is not None,
+            get('fetchpriority'), get('imagesrcset'))
+
+def compute_hints(doc, base_dir):
+    """Hint ideali della pagina, in ordine: preconnect, preload, dns-prefetch"""
+    warnings = []
+    fonts, conflicts = critical_fonts(css_sources(doc, base_dir))
+    warnings.extend(conflicts)
+
+    own_origin = site_origin(doc)
+    critical_origins = []
+    preloads = []
+    for url in fonts:
+        preloads.append({'rel': 'preload', 'href': url, 'as': 'font',
+                         'type': FONT_TYPES[os.path.splitext(urlsplit(url).path)[1].lower()],
+                         'crossorigin': ''})
+        host = urlsplit(url).netloc.lower()
+        if host and host != own_origin and host not in critical_origins:
+            critical_origins.append(host)
+
+    # Uno sfondo nel CSS critico (es. la hero) viene scoperto solo al calcolo degli
+    # stili: è quello da precaricare. Altrimenti l'immagine LCP stimata
+    backgrounds = critical_background_images(doc)
+    lcp = find_lcp_image(doc) if not backgrounds else None
+    if backgrounds or lcp is not None:
+        src = backgrounds[0] if backgrounds else lcp.get('src')
+        hint = {'rel': 'preload', 'href': src, 'as': 'image'}
+        image_type = IMAGE_TYPES.get(os.path.splitext(urlsplit(src).path)[1].lower())
+        if image_type:
+            hint['type'] = image_type
+        hint['fetchpriority'] = 'high'
+        if lcp is not None and lcp.get('srcset'):
+            hint['imagesrcset'] = lcp.get('srcset')
+            if lcp.get('sizes'):
+                hint['imagesizes'] = lcp.get('sizes')
+        preloads.append(hint)
+        if lcp is not None and lcp.get('loading') == 'lazy':
+            warnings.append(f"immagine LCP {src} con loading=\"lazy\"")
+
+    # Il CSS caricato in modo asincrono va scaricato subito: quello bloccante è già prioritario
+    seen_styles = set()
+    for link in stylesheets(doc):
+        href = link.get('href')
+        if link.get('rel', '').lower() == 'stylesheet' and is_async_stylesheet(link) and href not in seen_styles:
+            preloads.append({'rel': 'preload', 'href': href, 'as': 'style'})
+        seen_styles.add(href)
+
+    origins = referenced_origins(doc, base_dir)
+    hints = [{'rel': 'preconnect', 'href': f'https://{host}', 'crossorigin': ''}
+             for host in critical_origins]
+    connected = [host for host in PRECONNECT_ORIGINS if host in origins and host not in critical_origins]
+    hints.extend({'rel': 'preconnect', 'href': f'https://{host}'} for host in connected)
+    hints.extend(preloads)
+    for host in sorted(origins):
+        if host != own_origin and host not in critical_origins and host not in connected:
+            hints.append({'rel': 'dns-prefetch', 'href': f'//{host}'})
+    return hints, warnings
+
+def render_hint(hint):
+    parts = [f'<link rel="{hint["rel"]}" href="{hint["href"]}"']
+    for name in ('as', 'type', 'imagesrcset', 'imagesizes', 'fetchpriority'):
+        if hint.get(name):
+            parts.append(f'{name}="{hint[name]}"')
+    if 'crossorigin' in hint:
+        parts.append('crossorigin')
+    return ' '.join(parts) + '>'
+
+def existing_hints(doc):
+    """Hint presenti nella pagina (i preload usati come caricatori di CSS non sono hint)"""
+    return [link for link in doc.find_all('link')
+            if link.get('rel', '').lower() in HINT_RELS and not is_async_stylesheet(link)]
+
+def orphan_comments(doc, removed):
+    """Commenti del <head> che introducevano solo elementi rimossi"""
+    head = doc.find('head')
+    comments = []
+    nodes = [node for node in doc.nodes if head is not None and node.parent is head]
+    for position, node in enumerate(nodes):
+        if node.tag != html_document.COMMENT or doc.comment_text(node) == '':
+            continue
+        following = []
+        for other in nodes[position + 1:]:
+            if other.tag == html_document.COMMENT:
+                break
+            following.append(other)
+        if following and all(id(other) in removed for other in following):
+            comments.append(node)
+    return comments
+
+def dedupe_stylesheets(doc, removed):
+    """
+    Fogli di stile (e relativi <noscript>) ripetuti con lo stesso href. Se una
+    copia è bloccante e l'altra asincrona resta quella bloccante: togliendola
+    la pagina verrebbe disegnata senza stili (FOUC)
+    """
+    changes_made = []
+    by_href = {}
+    for link in stylesheets(doc):
+        by_href.setdefault(link.get('href'), []).append(link)
+    blocking = set()
+    for href, links in by_href.items():
+        keep = next((link for link in links if not is_async_stylesheet(link)), links[0])
+        if len(links) > 1 and not is_async_stylesheet(keep):
+            blocking.add(href)
+        for link in links:
+            if link is not keep:
+                doc.remove(link)
+                removed.add(id(link))
+                changes_made.append(f"Rimosso foglio di stile duplicato {href}")
+    seen_noscript = set()
+    for noscript in doc.find_all('noscript'):
+        inner = doc.inner_text(noscript).strip()
+        if '<link' not in inner:
+            continue
+        # Il fallback delle copie asincrone rimosse non serve: resta quella bloccante
+        fallbacks = [link.get('href') for link in doc.find_all('link') if noscript in link.ancestors()]
+        if fallbacks and all(href in blocking for href in fallbacks):
+            doc.remove(noscript)
+            removed.add(id(noscript))
+            changes_made.append("Rimosso <noscript> di un foglio di stile già bloccante")
+        elif inner in seen_noscript:
+            doc.remove(noscript)
+            removed.add(id(noscript))
+            changes_made.append("Rimosso <noscript> duplicato del foglio di stile")
+        seen_noscript.add(inner)
+    return changes_made
+
+def dedupe_hreflang(doc, removed):
+    """
+    Un solo alternate per lingua: tra i duplicati vince quello con un URL
+    proprio (non condiviso da un'altra lingua)
+    """
+    changes_made = []
+    alternates = [link for link in doc.find_all('link', rel='alternate') if link.has('hreflang')]
+    by_language = {}
+    for link in alternates:
+        by_language.setdefault(link.get('hreflang').lower(), []).append(link)
+    for language, links in by_language.items():
+        if len(links) < 2:
+            continue
+        shared = {link.get('href') for link in alternates
+                  if link.get('hreflang').lower() not in (language, 'x-default')}
+        keep = next((link for link in links if link.get('href') not in shared), links[0])
+        for link in links:
+            if link is not keep:
+                doc.remove(link)
+                removed.add(id(link))
+        changes_made.append(f"Rimossi {len(links) - 1} hreflang=\"{language}\" duplicati")
+    return changes_made
+
+def rewrite_hints(doc, hints, removed):
+    """Sostituisce gli hint esistenti con il blocco calcolato (se diversi)"""
+    current = existing_hints(doc)
+    if [hint_key(link) for link in current] == [hint_key(hint) for hint in hints]:
+        return []
+
+    # Il blocco nuovo prende il posto del primo hint (o segue il meta viewport)
+    anchor = current[0] if current else doc.find('meta', name='viewport')
+    if anchor is None:
+        return []
+    line_start = doc.text.rfind('\n', 0, anchor.start) + 1
+    indent = doc.text[line_start:anchor.start]
+    block = '\n'.join([f'<!-- {HINTS_COMMENT} -->'] + [render_hint(hint) for hint in hints])
+    block = '\n'.join(indent + line for line in block.split('\n'))
+    if current and not indent.strip():
+        doc.insert(line_start, block + '\n')
+    elif current:
+        doc.insert(anchor.start, block.lstrip() + '\n' + indent)
+    else:
+        doc.insert_after(anchor, '\n' + block)
+
+    for link in current:
+        doc.remove(link)
+        removed.add(id(link))
+    current_keys = [hint_key(link) for link in current]
+    new_keys = [hint_key(hint) for hint in hints]
+    current_targets = {key[:2] for key in current_keys}
+    new_targets = {key[:2] for key in new_keys}
+    changes_made = [f"Rimosso {rel} {href}" for rel, href in sorted(current_targets - new_targets)]
+    changes_made += [f"Aggiunto {rel} {href}" for rel, href in sorted(new_targets - current_targets)]
+    changes_made += [f"Aggiornati gli attributi di {key[0]} {key[1]}" for key in new_keys
+                     if key[:2] in current_targets and key not in current_keys]
+    duplicates = len(current_keys) - len(set(current_keys))
+    if duplicates:
+        changes_made.append(f"Rimossi {duplicates} hint duplicati")
+    return changes_made or ["Riordinati i resource hint"]
+
+def process_html_file(file_path, dry_run=False):
+    """
+    Processa una pagina: calcola gli hint, deduplica e riscrive il <head>
+    """
+    print(f"\n📄 Processando: {file_path}")
+
+    doc = html_document.load(file_path)
+    base_dir = os.path.dirname(file_path) or '.'
+    original_size = len(doc.text)
+
+    hints, warnings = compute_hints(doc, base_dir)
+    for warning in warnings:
+        print(f"   ⚠️  {warning}")
+
+    removed = set()
+    all_changes = []
+    all_changes.extend(dedupe_stylesheets(doc, removed))
+    all_changes.extend(dedupe_hreflang(doc, removed))
+    all_changes.extend(rewrite_hints(doc, hints, removed))
+
+    if all_changes:
+        for comment in orphan_comments(doc, removed):
+            doc.remove(comment)
+        content = doc.render() if dry_run else doc.save()
+
+        print(f"{'🔍 Modifiche previste' if dry_run else '✅ Modifiche applicate'}: {len(all_changes)}")
+        for change in all_changes:
+            print(f"   • {change}")
+        print(f"📏 Dimensione: {original_size:,} → {len(content):,} bytes")
+    else:
+        print("ℹ️  Resource hint già ottimali")
+
+    return len(all_changes)
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera e deduplica i resource hint delle pagine',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da processare')
+    parser.add_argument('--dry-run', action='store_true', help='mostra le modifiche senza salvare')
+    args = parser.parse_args()
+
+    print("🔗 Ottimizzazione Resource Hint (preload / preconnect / dns-prefetch)")
+    print("=" * 50)
+
+    total_changes = 0
+    processed_files = 0
+
+    for html_file in args.files:
+        if os.path.exists(html_file):
+            total_changes += process_html_file(html_file, args.dry_run)
+            processed_files += 1
+        else:
+            print(f"⚠️  File non trovato: {html_file}")
+
+    print(f"\n📊 Riepilogo:")
+    print(f"📁 File processati: {processed_files}/{len(args.files)}")
+    print(f"🔧 Modifiche totali: {total_changes}")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
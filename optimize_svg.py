@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script per ottimizzare le icone SVG (icons/*.svg)
+Rimuove metadati degli editor, arrotonda i numeri, elimina i gruppi inutili e
+accorcia i path; opzionalmente inserisce inline nell'HTML gli SVG più piccoli
+"""
+
+import os
+import re
+import glob
+import argparse
+import xml.etree.ElementTree as ET
+
+import minify_css
+import instrumentation
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+# Cifre decimali mantenute per coordinate e dimensioni
+DEFAULT_PRECISION = 2
+
+# Soglia (in byte, dopo la minimizzazione) sotto la quale un SVG viene inserito inline
+DEFAULT_INLINE_MAX_BYTES = 4096
+
+# Elementi e attributi aggiunti dagli editor (Illustrator, Inkscape, Sketch...).
+# <title> resta: è il nome accessibile dell'icona, aperta da sola o inline
+METADATA_TAGS = {'metadata', 'desc'}
+EDITOR_ATTRIBUTES = {'data-name', 'version', 'enable-background', 'xml:space'}
+
+# Attributi numerici su cui è sicuro arrotondare
+NUMERIC_ATTRIBUTES = {'x', 'y', 'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry',
+                      'x1', 'y1', 'x2', 'y2', 'viewBox', 'points', 'transform',
+                      'stroke-width', 'fx', 'fy', 'offset'}
+
+# Proprietà CSS che esistono anche come attributo di presentazione SVG
+PRESENTATION_ATTRIBUTES = {'fill', 'fill-opacity', 'fill-rule', 'stroke', 'stroke-width',
+                           'stroke-opacity', 'stroke-linecap', 'stroke-linejoin',
+                           'stroke-miterlimit', 'stroke-dasharray', 'opacity',
+                           'stop-color', 'stop-opacity', 'clip-rule', 'display'}
+
+# Attributi di un <g> che non si possono spostare sul figlio senza cambiare il rendering
+GROUP_ONLY_ATTRIBUTES = {'transform', 'clip-path', 'mask', 'filter', 'opacity', 'id', 'style', 'class'}
+
+# Elementi in cui gli spazi nel testo sono significativi
+TEXT_TAGS = {'text', 'tspan', 'textPath', 'style'}
+
+PATH_ARG_COUNTS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+PATH_NUMBER = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+
+def _local_name(name):
+    return name.split('}', 1)[1] if name.startswith('{') else name
+
+
+def _namespace(name):
+    return name[1:].split('}', 1)[0] if name.startswith('{') else None
+
+
+def format_number(value, precision=DEFAULT_PRECISION):
+    """Formatta un numero nel modo più corto possibile (0.50 -> .5, -0.0 -> 0)"""
+    text = f'{round(value, precision):.{precision}f}'
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        text = '0'
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    return text
+
+
+def round_numbers(value, precision=DEFAULT_PRECISION):
+    """Arrotonda i numeri decimali contenuti in un valore di attributo"""
+    return re.sub(r'-?\d*\.\d+(?:[eE][+-]?\d+)?',
+                  lambda m: format_number(float(m.group(0)), precision), value)
+
+
+def parse_path(data):
+    """
+    Scompone il path data in una lista di (comando, [argomenti]).
+    I flag degli archi sono letti come singole cifre (es. 'a1 1 0 01 5 5')
+    """
+    commands = []
+    pos = 0
+    command = None
+    length = len(data)
+
+    def skip_separators(pos):
+        while pos < length and data[pos] in ' \t\r\n,':
+            pos += 1
+        return pos
+
+    while True:
+        pos = skip_separators(pos)
+        if pos >= length:
+            break
+        char = data[pos]
+        if char.upper() in PATH_ARG_COUNTS and char not in 'eE':
+            command = char
+            pos += 1
+            if command in 'Zz':
+                commands.append((command, []))
+                continue
+        elif command is None or command in 'Zz':
+            raise ValueError(f'path data non valido vicino a: {data[pos:pos + 20]}')
+
+        args = []
+        for index in range(PATH_ARG_COUNTS[command.upper()]):
+            pos = skip_separators(pos)
+            if command.upper() == 'A' and index in (3, 4):
+                if pos >= length or data[pos] not in '01':
+                    raise ValueError('flag arco non valido')
+                args.append(float(data[pos]))
+                pos += 1
+                continue
+            match = PATH_NUMBER.match(data, pos)
+            if not match:
+                raise ValueError(f'path data non valido vicino a: {data[pos:pos + 20]}')
+            args.append(float(match.group(0)))
+            pos = match.end()
+        commands.append((command, args))
+
+        # Dopo un moveto le coppie successive sono lineto impliciti
+        if command == 'M':
+            command = 'L'
+        elif command == 'm':
+            command = 'l'
+    return commands
+
+
+def serialize_path(commands, precision=DEFAULT_PRECISION):
+    """
+    Ricostruisce il path data in forma compatta: niente separatori superflui e
+    nessuna lettera di comando ripetuta quando è implicita
+    """
+    output = []
+    previous_command = None
+    previous_number = None
+    for command, args in commands:
+        implicit = (command == previous_command and command not in 'Mm') or \
+                   (previous_command == 'M' and command == 'L') or \
+                   (previous_command == 'm' and command == 'l')
+        if not implicit:
+            output.append(command)
+            previous_number = None
+        for value in args:
+            number = format_number(value, precision)
+            if previous_number is not None:
+                # Separatore necessario solo se il numero non inizia con '-'
+                # o con '.' dopo un numero che ha già un punto decimale
+                if not (number.startswith('-') or (number.startswith('.') and '.' in previous_number)):
+                    output.append(' ')
+            output.append(number)
+            previous_number = number
+        previous_command = command
+    return ''.join(output)
+
+
+def optimize_path_data(data, precision=DEFAULT_PRECISION):
+    try:
+        return serialize_path(parse_path(data), precision)
+    except ValueError:
+        return data  # Path non interpretabile: meglio lasciarlo com'è
+
+
+def parse_style(style):
+    declarations = {}
+    for declaration in style.split(';'):
+        if ':' in declaration:
+            name, value = declaration.split(':', 1)
+            declarations[name.strip()] = value.strip()
+    return declarations
+
+
+def inline_class_styles(root):
+    """
+    Converte le regole CSS semplici (.classe{proprietà:valore}) di <style> in
+    attributi di presentazione. Restituisce False se il CSS è troppo complesso
+    """
+    styles = [el for el in root.iter() if _local_name(el.tag) == 'style']
+    if not styles:
+        return True
+
+    css = minify_css.minify_css(''.join(el.text or '' for el in styles))
+    rules = re.findall(r'([^{}]+)\{([^{}]*)\}', css)
+    if not rules or re.sub(r'[^{}]+\{[^{}]*\}', '', css).strip():
+        return False
+
+    class_rules = {}
+    for selectors, body in rules:
+        declarations = parse_style(body)
+        if any(name not in PRESENTATION_ATTRIBUTES for name in declarations):
+            return False
+        for selector in selectors.split(','):
+            if not re.fullmatch(r'\.[\w-]+', selector.strip()):
+                return False
+            class_rules.setdefault(selector.strip()[1:], {}).update(declarations)
+
+    for el in root.iter():
+        classes = el.get('class', '').split()
+        if not classes:
+            continue
+        for class_name in classes:
+            for name, value in class_rules.get(class_name, {}).items():
+                # Le regole CSS vincono sugli attributi di presentazione esistenti
+                el.set(name, value)
+        del el.attrib['class']
+
+    for parent in root.iter():
+        for child in list(parent):
+            if child in styles:
+                parent.remove(child)
+    return True
+
+
+def _referenced_ids(root):
+    """Raccoglie gli id usati tramite url(#id), href="#id" o selettori CSS"""
+    text = []
+    for el in root.iter():
+        text.extend(el.attrib.values())
+        if _local_name(el.tag) == 'style' and el.text:
+            text.append(el.text)
+    return set(re.findall(r'#([\w.:-]+)', ' '.join(text)))
+
+
+def _collapse_groups(parent):
+    """Elimina i <g> senza attributi e fonde nel figlio quelli con un solo figlio"""
+    index = 0
+    while index < len(parent):
+        child = parent[index]
+        _collapse_groups(child)
+        if _local_name(child.tag) == 'g':
+            if not child.attrib:
+                parent[index:index + 1] = list(child)
+                continue
+            if len(child) == 1 and not (set(child.attrib) & GROUP_ONLY_ATTRIBUTES):
+                grandchild = child[0]
+                if not (set(child.attrib) & set(grandchild.attrib)):
+                    grandchild.attrib.update(child.attrib)
+                    parent[index] = grandchild
+                    continue
+        index += 1
+
+
+def optimize_svg_tree(root, precision=DEFAULT_PRECISION):
+    """Applica tutte le ottimizzazioni all'albero SVG"""
+    # Metadati e namespace degli editor
+    for parent in list(root.iter()):
+        for child in list(parent):
+            namespace = _namespace(child.tag)
+            if (namespace and namespace != SVG_NS) or _local_name(child.tag) in METADATA_TAGS:
+                parent.remove(child)
+
+    inline_class_styles(root)
+    referenced = _referenced_ids(root)
+
+    for el in root.iter():
+        for name in list(el.attrib):
+            namespace = _namespace(name)
+            if (namespace and namespace not in (XLINK_NS, 'http://www.w3.org/XML/1998/namespace')) \
+                    or name in EDITOR_ATTRIBUTES:
+                del el.attrib[name]
+            elif name == 'id' and el.get('id') not in referenced:
+                del el.attrib[name]
+
+        for name, value in list(el.attrib.items()):
+            if name == 'd':
+                el.set(name, optimize_path_data(value, precision))
+            elif name in NUMERIC_ATTRIBUTES:
+                el.set(name, round_numbers(value, precision))
+            elif name == 'style':
+                el.set(name, minify_css.minify_css(value).rstrip(';'))
+
+        # Spazi e a capo tra i tag non servono (tranne nel testo)
+        if _local_name(el.tag) not in TEXT_TAGS:
+            if el.text and not el.text.strip():
+                el.text = None
+        if el.tail and not el.tail.strip():
+            el.tail = None
+
+    # <defs> vuoti dopo la pulizia
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if _local_name(child.tag) == 'defs' and len(child) == 0:
+                parent.remove(child)
+
+    _collapse_groups(root)
+    return root
+
+
+def minify_svg(svg_content, precision=DEFAULT_PRECISION):
+    """Restituisce l'SVG minimizzato come stringa"""
+    root = ET.fromstring(svg_content)
+    optimize_svg_tree(root, precision)
+    output = ET.tostring(root, encoding='unicode', short_empty_elements=True)
+    return output.replace(' />', '/>')
+
+
+def svg_for_inline(svg_content, img_attributes, id_prefix):
+    """
+    Prepara l'SVG minimizzato per l'inserimento nell'HTML: copia width/height/class
+    dell'<img>, usa l'alt (o il <title> dell'SVG se l'alt manca) come aria-label
+    e rende univoci gli id nella pagina
+    """
+    root = ET.fromstring(svg_content)
+
+    ids = {el.get('id') for el in root.iter() if el.get('id')}
+    for el in root.iter():
+        for name, value in list(el.attrib.items()):
+            if name == 'id':
+                el.set(name, f'{id_prefix}-{value}')
+            elif ids:
+                el.set(name, re.sub(r'#([\w.:-]+)',
+                                    lambda m: f'#{id_prefix}-{m.group(1)}' if m.group(1) in ids else m.group(0),
+                                    value))
+
+    for name in ('width', 'height', 'class'):
+        if name in img_attributes:
+            root.set(name, img_attributes[name])
+    title = next((el.text.strip() for el in root if _local_name(el.tag) == 'title' and el.text), '')
+    # alt="" dichiara l'immagine decorativa: il <title> vale solo se l'alt manca del tutto
+    label = img_attributes['alt'] if 'alt' in img_attributes else title
+    for name in ('aria-hidden', 'role', 'aria-label'):
+        root.attrib.pop(name, None)
+    if label:
+        root.set('role', 'img')
+        root.set('aria-label', label)
+    else:
+        root.set('aria-hidden', 'true')
+
+    output = ET.tostring(root, encoding='unicode', short_empty_elements=True).replace(' />', '/>')
+    # Nell'HTML il namespace SVG è implicito
+    return output.replace(f' xmlns="{SVG_NS}"', '', 1)
+
+
+def inline_small_svgs(html_content, svg_cache, max_bytes=DEFAULT_INLINE_MAX_BYTES):
+    """
+    Sostituisce gli <img src="...svg"> con l'SVG inline quando è abbastanza piccolo
+    e l'immagine è stilizzata tramite class
+    """
+    changes_made = []
+    counters = {}
+
+    def replace_img(match):
+        tag = match.group(0)
+        attributes = dict((name, value) for name, _, value in
+                          re.findall(r'([\w:-]+)\s*=\s*(["\'])(.*?)\2', tag))
+        src = attributes.get('src', '').split('?')[0]
+        svg_content = svg_cache.get(src)
+        if svg_content is None or len(svg_content.encode('utf-8')) > max_bytes:
+            return tag
+        if 'class' not in attributes:
+            # Senza class l'<img> è stilizzato da selettori sul tag (es. .partner-logo img)
+            # che non si applicherebbero all'<svg>: meglio lasciarlo esterno
+            return tag
+
+        stem = re.sub(r'[^\w-]', '-', os.path.splitext(os.path.basename(src))[0])
+        counters[stem] = counters.get(stem, 0) + 1
+        prefix = stem if counters[stem] == 1 else f'{stem}-{counters[stem]}'
+        changes_made.append(f"Inserito inline {src} ({len(svg_content.encode('utf-8')):,} bytes)")
+        return svg_for_inline(svg_content, attributes, prefix)
+
+    updated_content = re.sub(r'<img\b[^>]*\bsrc=["\'][^"\']+\.svg(?:\?[^"\']*)?["\'][^>]*>',
+                             replace_img, html_content)
+    return updated_content, changes_made
+
+
+def optimize_svg_file(file_path, precision=DEFAULT_PRECISION, dry_run=False):
+    """Minimizza un file SVG e restituisce (byte originali, byte finali, contenuto)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        original = f.read()
+
+    minified = minify_svg(original, precision)
+    original_size = len(original.encode('utf-8'))
+    new_size = len(minified.encode('utf-8'))
+
+    if new_size < original_size and not dry_run:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(minified)
+    return original_size, min(new_size, original_size), minified
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ottimizza le icone SVG del sito',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help='cifre decimali mantenute (default: %(default)s)')
+    parser.add_argument('--inline', nargs='?', type=int, const=DEFAULT_INLINE_MAX_BYTES, metavar='MAX_BYTES',
+                        help='inserisce inline nelle pagine HTML gli SVG fino a MAX_BYTES')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='mostra il risparmio senza modificare i file')
+    args = parser.parse_args()
+
+    print("✏️  Ottimizzazione icone SVG")
+    print("=" * 50)
+
+    svg_cache = {}
+    total_original = 0
+    total_optimized = 0
+
+    for file_path in sorted(glob.glob('icons/*.svg')):
+        original_size, new_size, minified = optimize_svg_file(file_path, args.precision, args.dry_run)
+        svg_cache[file_path.replace(os.sep, '/')] = minified
+        total_original += original_size
+        total_optimized += new_size
+        saved = original_size - new_size
+        print(f"   • {file_path}: {original_size:,} → {new_size:,} bytes "
+              f"(-{saved:,}, {saved / original_size * 100:.1f}%)")
+
+    print(f"\n💾 Totale SVG: {total_original:,} → {total_optimized:,} bytes "
+          f"(-{total_original - total_optimized:,})")
+
+    if args.inline is None:
+        return
+
+    print(f"\n📥 Inserimento inline degli SVG fino a {args.inline:,} bytes")
+    html_files = [
+        'index.html',
+        'sorveglianza.html',
+        'allarmi.html',
+        'serramenti.html',
+        'nebbiogeni.html',
+        'chi-siamo.html',
+        'lavora-con-noi.html'
+    ]
+    for html_file in html_files:
+        if not os.path.exists(html_file):
+            print(f"⚠️  File non trovato: {html_file}")
+            continue
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        content, changes = inline_small_svgs(content, svg_cache, args.inline)
+        if changes and not args.dry_run:
+            with open(html_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+        for change in changes:
+            print(f"   • {html_file}: {change}")
+
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -3,15 +3,25 @@ import http.server
 import socketserver
 from urllib.parse import urlparse
 import os
+import io
+import argparse
+from urllib.parse import unquote
 
-class SecureHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+import csp_policy
+import access_log
+import live_reload
+import analyze_access_log
+import site_pack
+
+class SecureHTTPRequestHandler(access_log.AccessLogMixin, http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
         # Aggiungi header di sicurezza
         self.send_header('X-Frame-Options', 'SAMEORIGIN')
         self.send_header('X-Content-Type-Options', 'nosniff')
         self.send_header('X-XSS-Protection', '1; mode=block')
         self.send_header('Referrer-Policy', 'strict-origin-when-cross-origin')
-        self.send_header('Content-Security-Policy', "default-src 'self'; script-src 'self' 'unsafe-inline' https://fonts.googleapis.com; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; font-src 'self' https://fonts.gstatic.com; img-src 'self' data:; connect-src 'self'")
+        self.send_header('Content-Security-Policy',
+                         csp_policy.header_value(https=False, path=urlparse(getattr(self, 'path', '')).path))
         super().end_headers()
 
     def guess_type(self, path):
@@ -38,15 +48,176 @@ class SecureHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Fallback per tipi di file non riconosciuti
         return 'application/octet-stream'
 
+class CachedRequestHandler(SecureHTTPRequestHandler):
+    """
+    Handler che serve i file da una cache in memoria (modalità --watch o
+    --warm); una voce viene ricaricata se il file su disco è stato modificato
+    """
+    cache = None
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and urlparse(self.path).path.endswith('/'):
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            # Redirect delle cartelle, elenco dei file e 404 restano quelli standard
+            return super().send_head()
+
+        (body, mtime), hit = self.cache.lookup(path, self._load)
+        if mtime != os.path.getmtime(path):
+            self.cache.invalidate([path])
+            (body, mtime), hit = self.cache.lookup(path, self._load)
+        self.cache_status = 'hit' if hit else 'miss'
+        self.send_response(200)
+        self.send_header('Content-type', self.guess_type(path))
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', self.date_time_string(mtime))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        return io.BytesIO(body)
+
+    @staticmethod
+    def _load(path):
+        with open(path, 'rb') as f:
+            body = f.read()
+        return body, os.path.getmtime(path)
+
+class LiveReloadRequestHandler(CachedRequestHandler):
+    """
+    Handler della modalità --watch: i file sono serviti dalla cache in memoria
+    (invalidata dal watcher) e le pagine HTML includono lo script di live reload
+    """
+    hub = None
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == live_reload.EVENTS_PATH:
+            # Connessione SSE aperta finché il browser resta sulla pagina
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.hub.stream(self.wfile)
+            return
+        if path == live_reload.CLIENT_PATH:
+            body = live_reload.CLIENT_JS.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/javascript')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        super().do_GET()
+
+    @staticmethod
+    def _load(path):
+        body, mtime = CachedRequestHandler._load(path)
+        if path.endswith('.html'):
+            body = live_reload.inject_client(body)
+        return body, mtime
+
+class PackedRequestHandler(SecureHTTPRequestHandler):
+    """
+    Handler della modalità --pack: le risposte arrivano dall'archivio mappato
+    in memoria (site_pack.py), con header ed ETag calcolati al momento del pack
+    """
+    pack = None
+    # Header della variante ripetuti nel 304 (RFC 9110 §15.4.5): il client
+    # aggiorna con questi la copia in cache
+    NOT_MODIFIED_HEADERS = ('etag', 'cache-control', 'vary', 'expires', 'content-location')
+
+    def do_GET(self):
+        body = self.send_packed()
+        if body is not None:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_packed()
+
+    def send_packed(self):
+        """Invia stato e header; restituisce il contenuto da scrivere (None se non c'è)"""
+        url = unquote(urlparse(self.path).path)
+        found = self.pack.lookup(url, self.headers.get('Accept-Encoding'))
+        if found is None:
+            if self.pack.is_directory(url):
+                self.send_response(301)
+                self.send_header('Location', url + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self.send_error(404, "File not found")
+            return None
+
+        _, headers, etag, body = found
+        self.cache_status = 'hit'
+        if etag in [value.strip() for value in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            for name, value in headers:
+                if name.lower() in self.NOT_MODIFIED_HEADERS:
+                    self.send_header(name, value)
+            self.end_headers()
+            return None
+        self.send_response(200)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        return body
+
 if __name__ == '__main__':
-    PORT = 8000
+    parser = argparse.ArgumentParser(description='Server locale con header di sicurezza')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--watch', action='store_true',
+                        help='rigenera i file minimizzati e ricarica i browser quando cambia un file')
+    parser.add_argument('--access-log', nargs='?', const=access_log.DEFAULT_LOG_FILE, metavar='FILE',
+                        help=f'scrive una riga JSON per richiesta (default: {access_log.DEFAULT_LOG_FILE})')
+    parser.add_argument('--warm', nargs='?', const=analyze_access_log.STATS_FILE, metavar='STATS',
+                        help='serve i file dalla memoria, precaricando i più richiesti secondo '
+                             f'analyze_access_log.py (default: {analyze_access_log.STATS_FILE})')
+    parser.add_argument('--pack', nargs='?', const=site_pack.PACK_FILE, metavar='FILE',
+                        help=f'serve il bundle dall\'archivio creato da site_pack.py (default: {site_pack.PACK_FILE})')
+    args = parser.parse_args()
+    if args.pack and (args.watch or args.warm):
+        parser.error('--pack non si combina con --watch o --warm: l\'archivio è già in memoria')
+    PORT = args.port
     
     # Cambia nella directory del sito web
     web_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(web_dir)
     
-    with socketserver.TCPServer(("", PORT), SecureHTTPRequestHandler) as httpd:
+    handler = SecureHTTPRequestHandler
+    server_class = socketserver.TCPServer
+    if args.watch:
+        # SSE tiene aperta una connessione per browser: serve un thread per richiesta
+        handler = LiveReloadRequestHandler
+        handler.hub = live_reload.ReloadHub()
+        server_class = http.server.ThreadingHTTPServer
+    elif args.warm:
+        handler = CachedRequestHandler
+    elif args.pack:
+        # Un solo open all'avvio: poi solo ricerche nell'indice e fette della mappa
+        handler = PackedRequestHandler
+        handler.pack = site_pack.PackedSite(args.pack)
+        print(f"📦 Archivio {args.pack}: {len(handler.pack.entries)} file")
+    if args.watch or args.warm:
+        handler.cache = live_reload.FileCache()
+    if args.watch:
+        watcher = live_reload.SiteWatcher(web_dir, handler.cache, handler.hub)
+        watcher.start()
+    if args.warm:
+        paths = [os.path.join(web_dir, url.lstrip('/')) for url in analyze_access_log.warm_paths(args.warm)]
+        loaded = handler.cache.warm(paths, handler._load)
+        print(f"🔥 Cache precaricata: {loaded} file da {args.warm}")
+    if args.access_log:
+        handler.access_log = access_log.AccessLog(args.access_log)
+        handler.access_log.start()
+    
+    with server_class(("", PORT), handler) as httpd:
         print(f"Server sicuro avviato su http://localhost:{PORT}/")
+        if args.access_log:
+            print(f"📝 Access log JSON: {args.access_log}")
+        if args.watch:
+            print(f"👀 Watch attivo ({watcher.mode}): {', '.join(live_reload.REBUILD_RULES)} vengono rigenerati al salvataggio")
         print("Header di sicurezza attivi:")
         print("- X-Frame-Options: SAMEORIGIN")
         print("- X-Content-Type-Options: nosniff")
@@ -58,4 +229,7 @@ if __name__ == '__main__':
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
-            print("\nServer fermato.")
\ No newline at end of file
+            print("\nServer fermato.")
+        finally:
+            if handler.access_log is not None:
+                handler.access_log.close()
\ No newline at end of file
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulatore offline del caricamento delle pagine (waterfall)
+Ricava dall'HTML il grafo delle risorse (CSS bloccante, script, preload,
+immagini, font dichiarati nel CSS), prende le dimensioni dai file su disco
+(compresse con gzip come le serve il server) e simula una connessione
+limitata (Slow 4G / Fast 3G) con un numero configurabile di connessioni
+parallele per origine. Stima FCP, LCP e percorso critico di ogni pagina,
+così due build si possono confrontare senza pubblicare il sito.
+Non modella il tempo di CPU (parsing, esecuzione JS) né il rendering
+"""
+
+import os
+import sys
+import json
+import gzip
+import argparse
+import tempfile
+from urllib.parse import urljoin, urlsplit
+
+import html_document
+import image_manifest
+import optimize_lcp
+import optimize_resource_hints
+import instrumentation
+
+# Profili di rete: RTT in ms, banda in kbit/s
+PROFILES = {
+    # Throttling simulato di Lighthouse/PageSpeed per mobile
+    'slow-4g': {'rtt': 150, 'download': 1638.4, 'label': 'Slow 4G'},
+    # Preset "Fast 3G" di Chrome DevTools
+    'fast-3g': {'rtt': 562.5, 'download': 1474.56, 'label': 'Fast 3G'},
+}
+DEFAULT_PROFILE = 'slow-4g'
+DEFAULT_CONNECTIONS = 6
+
+SERVER_RESPONSE_MS = 50
+# DNS + TCP + TLS 1.3: un round trip ciascuno
+CONNECTION_SETUP_RTTS = 3
+PAGE_ORIGIN = 'https://www.fbtotalsecurity.com/'
+
+# Dimensioni ipotizzate per le risorse di terze parti (non presenti su disco)
+REMOTE_BYTES = {'font': 24000, 'style': 15000, 'script': 60000, 'image': 30000}
+TEXT_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.xml')
+
+# Priorità di Chrome (indice più basso = scaricata prima)
+PRIORITIES = ('highest', 'high', 'medium', 'low', 'lowest')
+
+# Periodo di blocco del testo in attesa del font (ms) per font-display
+FONT_BLOCK_PERIODS = {'auto': 3000, 'block': 3000, 'swap': 0, 'fallback': 100, 'optional': 100}
+
+HTML_FILES = optimize_lcp.HTML_FILES
+
+# Tolleranza sui byte (evita passi di simulazione infinitesimi per arrotondamento)
+EPSILON = 1e-3
+
+_compressed_sizes = {}
+
+def transfer_size(path, compress=True):
+    """Byte trasferiti per un file locale: il .gz precompresso se c'è, altrimenti gzip -9"""
+    if not compress or not path.lower().endswith(TEXT_EXTENSIONS):
+        return os.path.getsize(path)
+    if os.path.exists(path + '.gz'):
+        return os.path.getsize(path + '.gz')
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _compressed_sizes:
+        with open(path, 'rb') as f:
+            _compressed_sizes[key] = len(gzip.compress(f.read(), compresslevel=9, mtime=0))
+    return _compressed_sizes[key]
+
+class Request:
+    """Una richiesta della waterfall, con i tempi (ms) riempiti dalla simulazione"""
+
+    __slots__ = ('url', 'kind', 'priority', 'bytes', 'estimated', 'initiator', 'trigger',
+                 'blocking', 'order', 'discovered', 'sent', 'response', 'end', 'remaining')
+
+    def __init__(self, url, kind, priority, size, estimated, initiator, trigger, order):
+        self.url = url
+        self.kind = kind
+        self.priority = priority
+        self.bytes = size
+        self.estimated = estimated
+        self.initiator = initiator
+        # ('offset', n): scoperta quando arrivano n byte del documento
+        # ('render',): scoperta al primo calcolo di stile e layout
+        # ('done', richiesta): scoperta quando la richiesta indicata è completata
+        self.trigger = trigger
+        self.blocking = False
+        self.order = order
+        self.discovered = self.sent = self.response = self.end = None
+        self.remaining = size
+
+    @property
+    def origin(self):
+        return urlsplit(self.url).netloc
+
+    @property
+    def name(self):
+        path = urlsplit(self.url).path
+        return os.path.basename(path.rstrip('/')) or urlsplit(self.url).netloc
+
+class PageGraph:
+    """
+    Grafo delle risorse di una pagina, nell'ordine in cui il preload scanner e
+    il calcolo degli stili le scoprono
+    """
+
+    def __init__(self, file_path, manifest, compress=True):
+        self.doc = html_document.load(file_path)
+        self.base_dir = os.path.dirname(file_path) or '.'
+        self.compress = compress
+        self.page_url = urljoin(PAGE_ORIGIN, os.path.basename(file_path))
+        self.requests = {}
+        self.hints = []
+        self.deferred_images = 0
+        self.font_displays = {}
+
+        self.document = self._add(self.page_url, 'document', 'highest', None, None)
+        self.document.bytes = self.document.remaining = transfer_size(file_path, compress)
+        self.ratio = self.document.bytes / max(1, len(self.doc.text))
+
+        self.lcp, self.above_fold, self.images = optimize_lcp.analyze_page(self.doc, manifest)
+        items = optimize_lcp.estimate_layout(self.doc, manifest, optimize_lcp.VIEWPORTS['mobile'])
+        body = self.doc.find('body')
+        first_content = min((item.node.start for item in items),
+                            default=body.start if body else len(self.doc.text))
+        self.first_content_offset = self._offset(first_content)
+        self.lcp_offset = self._offset(self.lcp.node.start) if self.lcp else self.first_content_offset
+        self.lcp_request = None
+
+        self._scan_document()
+        self._scan_css()
+
+    def _offset(self, position):
+        """Byte trasferiti del documento quando il parser arriva a `position`"""
+        return position * self.ratio
+
+    def _local_path(self, url):
+        if urlsplit(url).netloc != urlsplit(PAGE_ORIGIN).netloc:
+            return None
+        path = os.path.join(self.base_dir, urlsplit(url).path.lstrip('/'))
+        return path if os.path.isfile(path) else None
+
+    def _add(self, url, kind, priority, initiator, trigger, blocking=False):
+        """Aggiunge (o riusa, come la cache del browser) la richiesta per un URL"""
+        url = url.split('#')[0]
+        request = self.requests.get(url)
+        if request is None:
+            path = self._local_path(url)
+            if path:
+                size, estimated = transfer_size(path, self.compress), False
+            else:
+                size, estimated = REMOTE_BYTES.get(kind, REMOTE_BYTES['image']), True
+            request = Request(url, kind, priority, size, estimated, initiator, trigger, len(self.requests))
+            self.requests[url] = request
+        elif PRIORITIES.index(priority) < PRIORITIES.index(request.priority):
+            request.priority = priority
+        request.blocking = request.blocking or blocking
+        return request
+
+    def _scan_document(self):
+        body = self.doc.find('body')
+        body_start = body.start if body else len(self.doc.text)
+        for node in self.doc.nodes:
+            if node.tag == html_document.COMMENT or optimize_resource_hints.in_noscript(node):
+                continue
+            trigger = ('offset', self._offset(node.start))
+
+            if node.tag == 'link' and node.get('href'):
+                rel = node.get('rel', '').lower()
+                url = urljoin(self.page_url, node.get('href'))
+                if rel == 'stylesheet':
+                    if optimize_resource_hints.is_async_stylesheet(node):
+                        self._add(url, 'style', 'lowest', self.document, trigger)
+                    else:
+                        self._add(url, 'style', 'highest', self.document, trigger, blocking=True)
+                elif rel == 'preload':
+                    kind = node.get('as', 'fetch')
+                    priority = 'high' if kind in ('font', 'style') or node.get('fetchpriority') == 'high' else 'low'
+                    self._add(url, kind, priority, self.document, trigger)
+                elif rel in ('preconnect', 'dns-prefetch'):
+                    self.hints.append((rel, urlsplit(url).netloc, trigger))
+
+            elif node.tag == 'script' and node.get('src'):
+                url = urljoin(self.page_url, node.get('src'))
+                if node.has('async') or node.has('defer') or node.get('type') == 'module':
+                    self._add(url, 'script', 'low', self.document, trigger)
+                else:
+                    # Uno script sincrono nell'<head> blocca il primo rendering
+                    self._add(url, 'script', 'high', self.document, trigger, blocking=node.start < body_start)
+
+            elif node.tag == 'img' and node.get('src') and not node.get('src').startswith('data:'):
+                url = urljoin(self.page_url, node.get('src'))
+                priority = 'high' if node.get('fetchpriority') == 'high' else 'low'
+                if node.get('loading', '').lower() == 'lazy':
+                    if id(node) not in self.above_fold:
+                        self.deferred_images += 1
+                        if url not in self.requests:
+                            continue
+                    # Le immagini lazy partono solo dopo il layout
+                    trigger = ('render',)
+                request = self._add(url, 'image', priority, self.document, trigger)
+                if self.lcp is not None and node is self.lcp.node:
+                    self.lcp_request = request
+
+    def _scan_css(self):
+        """Font usati dal CSS: quelli del CSS bloccante al primo rendering, gli altri al caricamento del CSS asincrono"""
+        render_css = []
+        async_css = []
+        for node in self.doc.nodes:
+            if node.tag == 'style' and not optimize_resource_hints.in_noscript(node):
+                css = optimize_resource_hints.CSS_COMMENT_PATTERN.sub('', self.doc.inner_text(node))
+                render_css.append((self.document, css))
+            elif node.tag == 'link' and node.get('href') and node.get('rel', '').lower() == 'stylesheet' \
+                    and not optimize_resource_hints.in_noscript(node):
+                request = self.requests.get(urljoin(self.page_url, node.get('href')).split('#')[0])
+                path = self._local_path(request.url) if request else None
+                if path:
+                    css = optimize_resource_hints.CSS_COMMENT_PATTERN.sub('', optimize_resource_hints.read_text(path))
+                    (render_css if request.blocking else async_css).append((request, css))
+
+        fonts_at_render, _ = optimize_resource_hints.critical_fonts([css for _, css in render_css])
+        all_fonts, _ = optimize_resource_hints.critical_fonts([css for _, css in render_css + async_css])
+        self.render_fonts = []
+        for font in all_fonts:
+            initiator = next((request for request, css in render_css + async_css if font in css), self.document)
+            if font in fonts_at_render:
+                request = self._add(urljoin(initiator.url, font), 'font', 'high', initiator, ('render',))
+                self.render_fonts.append(request)
+            else:
+                self._add(urljoin(initiator.url, font), 'font', 'high', initiator, ('done', initiator))
+
+        for _, css in render_css + async_css:
+            for match in optimize_resource_hints.FONT_FACE_PATTERN.finditer(css):
+                descriptors = {name.lower(): value.strip() for name, value in
+                               optimize_resource_hints.DESCRIPTOR_PATTERN.findall(match.group(1))}
+                url = optimize_resource_hints.FONT_URL_PATTERN.search(descriptors.get('src', ''))
+                if url:
+                    self.font_displays[url.group(1)] = descriptors.get('font-display', 'auto').lower()
+
+    def font_block_period(self, request):
+        display = next((value for url, value in self.font_displays.items() if url in request.url), 'auto')
+        return FONT_BLOCK_PERIODS.get(display, FONT_BLOCK_PERIODS['auto'])
+
+def simulate(graph, profile, connections=DEFAULT_CONNECTIONS):
+    """
+    Simulazione a eventi: la banda è divisa in parti uguali tra i download
+    attivi, ogni origine accetta al massimo `connections` richieste in volo e
+    la prima richiesta verso un'origine paga DNS, TCP e TLS. Restituisce il
+    dizionario delle metriche (ms)
+    """
+    rtt = profile['rtt']
+    bandwidth = profile['download'] * 1000 / 8 / 1000  # byte/ms
+    requests = sorted(graph.requests.values(), key=lambda request: request.order)
+    document = graph.document
+    origins = {}  # origine -> {'dns': ms, 'connected': ms}
+    doc_progress = [(0.0, 0.0)]
+    hints = list(graph.hints)
+    render_ready = None
+    now = 0.0
+
+    def received():
+        return document.bytes - document.remaining if document.response is not None and now >= document.response else 0
+
+    def triggered(trigger):
+        if trigger is None:
+            return True
+        if trigger[0] == 'offset':
+            return received() >= trigger[1] - EPSILON
+        if trigger[0] == 'render':
+            return render_ready is not None
+        return trigger[1].end is not None
+
+    def connect(origin, dns_only=False):
+        state = origins.setdefault(origin, {})
+        if 'dns' not in state:
+            state['dns'] = now + rtt
+        if not dns_only and 'connected' not in state:
+            state['connected'] = max(now, state['dns']) + (CONNECTION_SETUP_RTTS - 1) * rtt
+
+    while True:
+        for rel, origin, trigger in list(hints):
+            if triggered(trigger):
+                connect(origin, dns_only=rel == 'dns-prefetch')
+                hints.remove((rel, origin, trigger))
+        for request in requests:
+            if request.discovered is None and triggered(request.trigger):
+                request.discovered = now
+
+        if render_ready is None and received() >= graph.first_content_offset - EPSILON and \
+                all(request.end is not None for request in requests if request.blocking):
+            render_ready = now
+            continue  # Nuove risorse scoperte dal layout
+
+        in_flight = {}
+        for request in requests:
+            if request.sent is not None and request.end is None:
+                in_flight[request.origin] = in_flight.get(request.origin, 0) + 1
+        queued = [request for request in requests if request.discovered is not None and request.sent is None]
+        for request in sorted(queued, key=lambda r: (PRIORITIES.index(r.priority), r.discovered, r.order)):
+            if in_flight.get(request.origin, 0) >= connections:
+                continue
+            connect(request.origin)
+            request.sent = now
+            request.response = max(now, origins[request.origin]['connected']) + rtt + SERVER_RESPONSE_MS
+            in_flight[request.origin] = in_flight.get(request.origin, 0) + 1
+
+        downloading = [request for request in requests
+                       if request.response is not None and request.response <= now and request.end is None]
+        share = bandwidth / len(downloading) if downloading else bandwidth
+        candidates = [request.response for request in requests
+                      if request.response is not None and request.response > now]
+        candidates += [now + request.remaining / share for request in downloading]
+        if document in downloading:
+            thresholds = [request.trigger[1] for request in requests
+                          if request.discovered is None and request.trigger and request.trigger[0] == 'offset']
+            thresholds += [trigger[1] for _, _, trigger in hints if trigger[0] == 'offset']
+            if render_ready is None:
+                thresholds.append(graph.first_content_offset)
+            pending = [threshold - received() for threshold in thresholds if threshold > received() + EPSILON]
+            if pending:
+                candidates.append(now + min(pending) / share)
+        if not candidates:
+            break
+
+        step = max(0.0, min(candidates) - now)
+        for request in downloading:
+            request.remaining = max(0.0, request.remaining - share * step)
+        now += step
+        for request in downloading:
+            if request.remaining <= EPSILON:
+                request.remaining = 0.0
+                request.end = now
+        if document in downloading:
+            doc_progress.append((now, received()))
+
+    def parsed_at(offset):
+        """Istante in cui il documento ha ricevuto `offset` byte"""
+        for (t0, b0), (t1, b1) in zip(doc_progress, doc_progress[1:]):
+            if b1 >= offset:
+                return t0 + (t1 - t0) * (offset - b0) / (b1 - b0) if b1 > b0 else t1
+        return document.end
+
+    render_ready = render_ready if render_ready is not None else document.end
+    font_wait = 0
+    for font in graph.render_fonts:
+        if font.end is not None:
+            font_wait = max(font_wait, min(graph.font_block_period(font), font.end - render_ready))
+    fcp = render_ready + max(0, font_wait)
+    lcp = max(fcp, parsed_at(graph.lcp_offset))
+    lcp_request = graph.lcp_request
+    if lcp_request is not None and lcp_request.end is not None:
+        lcp = max(lcp, lcp_request.end)
+
+    # Percorso critico: catena di richieste che termina con quella che ha sbloccato l'LCP.
+    # Senza CSS bloccante un LCP testuale può arrivare mentre l'HTML è ancora in
+    # download: nessuna richiesta è finita e il percorso è il documento stesso
+    gating = [document] + [request for request in requests if request.blocking]
+    gating += graph.render_fonts
+    if lcp_request is not None:
+        gating.append(lcp_request)
+    last = max((request for request in gating if request.end is not None and request.end <= lcp + EPSILON),
+               key=lambda request: request.end, default=document)
+    chain = []
+    while last is not None:
+        chain.insert(0, last)
+        last = last.initiator
+
+    finished = [request for request in requests if request.end is not None]
+    return {
+        'fcp': round(fcp),
+        'lcp': round(lcp),
+        'load': round(max(request.end for request in finished)),
+        'critical_path': [request.name for request in chain],
+        'critical_path_ms': round(min(chain[-1].end, lcp)),
+        'requests': len(finished),
+        'bytes': sum(request.bytes for request in finished),
+        'blocking_bytes': sum(request.bytes for request in requests if request.blocking),
+        'estimated': sum(1 for request in finished if request.estimated),
+        'deferred_images': graph.deferred_images,
+    }
+
+def format_waterfall(graph, width=40):
+    requests = sorted((request for request in graph.requests.values() if request.end is not None),
+                      key=lambda request: (request.sent, request.order))
+    total = max(request.end for request in requests) or 1
+    lines = []
+    for request in requests:
+        start = int(request.sent / total * width)
+        waiting = int(request.response / total * width)
+        end = max(waiting + 1, int(request.end / total * width))
+        bar = ' ' * start + '░' * (waiting - start) + '█' * (end - waiting)
+        flags = ' bloccante' if request.blocking else ''
+        flags += ' stimato' if request.estimated else ''
+        lines.append(f"   {request.sent / 1000:5.2f}–{request.end / 1000:5.2f} s |{bar:<{width}}| "
+                     f"{request.name} ({request.bytes / 1024:.1f} KB, {request.priority}{flags})")
+    return lines
+
+def describe_lcp(graph):
+    if graph.lcp is None:
+        return 'nessuno'
+    if graph.lcp.kind == 'image':
+        return f"<img> {os.path.basename(graph.lcp.node.get('src', ''))}"
+    return f"<{graph.lcp.node.tag}> testo"
+
+def simulate_page(file_path, manifest, profile, connections=DEFAULT_CONNECTIONS, compress=True, waterfall=False):
+    graph = PageGraph(file_path, manifest, compress)
+    metrics = simulate(graph, profile, connections)
+
+    print(f"\n📄 {file_path}")
+    print(f"   🎨 FCP: {metrics['fcp'] / 1000:.2f} s   🎯 LCP: {metrics['lcp'] / 1000:.2f} s ({describe_lcp(graph)})"
+          f"   🏁 Caricamento: {metrics['load'] / 1000:.2f} s")
+    print(f"   📦 Richieste: {metrics['requests']} ({metrics['bytes'] / 1024:.1f} KB, "
+          f"bloccanti {metrics['blocking_bytes'] / 1024:.1f} KB)"
+          + (f", {metrics['estimated']} di terze parti con dimensione stimata" if metrics['estimated'] else '')
+          + (f", {metrics['deferred_images']} immagini lazy rinviate" if metrics['deferred_images'] else ''))
+    print(f"   🔗 Percorso critico ({len(metrics['critical_path'])} richiest{'a' if len(metrics['critical_path']) == 1 else 'e'}, "
+          f"{metrics['critical_path_ms'] / 1000:.2f} s): {' → '.join(metrics['critical_path'])}")
+    if waterfall:
+        for line in format_waterfall(graph):
+            print(line)
+    return metrics
+
+# Pagine sintetiche per --self-check: casi limite che il sito reale non copre.
+# {nome: (HTML, altri file)}
+_FILLER = ''.join(f'<div>riga {index} {"x" * 80}</div>\n' for index in range(4000))
+SELF_CHECK_PAGES = {
+    # Niente CSS bloccante e LCP testuale nei primi byte di un HTML da ~400 KB:
+    # l'LCP arriva prima che qualunque richiesta sia finita
+    'testo-precoce.html': (f'<!DOCTYPE html><html><head><title>t</title></head>'
+                           f'<body><p>Testo principale</p>\n{_FILLER}</body></html>', {}),
+    'css-bloccante.html': ('<!DOCTYPE html><html><head><title>t</title>'
+                           '<link rel="stylesheet" href="stile.css"></head>'
+                           '<body><h1>Titolo</h1><p>Testo</p></body></html>',
+                           {'stile.css': 'body{margin:0}\n' * 2000}),
+}
+
+def self_check(profile, connections):
+    """Simula le pagine sintetiche e verifica le invarianti delle metriche; restituisce gli errori"""
+    errors = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (text, extra_files) in SELF_CHECK_PAGES.items():
+            for file_name, content in dict(extra_files, **{name: text}).items():
+                with open(os.path.join(directory, file_name), 'w', encoding='utf-8') as f:
+                    f.write(content)
+            try:
+                metrics = simulate(PageGraph(os.path.join(directory, name), {}), profile, connections)
+            except Exception as e:
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+                continue
+            if not metrics['fcp'] <= metrics['lcp'] <= metrics['load']:
+                errors.append(f"{name}: FCP {metrics['fcp']} / LCP {metrics['lcp']} / caricamento "
+                              f"{metrics['load']} non in ordine")
+            if not metrics['critical_path'] or metrics['critical_path_ms'] > metrics['lcp']:
+                errors.append(f"{name}: percorso critico non valido ({metrics['critical_path']}, "
+                              f"{metrics['critical_path_ms']} ms)")
+    return errors
+
+def format_delta(name, current, previous, unit='ms'):
+    delta = current - previous
+    sign = '+' if delta > 0 else ''
+    marker = '🔺' if delta > 0 else '🔻' if delta < 0 else '  '
+    if unit == 'ms':
+        return f"{marker} {name}: {previous / 1000:.2f} → {current / 1000:.2f} s ({sign}{delta} ms)"
+    return f"{marker} {name}: {previous} → {current} ({sign}{delta})"
+
+def compare_results(results, previous, settings):
+    print(f"\n🔍 Confronto con la simulazione precedente:")
+    different = [key for key, value in settings.items() if previous.get(key) != value]
+    if different:
+        print(f"   ⚠️  Impostazioni diverse ({', '.join(different)}): i tempi non sono confrontabili")
+    for page, metrics in results.items():
+        before = previous.get('pages', {}).get(page)
+        if before is None:
+            print(f"   {page}: nuova pagina")
+            continue
+        print(f"   {page}:")
+        for key, label in (('fcp', 'FCP'), ('lcp', 'LCP'), ('load', 'Caricamento')):
+            print(f"      {format_delta(label, metrics[key], before[key])}")
+        for key, label in (('requests', 'Richieste'), ('bytes', 'Byte'), ('blocking_bytes', 'Byte bloccanti')):
+            if metrics[key] != before[key]:
+                print(f"      {format_delta(label, metrics[key], before[key], unit='')}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Stima offline FCP/LCP con una waterfall simulata',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help='pagine da simulare (anche in dist/)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE, help='profilo di rete')
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+                        help=f'connessioni parallele per origine (default: {DEFAULT_CONNECTIONS})')
+    parser.add_argument('--no-compression', action='store_true', help='usa le dimensioni non compresse')
+    parser.add_argument('--waterfall', action='store_true', help='mostra la waterfall di ogni pagina')
+    parser.add_argument('--json', metavar='FILE', help='salva i risultati in JSON')
+    parser.add_argument('--compare', metavar='FILE', help='confronta con i risultati salvati con --json')
+    parser.add_argument('--self-check', action='store_true',
+                        help='verifica il simulatore su pagine sintetiche nei casi limite ed esce')
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    if args.self_check:
+        errors = self_check(profile, args.connections)
+        for error in errors:
+            print(f"❌ {error}")
+        print(f"{'❌' if errors else '✅'} Verifica del simulatore: {len(SELF_CHECK_PAGES)} pagine sintetiche, "
+              f"{len(errors)} errori")
+        sys.exit(1 if errors else 0)
+
+    print("⏱️  Simulazione caricamento pagine")
+    print("=" * 50)
+    print(f"🌐 Rete: {profile['label']} (RTT {profile['rtt']} ms, {profile['download'] / 1000:.2f} Mbit/s), "
+          f"{args.connections} connessioni per origine")
+
+    settings = {'profile': args.profile, 'connections': args.connections, 'compression': not args.no_compression}
+    manifest = image_manifest.load_manifest('.')
+    results = {}
+    for html_file in args.files:
+        if os.path.exists(html_file):
+            results[html_file] = simulate_page(html_file, manifest, profile, args.connections,
+                                               not args.no_compression, args.waterfall)
+        else:
+            print(f"⚠️  File non trovato: {html_file}")
+
+    if results:
+        print(f"\n📊 Riepilogo:")
+        print(f"📁 Pagine simulate: {len(results)}/{len(args.files)}")
+        slowest = max(results, key=lambda page: results[page]['lcp'])
+        print(f"🐢 LCP peggiore: {slowest} ({results[slowest]['lcp'] / 1000:.2f} s)")
+
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"❌ File di confronto non trovato: {args.compare}")
+            sys.exit(1)
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(results, json.load(f), settings)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(dict(settings, pages=results), f, indent=2)
+            f.write('\n')
+        print(f"💾 Risultati salvati in {args.json}")
+
+if __name__ == "__main__":
+    instrumentation.run(main)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archivio unico del bundle di deploy per i server locali (server.py --pack)
+Impacchetta dist/ in site.pack: un indice JSON (percorso → varianti identity,
+gzip e br con offset, lunghezza, header già pronti ed ETag) seguito dal
+contenuto dei file, con i contenuti identici salvati una volta sola. Il server
+apre il file una volta, lo mappa in memoria con mmap e risponde a ogni
+richiesta con una ricerca nel dizionario e una fetta di memoryview, senza
+traduzione del percorso, stat o open
+Formato: MAGIC (8 byte) | lunghezza indice (uint64 little endian) | indice | dati
+"""
+
+import os
+import gzip
+import json
+import mmap
+import struct
+import fnmatch
+import hashlib
+import argparse
+import mimetypes
+
+import build
+import instrumentation
+
+PACK_FILE = 'site.pack'
+MAGIC = b'FBTSPAK1'
+HEADER = struct.Struct('<8sQ')
+
+# Varianti in ordine di preferenza quando il client le accetta tutte
+ENCODINGS = ('br', 'gzip')
+ENCODING_SUFFIXES = {'.br': 'br', '.gz': 'gzip'}
+
+# Stessi Cache-Control di .htaccess (la prima regola che corrisponde vince)
+CACHE_CONTROL_RULES = [
+    (['sw.js'], 'no-cache'),
+    (['*.css', '*.js'], 'public, max-age=31536000, immutable'),
+    (['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico'], 'public, max-age=31536000, immutable'),
+    (['*.woff', '*.woff2', '*.ttf', '*.eot'], 'public, max-age=31536000, immutable'),
+    (['*.html'], 'public, max-age=3600'),
+]
+
+CONTENT_TYPES = {
+    '.js': 'application/javascript',
+    '.webp': 'image/webp',
+    '.webmanifest': 'application/manifest+json',
+    '.woff2': 'font/woff2',
+}
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'application/manifest+json',
+              'application/xml', 'image/svg+xml')
+
+def content_type(rel_path):
+    ext = os.path.splitext(rel_path)[1].lower()
+    value = CONTENT_TYPES.get(ext) or mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+    return value + '; charset=utf-8' if value.startswith(TEXT_TYPES) else value
+
+def cache_control(rel_path):
+    name = os.path.basename(rel_path)
+    for patterns, value in CACHE_CONTROL_RULES:
+        if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            return value
+    return None
+
+def collect_files(dist):
+    """{percorso relativo: {codifica: percorso del file}} con le varianti .gz/.br precompresse"""
+    files = {}
+    for rel_path in build.expand_patterns(['**/*'], dist):
+        stem, suffix = os.path.splitext(rel_path)
+        encoding = ENCODING_SUFFIXES.get(suffix)
+        if encoding and os.path.isfile(os.path.join(dist, stem)):
+            files.setdefault(stem, {})[encoding] = os.path.join(dist, rel_path)
+        else:
+            files.setdefault(rel_path, {})['identity'] = os.path.join(dist, rel_path)
+    return {rel_path: variants for rel_path, variants in files.items() if 'identity' in variants}
+
+def variant_headers(rel_path, encoding, length, etag, encodings):
+    headers = [('Content-Type', content_type(rel_path)), ('Content-Length', str(length)), ('ETag', etag)]
+    control = cache_control(rel_path)
+    if control:
+        headers.append(('Cache-Control', control))
+    if encoding != 'identity':
+        headers.append(('Content-Encoding', encoding))
+    if len(encodings) > 1:
+        headers.append(('Vary', 'Accept-Encoding'))
+    return headers
+
+def build_pack(dist=build.DIST_DIR, output=PACK_FILE):
+    """Scrive l'archivio di dist/; restituisce un riepilogo"""
+    files = collect_files(dist)
+    blobs = []
+    blob_offsets = {}
+    data_size = 0
+    index = {}
+    for rel_path, variants in sorted(files.items()):
+        contents = {}
+        for encoding, path in variants.items():
+            with open(path, 'rb') as f:
+                contents[encoding] = f.read()
+        identity = contents['identity']
+        if 'gzip' not in contents and rel_path.endswith(build.COMPRESS_EXTENSIONS) \
+                and len(identity) >= build.MIN_COMPRESS_BYTES:
+            # Bundle senza il passo compress: la variante gzip si calcola qui
+            compressed = gzip.compress(identity, compresslevel=9, mtime=0)
+            if len(compressed) < len(identity):
+                contents['gzip'] = compressed
+
+        digest = hashlib.sha256(identity).hexdigest()[:16]
+        entry = {}
+        for encoding, data in contents.items():
+            key = hashlib.sha256(data).digest()
+            if key not in blob_offsets:
+                blob_offsets[key] = data_size
+                blobs.append(data)
+                data_size += len(data)
+            etag = f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+            entry[encoding] = {
+                'offset': blob_offsets[key],
+                'length': len(data),
+                'headers': variant_headers(rel_path, encoding, len(data), etag, contents),
+            }
+        index['/' + rel_path] = entry
+
+    index_data = json.dumps(index, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    temp_path = output + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index_data)))
+        f.write(index_data)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, output)
+    return {'files': len(index), 'variants': sum(len(entry) for entry in index.values()),
+            'blobs': len(blobs), 'bytes': os.path.getsize(output)}
+
+def accepted_encodings(header):
+    """Codifiche accettate dal client (quelle con q=0 sono escluse)"""
+    accepted = set()
+    for item in (header or '').split(','):
+        name, _, params = item.partition(';')
+        quality = params.strip().lower()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name.strip():
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class PackedSite:
+    """
+    Archivio aperto in sola lettura: l'indice viene risolto all'apertura in
+    (header, ETag, fetta di memoryview) per variante, così la richiesta non copia né
+    legge dal disco (le pagine arrivano dalla page cache del sistema)
+    """
+
+    def __init__(self, path=PACK_FILE):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self.entries = {}
+        magic, index_length = HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} non è un archivio del sito (magic {magic!r})")
+        data_start = HEADER.size + index_length
+        index = json.loads(bytes(self._view[HEADER.size:data_start]))
+        for url, variants in index.items():
+            self.entries[url] = {}
+            for encoding, variant in variants.items():
+                start = data_start + variant['offset']
+                etag = next(value for name, value in variant['headers'] if name == 'ETag')
+                self.entries[url][encoding] = (variant['headers'], etag, self._view[start:start + variant['length']])
+
+    def lookup(self, url, accept_encoding=''):
+        """(codifica, header, ETag, contenuto) del percorso richiesto, o None se non è nell'archivio"""
+        if url.endswith('/'):
+            url += 'index.html'
+        variants = self.entries.get(url)
+        if variants is None:
+            return None
+        if len(variants) > 1:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding in ENCODINGS:
+                if encoding in variants and encoding in accepted:
+                    return (encoding,) + variants[encoding]
+        return ('identity',) + variants['identity']
+
+    def is_directory(self, url):
+        """True se il percorso senza / finale è una cartella con index.html"""
+        return url.rstrip('/') + '/index.html' in self.entries
+
+    def close(self):
+        # Le fette esportate vanno rilasciate prima di chiudere la mappa:
+        # chi ha ancora un contenuto restituito da lookup() deve averlo liberato
+        self.entries = {}
+        self._view.release()
+        self._mmap.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Impacchetta il bundle di deploy in un archivio unico',
+                                     epilog=instrumentation.OPTIONS_HELP,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dist', default=build.DIST_DIR, help=f'cartella del bundle (default: {build.DIST_DIR})')
+    parser.add_argument('--output', default=PACK_FILE, help=f'archivio da scrivere (default: {PACK_FILE})')
+    args = parser.parse_args()
+
+    print("📦 Creazione archivio del sito")
+    print("=" * 50)
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ {args.dist}/ non trovato: esegui prima il build")
+        raise SystemExit(1)
+
+    result = build_pack(args.dist, args.output)
+    print(f"📄 File: {result['files']} ({result['variants']} varianti, {result['blobs']} contenuti distinti)")
+    print(f"\n📊 Riepilogo:")
+    print(f"✅ Scritto: {args.output} ({result['bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"ℹ️  Servilo con: python server.py --pack {args.output}")
+
+if __name__ == "__main__":
+    instrumentation.run(main)